@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 from .models import CustomUser
+from .normalization import normalize_text
 
 
 class EmployeeAdminSite(admin.AdminSite):
@@ -19,7 +20,12 @@ class EmployeeAdminSite(admin.AdminSite):
 employee_admin_site = EmployeeAdminSite(name='employee-admin')
 
 
-class CustomUserAdmin(BaseUserAdmin):
+class NormalizedSearchAdminMixin:
+    def get_search_results(self, request, queryset, search_term):
+        return super().get_search_results(request, queryset, normalize_text(search_term))
+
+
+class CustomUserAdmin(NormalizedSearchAdminMixin, BaseUserAdmin):
     model = CustomUser
     
     list_display = [
@@ -47,10 +53,9 @@ class CustomUserAdmin(BaseUserAdmin):
     search_fields = [
         'username',
         'email',
-        'first_name',
-        'last_name',
-        'phone_number',
-        'national_id',
+        'name_norm',
+        '^phone_norm',
+        '^national_id_norm',
     ]
     
     fieldsets = (
@@ -137,7 +142,7 @@ class CustomUserAdmin(BaseUserAdmin):
         super().save_model(request, obj, form, change)
 
 
-class EmployeeCustomUserAdmin(BaseUserAdmin):
+class EmployeeCustomUserAdmin(NormalizedSearchAdminMixin, BaseUserAdmin):
     model = CustomUser
     
     list_display = [
@@ -152,9 +157,8 @@ class EmployeeCustomUserAdmin(BaseUserAdmin):
     search_fields = [
         'username',
         'email',
-        'first_name',
-        'last_name',
-        'national_id',
+        'name_norm',
+        '^national_id_norm',
     ]
     
     fieldsets = (
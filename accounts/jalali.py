@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+
+
+GREGORIAN_DAYS_BEFORE_MONTH = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+JALALI_MONTH_NAMES = (
+    'فروردین', 'اردیبهشت', 'خرداد', 'تیر', 'مرداد', 'شهریور',
+    'مهر', 'آبان', 'آذر', 'دی', 'بهمن', 'اسفند',
+)
+
+
+def gregorian_to_jalali(value):
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    gy, gm, gd = value.year, value.month, value.day
+    gy2 = gy + 1 if gm > 2 else gy
+    days = (
+        355666 + 365 * gy + (gy2 + 3) // 4 - (gy2 + 99) // 100 + (gy2 + 399) // 400
+        + gd + GREGORIAN_DAYS_BEFORE_MONTH[gm - 1]
+    )
+    jy = -1595 + 33 * (days // 12053)
+    days %= 12053
+    jy += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        jy += (days - 1) // 365
+        days = (days - 1) % 365
+    if days < 186:
+        return jy, 1 + days // 31, 1 + days % 31
+    return jy, 7 + (days - 186) // 30, 1 + (days - 186) % 30
+
+
+def jalali_month_start(value):
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    _year, _month, day = gregorian_to_jalali(value)
+    return value - timedelta(days=day - 1)
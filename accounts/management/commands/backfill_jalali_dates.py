@@ -0,0 +1,45 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from accounts.jalali import gregorian_to_jalali
+from accounts.models import JalaliDatedModel
+
+
+class Command(BaseCommand):
+    help = 'Fill jalali_year and jalali_month on every model dated with JalaliDatedModel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every row instead of only rows without a Jalali date'
+        )
+
+    def handle(self, *args, **options):
+        for model in apps.get_models():
+            if not issubclass(model, JalaliDatedModel):
+                continue
+
+            date_field = model.jalali_date_field
+            queryset = model.objects.all()
+            if not options['all']:
+                queryset = queryset.filter(jalali_year__isnull=True)
+
+            # One UPDATE per distinct date keeps the backfill set-based even
+            # for tables with many rows on the same day.
+            days = list(
+                queryset.exclude(**{f'{date_field}__isnull': True})
+                .order_by().values_list(date_field, flat=True).distinct()
+            )
+            updated = 0
+            with transaction.atomic():
+                for day in days:
+                    jalali_year, jalali_month, _day = gregorian_to_jalali(day)
+                    updated += queryset.filter(**{date_field: day}).update(
+                        jalali_year=jalali_year,
+                        jalali_month=jalali_month,
+                    )
+
+            self.stdout.write(
+                self.style.SUCCESS(f'{model._meta.label}: {updated} rows updated')
+            )
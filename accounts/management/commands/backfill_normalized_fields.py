@@ -0,0 +1,47 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from accounts.models import NormalizedSearchModel
+
+
+class Command(BaseCommand):
+    help = 'Recompute the normalized search columns of every NormalizedSearchModel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of rows updated per transaction'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        for model in apps.get_models():
+            if not issubclass(model, NormalizedSearchModel):
+                continue
+
+            shadow_fields = list(model.normalized_fields)
+            source_fields = {
+                source for _normalizer, sources in model.normalized_fields.values() for source in sources
+            }
+            last_pk = 0
+            updated = 0
+            while True:
+                rows = list(
+                    model.objects.filter(pk__gt=last_pk).order_by('pk')
+                    .only('pk', *source_fields, *shadow_fields)[:chunk_size]
+                )
+                if not rows:
+                    break
+                last_pk = rows[-1].pk
+
+                for row in rows:
+                    row.fill_normalized_fields()
+                with transaction.atomic():
+                    model.objects.bulk_update(rows, shadow_fields)
+                updated += len(rows)
+
+            self.stdout.write(
+                self.style.SUCCESS(f'{model._meta.label}: {updated} rows updated')
+            )
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_alter_customuser_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='name_norm',
+            field=models.CharField(blank=True, editable=False, max_length=301, verbose_name='نام نرمال\u200cشده'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='national_id_norm',
+            field=models.CharField(blank=True, editable=False, max_length=20, verbose_name='کد ملی نرمال\u200cشده'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='phone_norm',
+            field=models.CharField(blank=True, editable=False, max_length=17, verbose_name='شماره تلفن نرمال\u200cشده'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['name_norm'], name='accounts_cu_name_no_9f677d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['phone_norm'], name='accounts_cu_phone_n_1987fa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['national_id_norm'], name='accounts_cu_nationa_b723b0_idx'),
+        ),
+    ]
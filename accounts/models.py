@@ -2,9 +2,34 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
+from .jalali import gregorian_to_jalali
+from .normalization import normalize_digits, normalize_text
 
 
-class CustomUser(AbstractUser):
+class NormalizedSearchModel(models.Model):
+    # Maps each shadow column to (normalizer, source fields).
+    normalized_fields = {}
+
+    class Meta:
+        abstract = True
+
+    def fill_normalized_fields(self):
+        for field, (normalizer, sources) in self.normalized_fields.items():
+            value = ' '.join(str(getattr(self, source) or '') for source in sources)
+            setattr(self, field, normalizer(value))
+
+    def save(self, *args, **kwargs):
+        self.fill_normalized_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *(
+                field for field, (_normalizer, sources) in self.normalized_fields.items()
+                if set(sources) & set(update_fields)
+            )}
+        super().save(*args, **kwargs)
+
+
+class CustomUser(AbstractUser, NormalizedSearchModel):
     ROLE_CHOICES = [
         ('admin', _('ادمین')),
         ('user', _('کاربر')),
@@ -113,6 +138,33 @@ class CustomUser(AbstractUser):
         verbose_name=_('تاریخ به‌روز‌رسانی')
     )
     
+    name_norm = models.CharField(
+        max_length=301,
+        blank=True,
+        editable=False,
+        verbose_name=_('نام نرمال‌شده')
+    )
+    
+    phone_norm = models.CharField(
+        max_length=17,
+        blank=True,
+        editable=False,
+        verbose_name=_('شماره تلفن نرمال‌شده')
+    )
+    
+    national_id_norm = models.CharField(
+        max_length=20,
+        blank=True,
+        editable=False,
+        verbose_name=_('کد ملی نرمال‌شده')
+    )
+    
+    normalized_fields = {
+        'name_norm': (normalize_text, ('first_name', 'last_name')),
+        'phone_norm': (normalize_digits, ('phone_number',)),
+        'national_id_norm': (normalize_digits, ('national_id',)),
+    }
+    
     class Meta:
         verbose_name = _('کاربر')
         verbose_name_plural = _('کاربران')
@@ -123,6 +175,9 @@ class CustomUser(AbstractUser):
             models.Index(fields=['role']),
             models.Index(fields=['current_status']),
             models.Index(fields=['is_active']),
+            models.Index(fields=['name_norm']),
+            models.Index(fields=['phone_norm']),
+            models.Index(fields=['national_id_norm']),
         ]
     
     def __str__(self):
@@ -150,4 +205,35 @@ class OwnedModel(models.Model):
         abstract = True
 
 
+class JalaliDatedModel(models.Model):
+    jalali_date_field = 'date'
+    
+    jalali_year = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_('سال شمسی')
+    )
+    jalali_month = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_('ماه شمسی')
+    )
+
+    class Meta:
+        abstract = True
+
+    def fill_jalali_date(self):
+        value = getattr(self, self.jalali_date_field)
+        if value:
+            self.jalali_year, self.jalali_month, _day = gregorian_to_jalali(value)
+        else:
+            self.jalali_year = self.jalali_month = None
 
+    def save(self, *args, **kwargs):
+        self.fill_jalali_date()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.jalali_date_field in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'jalali_year', 'jalali_month'}
+        super().save(*args, **kwargs)
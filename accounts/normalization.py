@@ -0,0 +1,47 @@
+import re
+
+
+PERSIAN_CHARACTER_MAP = str.maketrans({
+    'ي': 'ی',
+    'ى': 'ی',
+    'ك': 'ک',
+    'ة': 'ه',
+    'ۀ': 'ه',
+    'أ': 'ا',
+    'إ': 'ا',
+    'ٱ': 'ا',
+    '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
+    '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+})
+
+# Zero-width joiners/non-joiners, direction marks, tatweel and harakat.
+IGNORED_CHARACTERS_RE = re.compile('[\u200b-\u200f\u202a-\u202e\u0640\u064b-\u065f\u0670]')
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+NON_DIGIT_RE = re.compile(r'\D')
+
+
+def normalize_text(value):
+    if not value:
+        return ''
+    value = IGNORED_CHARACTERS_RE.sub('', str(value).translate(PERSIAN_CHARACTER_MAP))
+    return WHITESPACE_RE.sub(' ', value).strip().lower()
+
+
+def normalize_digits(value):
+    if not value:
+        return ''
+    return NON_DIGIT_RE.sub('', str(value).translate(PERSIAN_CHARACTER_MAP))
+
+
+IRAN_MOBILE_RE = re.compile(r'^(?:0098|98|0)?(9\d{9})$')
+
+
+def iran_mobile_e164(value):
+    match = IRAN_MOBILE_RE.match(normalize_digits(value))
+    if not match:
+        return ''
+    return f'+98{match.group(1)}'
@@ -111,6 +111,20 @@ if DB_USE_SSL:
     }
 
 
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": config("CACHE_LOCATION", default="phonix_cache"),
+    }
+}
+
+REPORT_CACHE_TIMEOUT = config("REPORT_CACHE_TIMEOUT", default=3600, cast=int)
+REPORT_JOB_STALE_AFTER = config("REPORT_JOB_STALE_AFTER", default=600, cast=int)
+REPORT_JOB_MAX_ATTEMPTS = config("REPORT_JOB_MAX_ATTEMPTS", default=2, cast=int)
+AUTOCOMPLETE_CACHE_TIMEOUT = config("AUTOCOMPLETE_CACHE_TIMEOUT", default=300, cast=int)
+AUTOCOMPLETE_MAX_AGE = config("AUTOCOMPLETE_MAX_AGE", default=30, cast=int)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
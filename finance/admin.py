@@ -1,6 +1,14 @@
-from django.contrib import admin
+from decimal import Decimal, InvalidOperation
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Q, Sum
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-from .models import ExpenseInvoice, IncomeInvoice, Salary
+from .forms import PayrollRunForm
+from .models import ExpenseInvoice, IncomeInvoice, PayrollRun, Salary
+from .payroll import create_payroll_run, mark_payroll_runs_paid, payroll_preview
 from accounts.admin import OwnedAdminMixin, employee_admin_site
 
 
@@ -206,6 +214,7 @@ class SalaryAdmin(OwnedAdminMixin, admin.ModelAdmin):
     list_filter = [
         'date',
         'is_paid',
+        'payroll_run',
         'created_at',
     ]
     
@@ -255,9 +264,152 @@ class SalaryAdmin(OwnedAdminMixin, admin.ModelAdmin):
     get_employee_name.short_description = _('کارمند')
 
 
+class PayrollSalaryInline(admin.TabularInline):
+    model = Salary
+    fields = ['employee', 'amount', 'is_paid']
+    readonly_fields = ['employee', 'amount', 'is_paid']
+    extra = 0
+    can_delete = False
+    show_change_link = True
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class PayrollRunAdmin(OwnedAdminMixin, admin.ModelAdmin):
+    list_display = [
+        'date',
+        'get_salaries_count',
+        'get_total_amount',
+        'get_unpaid_count',
+        'created_at',
+    ]
+    
+    list_filter = [
+        'date',
+        'created_at',
+    ]
+    
+    fields = [
+        'date',
+        'description',
+        'created_at',
+    ]
+    
+    readonly_fields = [
+        'date',
+        'created_at',
+    ]
+    
+    inlines = [PayrollSalaryInline]
+    
+    ordering = ['-date', '-created_at']
+    
+    actions = ['mark_runs_paid']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            salaries_count=Count('salaries'),
+            total_amount=Sum('salaries__amount'),
+            unpaid_count=Count('salaries', filter=Q(salaries__is_paid=False)),
+        )
+    
+    def get_salaries_count(self, obj):
+        return obj.salaries_count
+    get_salaries_count.short_description = _('تعداد حقوق')
+    get_salaries_count.admin_order_field = 'salaries_count'
+    
+    def get_total_amount(self, obj):
+        return obj.total_amount or 0
+    get_total_amount.short_description = _('جمع مبالغ')
+    get_total_amount.admin_order_field = 'total_amount'
+    
+    def get_unpaid_count(self, obj):
+        return obj.unpaid_count
+    get_unpaid_count.short_description = _('پرداخت نشده')
+    get_unpaid_count.admin_order_field = 'unpaid_count'
+    
+    def add_view(self, request, form_url='', extra_context=None):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        
+        form = PayrollRunForm(request.POST or None)
+        employees = None
+        amount_errors = []
+        if request.method == 'POST' and form.is_valid():
+            employees = payroll_preview(form.cleaned_data['date'], form.cleaned_data['employees'])
+            if 'confirm' in request.POST:
+                amounts, amount_errors = self.parse_amounts(request, employees)
+                if amounts and not amount_errors:
+                    run, created = create_payroll_run(
+                        form.cleaned_data['date'],
+                        amounts,
+                        user=request.user,
+                        description=form.cleaned_data['description'] or None,
+                    )
+                    if run is None:
+                        self.message_user(
+                            request,
+                            _('حقوق این ماه برای همه کارمندان انتخاب‌شده قبلاً ثبت شده است'),
+                            messages.WARNING,
+                        )
+                        return redirect(reverse(f'{self.admin_site.name}:finance_payrollrun_changelist'))
+                    self.message_user(
+                        request,
+                        _('%(count)d ردیف حقوق ایجاد شد') % {'count': created},
+                        messages.SUCCESS,
+                    )
+                    return redirect(reverse(f'{self.admin_site.name}:finance_payrollrun_change', args=[run.pk]))
+                if not amounts and not amount_errors:
+                    amount_errors.append(_('هیچ حقوقی برای ایجاد وجود ندارد'))
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': _('اجرای حقوق ماهانه'),
+            'opts': self.model._meta,
+            'form': form,
+            'employees': employees,
+            'amount_errors': amount_errors,
+            'media': self.media + form.media,
+        }
+        response = TemplateResponse(request, 'admin/finance/payroll_run_form.html', context)
+        response['Content-Type'] = 'text/html; charset=utf-8'
+        return response
+    
+    def parse_amounts(self, request, employees):
+        amounts = {}
+        errors = []
+        for employee in employees:
+            if employee.has_salary:
+                continue
+            value = request.POST.get(f'amount_{employee.pk}', '').replace(',', '').strip()
+            if not value:
+                continue
+            try:
+                amount = Decimal(value)
+            except InvalidOperation:
+                amount = None
+            if amount is None or amount < 0:
+                errors.append(_('مبلغ حقوق %(employee)s نامعتبر است') % {'employee': employee.get_display_name()})
+            else:
+                amounts[employee.pk] = amount
+        return amounts, errors
+    
+    def mark_runs_paid(self, request, queryset):
+        updated = mark_payroll_runs_paid(list(queryset.values_list('pk', flat=True)))
+        self.message_user(
+            request,
+            _('%(count)d ردیف حقوق پرداخت‌شده ثبت شد') % {'count': updated},
+            messages.SUCCESS,
+        )
+    mark_runs_paid.short_description = _('ثبت پرداخت حقوق اجراهای انتخاب‌شده')
+    mark_runs_paid.allowed_permissions = ('change',)
+
+
 admin.site.register(ExpenseInvoice, ExpenseInvoiceAdmin)
 admin.site.register(IncomeInvoice, IncomeInvoiceAdmin)
 admin.site.register(Salary, SalaryAdmin)
+admin.site.register(PayrollRun, PayrollRunAdmin)
 
 employee_admin_site.register(ExpenseInvoice, EmployeeExpenseInvoiceAdmin)
 employee_admin_site.register(IncomeInvoice, EmployeeIncomeInvoiceAdmin)
@@ -0,0 +1,22 @@
+from django import forms
+from django.contrib.admin.widgets import FilteredSelectMultiple
+from django.utils.translation import gettext_lazy as _
+from accounts.models import CustomUser
+
+
+class PayrollRunForm(forms.Form):
+    date = forms.DateField(
+        widget=forms.DateInput(attrs={'type': 'date'}),
+        label=_('تاریخ حقوق'),
+        help_text=_('حقوق در روز اول ماه شمسی همین تاریخ ثبت می‌شود'),
+    )
+    employees = forms.ModelMultipleChoiceField(
+        queryset=CustomUser.objects.filter(is_active=True),
+        widget=FilteredSelectMultiple(_('کارمندان'), is_stacked=False),
+        label=_('کارمندان'),
+    )
+    description = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 2}),
+        label=_('توضیحات'),
+    )
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_expenseinvoice_created_by_incomeinvoice_created_by_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenseinvoice',
+            name='jalali_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='ماه شمسی'),
+        ),
+        migrations.AddField(
+            model_name='expenseinvoice',
+            name='jalali_year',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='سال شمسی'),
+        ),
+        migrations.AddField(
+            model_name='incomeinvoice',
+            name='jalali_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='ماه شمسی'),
+        ),
+        migrations.AddField(
+            model_name='incomeinvoice',
+            name='jalali_year',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='سال شمسی'),
+        ),
+        migrations.AddField(
+            model_name='salary',
+            name='jalali_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='ماه شمسی'),
+        ),
+        migrations.AddField(
+            model_name='salary',
+            name='jalali_year',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='سال شمسی'),
+        ),
+        migrations.AddIndex(
+            model_name='expenseinvoice',
+            index=models.Index(fields=['jalali_year', 'jalali_month'], name='finance_exp_jalali__1b70cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomeinvoice',
+            index=models.Index(fields=['jalali_year', 'jalali_month'], name='finance_inc_jalali__ab525f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salary',
+            index=models.Index(fields=['jalali_year', 'jalali_month'], name='finance_sal_jalali__3dd3f5_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:37
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+SEQUENCE_MODELS = [
+    ('persons', 'SalesInvoice'),
+    ('persons', 'PurchaseInvoice'),
+    ('finance', 'ExpenseInvoice'),
+    ('finance', 'IncomeInvoice'),
+]
+
+
+def seed_sequences(apps, schema_editor):
+    InvoiceSequence = apps.get_model('finance', 'InvoiceSequence')
+    for app_label, model_name in SEQUENCE_MODELS:
+        model = apps.get_model(app_label, model_name)
+        last = model.objects.aggregate(last=Max('invoice_number'))['last']
+        InvoiceSequence.objects.create(
+            name=f'{app_label}.{model_name.lower()}',
+            last_number=last or 999,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0004_jalali_year_month'),
+        ('persons', '0010_jalali_year_month'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='نام')),
+                ('last_number', models.PositiveBigIntegerField(default=999, verbose_name='آخرین شماره')),
+            ],
+            options={
+                'verbose_name': 'دنباله شماره فاکتور',
+                'verbose_name_plural': 'دنباله\u200cهای شماره فاکتور',
+            },
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
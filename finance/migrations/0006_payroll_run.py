@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def check_duplicate_salaries(apps, schema_editor):
+    Salary = apps.get_model('finance', 'Salary')
+    duplicates = list(
+        Salary.objects.values('employee_id', 'date')
+        .annotate(rows=Count('id')).filter(rows__gt=1)
+        .values_list('employee_id', 'date')[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Salary rows must be unique per employee and date before this migration; '
+            'merge or delete the duplicates for (employee_id, date): %s' % duplicates
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('finance', '0005_invoicesequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jalali_year', models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='سال شمسی')),
+                ('jalali_month', models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='ماه شمسی')),
+                ('date', models.DateField(verbose_name='تاریخ')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='توضیحات')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+            ],
+            options={
+                'verbose_name': 'اجرای حقوق',
+                'verbose_name_plural': 'اجراهای حقوق',
+                'ordering': ['-date', '-created_at'],
+            },
+        ),
+        migrations.RunPython(check_duplicate_salaries, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='salary',
+            name='finance_sal_employe_d7f968_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='salary',
+            constraint=models.UniqueConstraint(fields=('employee', 'date'), name='unique_salary_employee_date'),
+        ),
+        migrations.AddField(
+            model_name='payrollrun',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='ایجاد شده توسط'),
+        ),
+        migrations.AddField(
+            model_name='salary',
+            name='payroll_run',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='salaries', to='finance.payrollrun', verbose_name='اجرای حقوق'),
+        ),
+        migrations.AddIndex(
+            model_name='payrollrun',
+            index=models.Index(fields=['date'], name='finance_pay_date_75e8cd_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0006_payroll_run'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salary',
+            index=models.Index(fields=['date'], name='finance_sal_date_75941b_idx'),
+        ),
+    ]
@@ -1,19 +1,63 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Max
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
-from accounts.models import CustomUser, OwnedModel
+from accounts.models import CustomUser, JalaliDatedModel, OwnedModel
+
+
+FIRST_INVOICE_NUMBER = 1000
+
+
+class InvoiceSequence(models.Model):
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name=_('نام')
+    )
+    last_number = models.PositiveBigIntegerField(
+        default=FIRST_INVOICE_NUMBER - 1,
+        verbose_name=_('آخرین شماره')
+    )
+
+    class Meta:
+        verbose_name = _('دنباله شماره فاکتور')
+        verbose_name_plural = _('دنباله‌های شماره فاکتور')
+
+    def __str__(self):
+        return f"{self.name}: {self.last_number}"
+
+    @classmethod
+    def reserve(cls, model_class, count=1):
+        # The UPDATE takes the row lock and holds it until the surrounding
+        # transaction ends, so concurrent callers get disjoint blocks.
+        name = model_class._meta.label_lower
+        with transaction.atomic():
+            if not cls.objects.filter(name=name).update(last_number=F('last_number') + count):
+                cls._create_for(model_class)
+                cls.objects.filter(name=name).update(last_number=F('last_number') + count)
+            last_number = cls.objects.filter(name=name).values_list('last_number', flat=True).get()
+        return range(last_number - count + 1, last_number + 1)
+
+    @classmethod
+    def _create_for(cls, model_class):
+        current = model_class.objects.aggregate(last=Max('invoice_number'))['last']
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    name=model_class._meta.label_lower,
+                    last_number=current or FIRST_INVOICE_NUMBER - 1,
+                )
+        except IntegrityError:
+            pass
 
 
 class InvoiceNumberMixin:
     @staticmethod
     def generate_next_invoice_number(model_class):
-        last_invoice = model_class.objects.order_by('-invoice_number').first()
-        if last_invoice:
-            return last_invoice.invoice_number + 1
-        return 1000
+        return InvoiceSequence.reserve(model_class)[0]
 
 
-class ExpenseInvoice(OwnedModel):
+class ExpenseInvoice(OwnedModel, JalaliDatedModel):
     invoice_number = models.PositiveIntegerField(
         unique=True,
         verbose_name=_('شماره فاکتور'),
@@ -59,6 +103,7 @@ class ExpenseInvoice(OwnedModel):
         indexes = [
             models.Index(fields=['invoice_number']),
             models.Index(fields=['date']),
+            models.Index(fields=['jalali_year', 'jalali_month']),
         ]
     
     def __str__(self):
@@ -70,7 +115,7 @@ class ExpenseInvoice(OwnedModel):
         super().save(*args, **kwargs)
 
 
-class IncomeInvoice(OwnedModel):
+class IncomeInvoice(OwnedModel, JalaliDatedModel):
     invoice_number = models.PositiveIntegerField(
         unique=True,
         verbose_name=_('شماره فاکتور'),
@@ -116,6 +161,7 @@ class IncomeInvoice(OwnedModel):
         indexes = [
             models.Index(fields=['invoice_number']),
             models.Index(fields=['date']),
+            models.Index(fields=['jalali_year', 'jalali_month']),
         ]
     
     def __str__(self):
@@ -127,7 +173,33 @@ class IncomeInvoice(OwnedModel):
         super().save(*args, **kwargs)
 
 
-class Salary(OwnedModel):
+class PayrollRun(OwnedModel, JalaliDatedModel):
+    date = models.DateField(
+        verbose_name=_('تاریخ')
+    )
+    description = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name=_('توضیحات')
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('تاریخ ایجاد')
+    )
+    
+    class Meta:
+        verbose_name = _('اجرای حقوق')
+        verbose_name_plural = _('اجراهای حقوق')
+        ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+    
+    def __str__(self):
+        return f"اجرای حقوق {self.date}"
+
+
+class Salary(OwnedModel, JalaliDatedModel):
     employee = models.ForeignKey(
         CustomUser,
         on_delete=models.PROTECT,
@@ -146,6 +218,15 @@ class Salary(OwnedModel):
         default=False,
         verbose_name=_('پرداختی')
     )
+    payroll_run = models.ForeignKey(
+        PayrollRun,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='salaries',
+        verbose_name=_('اجرای حقوق')
+    )
     description = models.TextField(
         blank=True,
         null=True,
@@ -164,9 +245,13 @@ class Salary(OwnedModel):
         verbose_name = _('حقوق')
         verbose_name_plural = _('حقوق‌ها')
         ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'date'], name='unique_salary_employee_date'),
+        ]
         indexes = [
-            models.Index(fields=['employee', 'date']),
+            models.Index(fields=['date']),
             models.Index(fields=['is_paid']),
+            models.Index(fields=['jalali_year', 'jalali_month']),
         ]
     
     def __str__(self):
@@ -0,0 +1,88 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils import timezone
+from accounts.jalali import gregorian_to_jalali, jalali_month_start
+from reports.rollup import apply_cash_flow_delta
+from reports.versioning import REPORT_DATA, bump_data_version
+from .models import PayrollRun, Salary
+
+
+PAYROLL_BATCH_SIZE = 500
+
+
+def salaries_in_month(run_date):
+    jalali_year, jalali_month, _day = gregorian_to_jalali(run_date)
+    return Salary.objects.filter(jalali_year=jalali_year, jalali_month=jalali_month)
+
+
+def payroll_preview(run_date, employees):
+    # The suggested amount is each employee's most recent salary; employees
+    # who already have a salary in the run's Jalali month are left out.
+    last_amount = Salary.objects.filter(employee=OuterRef('pk')).order_by('-date').values('amount')[:1]
+    already_paid = salaries_in_month(run_date).filter(employee=OuterRef('pk'))
+    return list(
+        employees.annotate(last_amount=Subquery(last_amount), has_salary=Exists(already_paid))
+        .order_by('last_name', 'first_name', 'username')
+    )
+
+
+def create_payroll_run(run_date, amounts, user=None, description=None):
+    # Runs are monthly: every run in a Jalali month is dated on its first
+    # day, so the (employee, date) constraint also rejects a second run
+    # made later in the same month. Returns (None, 0) when nothing is left
+    # to create.
+    run_date = jalali_month_start(run_date)
+    with transaction.atomic():
+        existing = set(
+            salaries_in_month(run_date).filter(employee_id__in=amounts).values_list('employee_id', flat=True)
+        )
+        amounts = {employee_id: amount for employee_id, amount in amounts.items() if employee_id not in existing}
+        if not amounts:
+            return None, 0
+
+        run = PayrollRun.objects.create(date=run_date, description=description, created_by=user)
+        salaries = []
+        for employee_id, amount in amounts.items():
+            salary = Salary(
+                employee_id=employee_id,
+                date=run_date,
+                amount=amount,
+                payroll_run=run,
+                created_by=user,
+            )
+            salary.fill_jalali_date()
+            salaries.append(salary)
+        # A concurrent run for the same month loses on the unique
+        # constraint; its empty run is rolled back with the transaction.
+        Salary.objects.bulk_create(salaries, batch_size=PAYROLL_BATCH_SIZE, ignore_conflicts=True)
+        created = run.salaries.count()
+        if not created:
+            transaction.set_rollback(True)
+            return None, 0
+        bump_data_version(REPORT_DATA)
+    return run, created
+
+
+def mark_payroll_runs_paid(runs):
+    # The rows are locked first so the paid amounts added to the cash-flow
+    # rollup are exactly the ones this update flips.
+    with transaction.atomic():
+        unpaid = list(
+            Salary.objects.select_for_update()
+            .filter(payroll_run__in=runs, is_paid=False)
+            .values_list('pk', 'date', 'amount')
+        )
+        if not unpaid:
+            return 0
+        updated = Salary.objects.filter(pk__in=[pk for pk, _day, _amount in unpaid]).update(
+            is_paid=True, updated_at=timezone.now(),
+        )
+        paid_by_day = defaultdict(Decimal)
+        for _pk, day, amount in unpaid:
+            paid_by_day[day] += amount
+        for day, amount in paid_by_day.items():
+            apply_cash_flow_delta(Salary, day, amount)
+        bump_data_version(REPORT_DATA)
+    return updated
@@ -1,3 +1,160 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.jalali import gregorian_to_jalali
+from factories import CustomUserFactory
+from reports.queries import jalali_period_totals
+from persons.models import SalesInvoice
+from accounts.models import CustomUser
+from .models import ExpenseInvoice, IncomeInvoice, InvoiceSequence, PayrollRun, Salary
+from .payroll import create_payroll_run, mark_payroll_runs_paid, payroll_preview
 
-# Create your tests here.
+
+class JalaliDateTests(TestCase):
+    def setUp(self):
+        self.employee = CustomUserFactory()
+
+    def test_gregorian_to_jalali(self):
+        self.assertEqual(gregorian_to_jalali(date(2024, 3, 20)), (1403, 1, 1))
+        self.assertEqual(gregorian_to_jalali(date(2025, 3, 20)), (1403, 12, 30))
+        self.assertEqual(gregorian_to_jalali(date(2000, 1, 1)), (1378, 10, 11))
+
+    def test_save_fills_jalali_columns(self):
+        salary = Salary.objects.create(employee=self.employee, date=date(2024, 3, 19), amount=Decimal('100'))
+        self.assertEqual((salary.jalali_year, salary.jalali_month), (1402, 12))
+
+        salary.date = date(2024, 4, 1)
+        salary.save(update_fields=['date'])
+        salary.refresh_from_db()
+        self.assertEqual((salary.jalali_year, salary.jalali_month), (1403, 1))
+
+    def test_backfill_command_fills_missing_rows(self):
+        expense = ExpenseInvoice.objects.create(amount=Decimal('50'), babet='اجاره', date=date(2024, 9, 23))
+        ExpenseInvoice.objects.filter(pk=expense.pk).update(jalali_year=None, jalali_month=None)
+
+        call_command('backfill_jalali_dates', stdout=StringIO())
+        expense.refresh_from_db()
+        self.assertEqual((expense.jalali_year, expense.jalali_month), (1403, 7))
+
+    def test_period_totals_group_by_jalali_month(self):
+        for day, amount in ((date(2024, 3, 19), '100'), (date(2024, 3, 20), '200'), (date(2024, 4, 1), '300')):
+            Salary.objects.create(employee=self.employee, date=day, amount=Decimal(amount))
+
+        totals = list(jalali_period_totals(Salary.objects.all(), 'amount'))
+        self.assertEqual(totals, [
+            {'jalali_year': 1402, 'jalali_month': 12, 'count': 1, 'total': Decimal('100')},
+            {'jalali_year': 1403, 'jalali_month': 1, 'count': 2, 'total': Decimal('500')},
+        ])
+
+
+class InvoiceSequenceTests(TestCase):
+    def create_income(self):
+        return IncomeInvoice.objects.create(amount=Decimal('10'), babet='فروش', date=date(2024, 5, 1))
+
+    def test_numbers_are_sequential_per_model(self):
+        self.assertEqual(self.create_income().invoice_number, 1000)
+        self.assertEqual(self.create_income().invoice_number, 1001)
+        expense = ExpenseInvoice.objects.create(amount=Decimal('10'), babet='اجاره', date=date(2024, 5, 1))
+        self.assertEqual(expense.invoice_number, 1000)
+
+    def test_reserved_block_is_skipped_by_later_inserts(self):
+        block = InvoiceSequence.reserve(IncomeInvoice, 5)
+        self.assertEqual(list(block), [1000, 1001, 1002, 1003, 1004])
+        self.assertEqual(self.create_income().invoice_number, 1005)
+
+    def test_missing_sequence_starts_after_existing_numbers(self):
+        self.create_income()
+        self.create_income()
+        InvoiceSequence.objects.filter(name=IncomeInvoice._meta.label_lower).delete()
+        self.assertEqual(self.create_income().invoice_number, 1002)
+
+    def test_sequence_name_matches_model_label(self):
+        self.assertEqual(
+            list(InvoiceSequence.objects.filter(name=SalesInvoice._meta.label_lower).values_list('last_number', flat=True)),
+            [999],
+        )
+
+
+class PayrollRunTests(TestCase):
+    def setUp(self):
+        self.first = CustomUserFactory(first_name='Ali')
+        self.second = CustomUserFactory(first_name='Sara')
+        Salary.objects.create(employee=self.first, date=date(2024, 4, 20), amount=Decimal('1000'))
+
+    def test_preview_suggests_last_amount_and_flags_existing_rows(self):
+        Salary.objects.create(employee=self.second, date=date(2024, 5, 21), amount=Decimal('700'))
+        employees = CustomUser.objects.filter(pk__in=[self.first.pk, self.second.pk])
+        preview = {employee.pk: employee for employee in payroll_preview(date(2024, 5, 21), employees)}
+        self.assertEqual(preview[self.first.pk].last_amount, Decimal('1000'))
+        self.assertFalse(preview[self.first.pk].has_salary)
+        self.assertTrue(preview[self.second.pk].has_salary)
+
+    def test_run_is_idempotent_per_employee_and_month(self):
+        amounts = {self.first.pk: Decimal('1100'), self.second.pk: Decimal('900')}
+        run, created = create_payroll_run(date(2024, 5, 30), amounts)
+        self.assertEqual(created, 2)
+        self.assertEqual(run.date, date(2024, 5, 21))
+        self.assertEqual((run.jalali_year, run.jalali_month), (1403, 3))
+        self.assertEqual(run.salaries.get(employee=self.second).jalali_month, 3)
+
+        again, created = create_payroll_run(date(2024, 6, 15), amounts)
+        self.assertEqual((again, created), (None, 0))
+        self.assertEqual(PayrollRun.objects.count(), 1)
+        self.assertEqual(Salary.objects.filter(jalali_year=1403, jalali_month=3).count(), 2)
+
+    def test_manual_salary_in_the_month_is_skipped(self):
+        Salary.objects.create(employee=self.second, date=date(2024, 6, 1), amount=Decimal('700'))
+        self.assertTrue(payroll_preview(date(2024, 6, 10), CustomUser.objects.filter(pk=self.second.pk))[0].has_salary)
+        run, created = create_payroll_run(date(2024, 6, 10), {self.first.pk: Decimal('1100'), self.second.pk: Decimal('900')})
+        self.assertEqual(created, 1)
+        self.assertEqual(run.salaries.get().employee, self.first)
+
+    def test_mark_paid_uses_one_update(self):
+        run, _created = create_payroll_run(date(2024, 5, 21), {self.first.pk: Decimal('1100'), self.second.pk: Decimal('900')})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(mark_payroll_runs_paid([run.pk]), 2)
+        salary_updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "finance_salary"')]
+        self.assertEqual(len(salary_updates), 1)
+        self.assertFalse(Salary.objects.filter(payroll_run=run, is_paid=False).exists())
+        self.assertFalse(Salary.objects.get(date=date(2024, 4, 20)).is_paid)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class PayrollRunAdminTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUserFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        self.employee = CustomUserFactory()
+        self.url = reverse('admin:finance_payrollrun_add')
+
+    def test_preview_then_confirm_creates_the_run(self):
+        data = {'date': '2024-05-21', 'employees': [self.employee.pk], 'preview': '1'}
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(self.url, data)
+        self.assertContains(response, f'name="amount_{self.employee.pk}"')
+        self.assertFalse(PayrollRun.objects.exists())
+
+        data.pop('preview')
+        response = self.client.post(self.url, {**data, 'confirm': '1', f'amount_{self.employee.pk}': '1,500'})
+        run = PayrollRun.objects.get()
+        self.assertRedirects(response, reverse('admin:finance_payrollrun_change', args=[run.pk]))
+        salary = run.salaries.get()
+        self.assertEqual((salary.employee, salary.amount, salary.created_by), (self.employee, Decimal('1500'), self.admin))
+
+        response = self.client.post(self.url, {**data, 'date': '2024-06-01', 'confirm': '1', f'amount_{self.employee.pk}': '1500'})
+        self.assertContains(response, 'حقوق این ماه قبلاً ثبت شده است')
+        self.assertEqual(PayrollRun.objects.count(), 1)
+
+        response = self.client.post(reverse('admin:finance_payrollrun_changelist'), {
+            'action': 'mark_runs_paid', '_selected_action': [run.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        salary.refresh_from_db()
+        self.assertTrue(salary.is_paid)
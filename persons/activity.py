@@ -0,0 +1,67 @@
+from decimal import Decimal
+from django.db.models import Count, DateField, F, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from .models import PERSON_ACTIVITY_FIELDS, Person, PurchaseInvoice, SalesInvoice
+
+
+ACTIVITY_SOURCES = {
+    SalesInvoice: ('buyer_id', 'sales_count', 'sales_total', 'sale_price'),
+    PurchaseInvoice: ('vendor_id', 'purchase_count', 'purchase_total', 'purchase_price'),
+}
+
+
+def invoice_activity_state(invoice):
+    person_field, _count_field, _total_field, price_field = ACTIVITY_SOURCES[type(invoice)]
+    return (
+        getattr(invoice, person_field),
+        Decimal(str(getattr(invoice, price_field) or 0)),
+        invoice.invoice_date,
+    )
+
+
+def add_invoice_activity(model, person_id, amount, invoice_date):
+    _person_field, count_field, total_field, _price_field = ACTIVITY_SOURCES[model]
+    day = Value(invoice_date, output_field=DateField())
+    Person.objects.filter(pk=person_id).update(**{
+        count_field: F(count_field) + 1,
+        total_field: F(total_field) + amount,
+        'first_invoice_date': Least(Coalesce('first_invoice_date', day), day),
+        'last_invoice_date': Greatest(Coalesce('last_invoice_date', day), day),
+    })
+
+
+def refresh_person_activity(person_ids):
+    # Removing an invoice can move the first/last dates, which cannot be
+    # derived from the counters alone, so affected persons are recomputed.
+    activity = {
+        person_id: {
+            'sales_count': 0, 'sales_total': 0, 'purchase_count': 0, 'purchase_total': 0,
+            'first_invoice_date': None, 'last_invoice_date': None,
+        }
+        for person_id in set(person_ids) if person_id
+    }
+    if not activity:
+        return
+
+    for model, (person_field, count_field, total_field, price_field) in ACTIVITY_SOURCES.items():
+        rows = (
+            model.objects.filter(**{f'{person_field}__in': activity})
+            .order_by().values(person_field)
+            .annotate(
+                invoices=Count('id'),
+                total=Sum(price_field),
+                first=Min('invoice_date'),
+                last=Max('invoice_date'),
+            )
+        )
+        for row in rows:
+            values = activity[row[person_field]]
+            values[count_field] = row['invoices']
+            values[total_field] = row['total'] or 0
+            values['first_invoice_date'] = min(filter(None, (values['first_invoice_date'], row['first'])))
+            values['last_invoice_date'] = max(filter(None, (values['last_invoice_date'], row['last'])))
+
+    Person.objects.bulk_update(
+        [Person(pk=person_id, **values) for person_id, values in activity.items()],
+        PERSON_ACTIVITY_FIELDS,
+    )
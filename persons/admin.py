@@ -1,32 +1,199 @@
-from django.contrib import admin
+import os
+from datetime import timedelta
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
 from django.utils.translation import gettext_lazy as _
 from django.db.models import Q
 from django.forms import ModelChoiceField
-from .models import Person, SalesInvoice, PurchaseInvoice
-from .forms import SalesInvoiceForm, PurchaseInvoiceForm
-from accounts.admin import employee_admin_site, OwnedAdminMixin
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from .importers import IMPORT_COLUMNS, IMPORT_FORMATS, import_invoices, read_import_rows
+from .duplicates import merge_persons
+from .models import DuplicatePersonCandidate, Person, SalesInvoice, PurchaseInvoice
+from .search import search_persons_queryset
+from .bulk import bulk_update_invoices
+from .forms import InvoiceBulkActionForm, SalesInvoiceForm, PurchaseInvoiceForm
+from accounts.admin import employee_admin_site, NormalizedSearchAdminMixin, OwnedAdminMixin
+from accounts.models import CustomUser
 import json
 
 
-class PersonAdmin(OwnedAdminMixin, admin.ModelAdmin):
+class InvoiceServiceDisplayMixin:
+    def get_service_display(self, obj):
+        if obj.catalog_service_id:
+            return obj.catalog_service.name
+        return obj.other_service_title or f'خدمت حذف شده ({obj.service_id})'
+    get_service_display.short_description = _('خدمت')
+    get_service_display.admin_order_field = 'catalog_service__name'
+
+
+class InvoiceBulkActionsMixin:
+    action_form = InvoiceBulkActionForm
+    actions = ['deactivate_invoices', 'reactivate_invoices', 'change_settlement_type', 'reassign_created_by']
+    
+    def run_bulk_update(self, request, queryset, changes):
+        report = bulk_update_invoices(queryset, changes)
+        self.message_user(
+            request,
+            _('%(updated)d فاکتور در %(chunks)d مرحله به‌روزرسانی شد') % {
+                'updated': report.updated, 'chunks': report.chunks,
+            },
+            messages.SUCCESS,
+        )
+    
+    def deactivate_invoices(self, request, queryset):
+        self.run_bulk_update(request, queryset, {'is_active': False})
+    deactivate_invoices.short_description = _('غیرفعال کردن فاکتورهای انتخاب‌شده')
+    deactivate_invoices.allowed_permissions = ('change',)
+    
+    def reactivate_invoices(self, request, queryset):
+        self.run_bulk_update(request, queryset, {'is_active': True})
+    reactivate_invoices.short_description = _('فعال کردن فاکتورهای انتخاب‌شده')
+    reactivate_invoices.allowed_permissions = ('change',)
+    
+    def change_settlement_type(self, request, queryset):
+        settlement_type = request.POST.get('settlement_type')
+        if settlement_type not in dict(self.model.SETTLEMENT_CHOICES):
+            self.message_user(request, _('نوع تسویه جدید را انتخاب کنید'), messages.WARNING)
+            return
+        self.run_bulk_update(request, queryset, {'settlement_type': settlement_type})
+    change_settlement_type.short_description = _('تغییر نوع تسویه فاکتورهای انتخاب‌شده')
+    change_settlement_type.allowed_permissions = ('change',)
+    
+    def reassign_created_by(self, request, queryset):
+        user_id = request.POST.get('created_by', '')
+        user = None
+        if user_id.isdigit():
+            user = CustomUser.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            self.message_user(request, _('کاربر ثبت‌کننده جدید را انتخاب کنید'), messages.WARNING)
+            return
+        self.run_bulk_update(request, queryset, {'created_by': user})
+    reassign_created_by.short_description = _('تغییر کاربر ثبت‌کننده فاکتورهای انتخاب‌شده')
+    reassign_created_by.allowed_permissions = ('change',)
+
+
+class InvoiceImportAdminMixin:
+    invoice_import_type = None
+    change_list_template = 'admin/persons/invoice_change_list.html'
+    
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        import_urls = [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_view),
+                name='%s_%s_import' % info,
+            ),
+        ]
+        return import_urls + super().get_urls()
+    
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        if self.has_add_permission(request):
+            info = self.model._meta.app_label, self.model._meta.model_name
+            extra_context['import_url'] = reverse(
+                '%s:%s_%s_import' % ((self.admin_site.name,) + info)
+            )
+        return super().changelist_view(request, extra_context)
+    
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        
+        report = None
+        error = None
+        if request.method == 'POST':
+            upload = request.FILES.get('file')
+            if not upload:
+                error = _('فایلی انتخاب نشده است')
+            else:
+                file_format = os.path.splitext(upload.name)[1].lstrip('.').lower()
+                try:
+                    report = import_invoices(
+                        read_import_rows(upload, file_format),
+                        self.invoice_import_type,
+                        user=request.user,
+                    )
+                except ValueError as exc:
+                    error = str(exc)
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'title': _('ورود گروهی فاکتورها'),
+            'opts': self.model._meta,
+            'columns': IMPORT_COLUMNS,
+            'formats': IMPORT_FORMATS,
+            'report': report,
+            'error': error,
+        }
+        response = TemplateResponse(
+            request,
+            'admin/persons/invoice_import.html',
+            context,
+        )
+        response['Content-Type'] = 'text/html; charset=utf-8'
+        return response
+
+
+class PersonSearchAdminMixin:
+    def get_search_results(self, request, queryset, search_term):
+        # Changelist and autocomplete searches both go through the indexed
+        # person search; autocomplete pickers only offer active persons.
+        if 'field_name' in request.GET:
+            queryset = queryset.filter(is_active=True)
+        if not search_term.strip():
+            return queryset, False
+        return search_persons_queryset(queryset, search_term), False
+
+
+class CustomerActivityFilter(admin.SimpleListFilter):
+    title = _('فعالیت مشتری')
+    parameter_name = 'activity'
+    dormant_after_days = 180
+    
+    def lookups(self, request, model_admin):
+        return [
+            ('active', _('فعال در ۶ ماه اخیر')),
+            ('dormant', _('بدون فاکتور در ۶ ماه اخیر')),
+            ('never', _('بدون فاکتور')),
+        ]
+    
+    def queryset(self, request, queryset):
+        since = timezone.localdate() - timedelta(days=self.dormant_after_days)
+        if self.value() == 'active':
+            return queryset.filter(last_invoice_date__gte=since)
+        if self.value() == 'dormant':
+            return queryset.filter(last_invoice_date__lt=since)
+        if self.value() == 'never':
+            return queryset.filter(last_invoice_date__isnull=True)
+        return queryset
+
+
+class PersonAdmin(PersonSearchAdminMixin, NormalizedSearchAdminMixin, OwnedAdminMixin, admin.ModelAdmin):
     list_display = [
         'get_full_name',
         'national_id',
         'phone_number',
+        'sales_count',
+        'sales_total',
+        'purchase_total',
+        'last_invoice_date',
         'is_active',
         'created_at',
     ]
     
     list_filter = [
         'is_active',
+        CustomerActivityFilter,
         'created_at',
     ]
     
     search_fields = [
-        'first_name',
-        'last_name',
-        'national_id',
-        'phone_number',
+        '^name_norm',
+        '^national_id_norm',
+        '^phone_norm',
     ]
     
     fieldsets = (
@@ -55,6 +222,14 @@ class PersonAdmin(OwnedAdminMixin, admin.ModelAdmin):
                 'is_active',
             )
         }),
+        (_('فعالیت'), {
+            'fields': (
+                ('sales_count', 'sales_total'),
+                ('purchase_count', 'purchase_total'),
+                ('first_invoice_date', 'last_invoice_date'),
+            ),
+            'classes': ('collapse',)
+        }),
         (_('تاریخ‌های مهم'), {
             'fields': (
                 'created_at',
@@ -65,20 +240,97 @@ class PersonAdmin(OwnedAdminMixin, admin.ModelAdmin):
     )
     
     readonly_fields = [
+        'sales_count',
+        'sales_total',
+        'purchase_count',
+        'purchase_total',
+        'first_invoice_date',
+        'last_invoice_date',
         'created_at',
         'updated_at',
     ]
     
     ordering = ['-created_at']
     
+    actions = ['merge_selected_persons']
+    
     def get_full_name(self, obj):
         return obj.get_full_name()
     get_full_name.short_description = _('نام کامل')
+    
+    def merge_selected_persons(self, request, queryset):
+        persons = list(queryset.order_by('pk'))
+        if len(persons) < 2:
+            self.message_user(request, _('برای ادغام حداقل دو شخص را انتخاب کنید'), messages.WARNING)
+            return
+        merged = merge_persons(persons[0], persons[1:])
+        self.message_user(
+            request,
+            _('%(count)d شخص در «%(target)s» ادغام شد') % {'count': merged, 'target': persons[0]},
+            messages.SUCCESS,
+        )
+    merge_selected_persons.short_description = _('ادغام اشخاص انتخاب‌شده در قدیمی‌ترین مورد')
+    merge_selected_persons.allowed_permissions = ('change', 'delete')
+
+
+class DuplicatePersonCandidateAdmin(admin.ModelAdmin):
+    list_display = [
+        'person_a',
+        'get_person_a_national_id',
+        'person_b',
+        'get_person_b_national_id',
+        'score',
+        'reasons',
+        'status',
+    ]
+    
+    list_filter = [
+        'status',
+    ]
+    
+    list_select_related = ['person_a', 'person_b']
+    
+    ordering = ['-score']
+    
+    actions = ['merge_candidates', 'dismiss_candidates']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_person_a_national_id(self, obj):
+        return obj.person_a.national_id
+    get_person_a_national_id.short_description = _('کد ملی شخص اول')
+    
+    def get_person_b_national_id(self, obj):
+        return obj.person_b.national_id
+    get_person_b_national_id.short_description = _('کد ملی شخص دوم')
+    
+    def merge_candidates(self, request, queryset):
+        merged = 0
+        for candidate in queryset.filter(status=DuplicatePersonCandidate.STATUS_PENDING):
+            # Earlier merges in this loop may already have removed either side.
+            if Person.objects.filter(pk__in=[candidate.person_a_id, candidate.person_b_id]).count() == 2:
+                merged += merge_persons(candidate.person_a, [candidate.person_b])
+        self.message_user(request, _('%d شخص تکراری ادغام شد') % merged, messages.SUCCESS)
+    merge_candidates.short_description = _('ادغام شخص دوم در شخص اول')
+    merge_candidates.allowed_permissions = ('delete',)
+    
+    def dismiss_candidates(self, request, queryset):
+        dismissed = queryset.update(status=DuplicatePersonCandidate.STATUS_DISMISSED)
+        self.message_user(request, _('%d مورد رد شد') % dismissed, messages.SUCCESS)
+    dismiss_candidates.short_description = _('رد موارد انتخاب‌شده')
+    dismiss_candidates.allowed_permissions = ('delete',)
 
 
-class SalesInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
+class SalesInvoiceAdmin(InvoiceBulkActionsMixin, InvoiceImportAdminMixin, InvoiceServiceDisplayMixin, NormalizedSearchAdminMixin, OwnedAdminMixin, admin.ModelAdmin):
+    invoice_import_type = 'sales'
     form = SalesInvoiceForm
     
+    autocomplete_fields = ['buyer']
+    
     list_display = [
         'invoice_number',
         'get_buyer_name',
@@ -99,9 +351,8 @@ class SalesInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     
     search_fields = [
         'invoice_number',
-        'buyer__first_name',
-        'buyer__last_name',
-        'buyer__national_id',
+        '^buyer__name_norm',
+        '^buyer__national_id_norm',
     ]
     
     fieldsets = (
@@ -150,11 +401,14 @@ class SalesInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     
     ordering = ['-invoice_date', '-invoice_number']
     
+    list_select_related = ['buyer', 'catalog_service']
+    
     class Media:
         css = {
             'all': ('css/service_modal.css',)
         }
         js = (
+            'js/service_catalog.js',
             'js/service_modal.js',
             'js/sales_invoice_admin.js',
         )
@@ -171,16 +425,9 @@ class SalesInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     def get_buyer_name(self, obj):
         return obj.buyer.get_full_name()
     get_buyer_name.short_description = _('خریدار')
-    
-    def get_service_display(self, obj):
-        service = obj.get_service_object()
-        if service:
-            return service.name
-        return obj.other_service_title or f'خدمت حذف شده ({obj.service_id})'
-    get_service_display.short_description = _('خدمت')
 
 
-class EmployeePersonAdmin(OwnedAdminMixin, admin.ModelAdmin):
+class EmployeePersonAdmin(PersonSearchAdminMixin, NormalizedSearchAdminMixin, OwnedAdminMixin, admin.ModelAdmin):
     list_display = [
         'get_full_name',
         'national_id',
@@ -193,10 +440,9 @@ class EmployeePersonAdmin(OwnedAdminMixin, admin.ModelAdmin):
     ]
     
     search_fields = [
-        'first_name',
-        'last_name',
-        'national_id',
-        'phone_number',
+        '^name_norm',
+        '^national_id_norm',
+        '^phone_norm',
     ]
     
     fieldsets = (
@@ -236,9 +482,11 @@ class EmployeePersonAdmin(OwnedAdminMixin, admin.ModelAdmin):
     get_full_name.short_description = _('نام کامل')
 
 
-class EmployeeSalesInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
+class EmployeeSalesInvoiceAdmin(InvoiceServiceDisplayMixin, NormalizedSearchAdminMixin, OwnedAdminMixin, admin.ModelAdmin):
     form = SalesInvoiceForm
     
+    autocomplete_fields = ['buyer']
+    
     list_display = [
         'invoice_number',
         'get_buyer_name',
@@ -256,9 +504,8 @@ class EmployeeSalesInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     
     search_fields = [
         'invoice_number',
-        'buyer__first_name',
-        'buyer__last_name',
-        'buyer__national_id',
+        '^buyer__name_norm',
+        '^buyer__national_id_norm',
     ]
     
     fieldsets = (
@@ -295,11 +542,14 @@ class EmployeeSalesInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     
     ordering = ['-invoice_date', '-invoice_number']
     
+    list_select_related = ['buyer', 'catalog_service']
+    
     class Media:
         css = {
             'all': ('css/service_modal.css',)
         }
         js = (
+            'js/service_catalog.js',
             'js/service_modal.js',
             'js/sales_invoice_admin.js',
         )
@@ -315,18 +565,14 @@ class EmployeeSalesInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     def get_buyer_name(self, obj):
         return obj.buyer.get_full_name()
     get_buyer_name.short_description = _('خریدار')
-    
-    def get_service_display(self, obj):
-        service = obj.get_service_object()
-        if service:
-            return service.name
-        return obj.other_service_title or f'خدمت حذف شده ({obj.service_id})'
-    get_service_display.short_description = _('خدمت')
 
 
-class PurchaseInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
+class PurchaseInvoiceAdmin(InvoiceBulkActionsMixin, InvoiceImportAdminMixin, InvoiceServiceDisplayMixin, NormalizedSearchAdminMixin, OwnedAdminMixin, admin.ModelAdmin):
+    invoice_import_type = 'purchase'
     form = PurchaseInvoiceForm
     
+    autocomplete_fields = ['vendor']
+    
     list_display = [
         'invoice_number',
         'get_vendor_name',
@@ -347,9 +593,8 @@ class PurchaseInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     
     search_fields = [
         'invoice_number',
-        'vendor__first_name',
-        'vendor__last_name',
-        'vendor__national_id',
+        '^vendor__name_norm',
+        '^vendor__national_id_norm',
     ]
     
     fieldsets = (
@@ -398,11 +643,14 @@ class PurchaseInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     
     ordering = ['-invoice_date', '-invoice_number']
     
+    list_select_related = ['vendor', 'catalog_service']
+    
     class Media:
         css = {
             'all': ('css/service_modal.css',)
         }
         js = (
+            'js/service_catalog.js',
             'js/service_modal.js',
             'js/purchase_invoice_admin.js',
         )
@@ -415,18 +663,13 @@ class PurchaseInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     def get_vendor_name(self, obj):
         return obj.vendor.get_full_name()
     get_vendor_name.short_description = _('فروشنده')
-    
-    def get_service_display(self, obj):
-        service = obj.get_service_object()
-        if service:
-            return service.name
-        return obj.other_service_title or f'خدمت حذف شده ({obj.service_id})'
-    get_service_display.short_description = _('خدمت')
 
 
-class EmployeePurchaseInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
+class EmployeePurchaseInvoiceAdmin(InvoiceServiceDisplayMixin, NormalizedSearchAdminMixin, OwnedAdminMixin, admin.ModelAdmin):
     form = PurchaseInvoiceForm
     
+    autocomplete_fields = ['vendor']
+    
     list_display = [
         'invoice_number',
         'get_vendor_name',
@@ -444,9 +687,8 @@ class EmployeePurchaseInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     
     search_fields = [
         'invoice_number',
-        'vendor__first_name',
-        'vendor__last_name',
-        'vendor__national_id',
+        '^vendor__name_norm',
+        '^vendor__national_id_norm',
     ]
     
     fieldsets = (
@@ -483,11 +725,14 @@ class EmployeePurchaseInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     
     ordering = ['-invoice_date', '-invoice_number']
     
+    list_select_related = ['vendor', 'catalog_service']
+    
     class Media:
         css = {
             'all': ('css/service_modal.css',)
         }
         js = (
+            'js/service_catalog.js',
             'js/service_modal.js',
             'js/purchase_invoice_admin.js',
         )
@@ -503,18 +748,12 @@ class EmployeePurchaseInvoiceAdmin(OwnedAdminMixin, admin.ModelAdmin):
     def get_vendor_name(self, obj):
         return obj.vendor.get_full_name()
     get_vendor_name.short_description = _('فروشنده')
-    
-    def get_service_display(self, obj):
-        service = obj.get_service_object()
-        if service:
-            return service.name
-        return obj.other_service_title or f'خدمت حذف شده ({obj.service_id})'
-    get_service_display.short_description = _('خدمت')
 
 
 admin.site.register(Person, PersonAdmin)
 admin.site.register(SalesInvoice, SalesInvoiceAdmin)
 admin.site.register(PurchaseInvoice, PurchaseInvoiceAdmin)
+admin.site.register(DuplicatePersonCandidate, DuplicatePersonCandidateAdmin)
 
 employee_admin_site.register(Person, EmployeePersonAdmin)
 employee_admin_site.register(SalesInvoice, EmployeeSalesInvoiceAdmin)
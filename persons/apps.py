@@ -5,3 +5,6 @@ class PersonsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'persons'
     verbose_name = 'اشخاص و فاکتورهای فروش'
+
+    def ready(self):
+        from . import signals  # noqa: F401
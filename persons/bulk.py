@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.utils import timezone
+from .activity import ACTIVITY_SOURCES
+from .signals import invoices_bulk_updated
+
+
+BULK_ACTION_CHUNK_SIZE = 1000
+
+BULK_STATE_FIELDS = ('invoice_date', 'service_category', 'settlement_type', 'created_by')
+
+
+class BulkUpdateReport:
+    def __init__(self):
+        self.updated = 0
+        self.chunks = 0
+
+
+def bulk_update_invoices(queryset, changes, chunk_size=BULK_ACTION_CHUNK_SIZE):
+    # Walks the selection by primary key and updates one chunk per short
+    # transaction, so neither memory nor lock time grows with the selection.
+    # Receivers get the chunk's previous state and only adjust what the
+    # changed fields affect.
+    model = queryset.model
+    person_field, _count_field, _total_field, price_field = ACTIVITY_SOURCES[model]
+    selection = queryset.select_related(None).order_by('pk').only(
+        *BULK_STATE_FIELDS, person_field.removesuffix('_id'), price_field,
+    )
+    report = BulkUpdateReport()
+    last_pk = 0
+    while True:
+        invoices = list(selection.filter(pk__gt=last_pk)[:chunk_size])
+        if not invoices:
+            break
+        last_pk = invoices[-1].pk
+
+        with transaction.atomic():
+            report.updated += model.objects.filter(pk__in=[invoice.pk for invoice in invoices]).update(
+                **changes, updated_at=timezone.now(),
+            )
+            invoices_bulk_updated.send(sender=model, invoices=invoices, changes=changes)
+        report.chunks += 1
+    return report
@@ -0,0 +1,47 @@
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from reports.versioning import get_data_versions
+
+
+def ownership_scope(user):
+    if user.role == 'admin' or user.is_superuser:
+        return 'all'
+    return f'user-{user.pk}'
+
+
+def autocomplete_cache_key(request, version_keys):
+    versions = get_data_versions(*version_keys)
+    parts = [request.path, ownership_scope(request.user), request.GET.urlencode(), *map(str, versions)]
+    return 'autocomplete:' + hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def cached_autocomplete(*version_keys):
+    # The key only changes when one of the data versions does, so a cached
+    # body or a client's ETag is valid until the underlying rows change.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            key = autocomplete_cache_key(request, version_keys)
+            etag = quote_etag(key.split(':', 1)[1])
+            content = cache.get(key)
+            if content is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(key, response.content, settings.AUTOCOMPLETE_CACHE_TIMEOUT)
+            else:
+                response = HttpResponse(content, content_type='application/json')
+
+            response['ETag'] = etag
+            patch_cache_control(response, private=True, max_age=settings.AUTOCOMPLETE_MAX_AGE)
+            return get_conditional_response(request, etag=etag, response=response)
+        return wrapper
+    return decorator
@@ -0,0 +1,165 @@
+from collections import defaultdict
+from decimal import Decimal
+from functools import partial
+from itertools import combinations, islice
+from django.db import transaction
+from django.utils.translation import gettext as _
+from reports.models import CustomerReport
+from .models import DuplicatePersonCandidate, Person, PurchaseInvoice, SalesInvoice
+from .signals import invoices_bulk_changed
+
+
+DUPLICATE_SCORE_THRESHOLD = Decimal('0.5')
+
+MAX_BLOCK_SIZE = 50
+
+PHONE_SUFFIX_LENGTH = 7
+
+NATIONAL_ID_LENGTH = 10
+
+CANDIDATE_BATCH_SIZE = 1000
+
+BLOCKING_FIELDS = ('pk', 'name_norm', 'national_id_norm', 'phone_e164', 'phone_optional_e164')
+
+
+def _name_keys(row):
+    tokens = row[1].split()
+    if tokens:
+        yield ' '.join(sorted(tokens))
+
+
+def _phone_keys(row):
+    for phone in {row[3], row[4]}:
+        if phone:
+            yield phone[-PHONE_SUFFIX_LENGTH:]
+
+
+def _national_id_keys(row, position):
+    # Masking one digit puts national ids that differ by a single typo in
+    # that position into the same block.
+    national_id = row[2]
+    if len(national_id) > position:
+        yield national_id[:position] + '*' + national_id[position + 1:]
+
+
+BLOCKING_PASSES = (
+    _name_keys,
+    _phone_keys,
+    *(partial(_national_id_keys, position=position) for position in range(NATIONAL_ID_LENGTH)),
+)
+
+
+def candidate_pairs(max_block_size=MAX_BLOCK_SIZE):
+    # Each pass streams the persons table once and only compares persons
+    # inside the same block; oversized blocks (very common names) are skipped.
+    pairs = set()
+    for blocking_keys in BLOCKING_PASSES:
+        blocks = defaultdict(list)
+        rows = Person.objects.order_by().values_list(*BLOCKING_FIELDS).iterator(chunk_size=5000)
+        for row in rows:
+            for key in blocking_keys(row):
+                blocks[key].append(row[0])
+        for person_ids in blocks.values():
+            if 1 < len(person_ids) <= max_block_size:
+                pairs.update(combinations(sorted(person_ids), 2))
+    return pairs
+
+
+def edit_distance(first, second):
+    # Optimal string alignment distance, so adjacent transpositions count once.
+    distances = [
+        [i + j if i * j == 0 else 0 for j in range(len(second) + 1)]
+        for i in range(len(first) + 1)
+    ]
+    for i in range(1, len(first) + 1):
+        for j in range(1, len(second) + 1):
+            cost = first[i - 1] != second[j - 1]
+            distances[i][j] = min(
+                distances[i - 1][j] + 1,
+                distances[i][j - 1] + 1,
+                distances[i - 1][j - 1] + cost,
+            )
+            if i > 1 and j > 1 and first[i - 1] == second[j - 2] and first[i - 2] == second[j - 1]:
+                distances[i][j] = min(distances[i][j], distances[i - 2][j - 2] + 1)
+    return distances[-1][-1]
+
+
+def _phone_suffixes(phones):
+    return {phone[-PHONE_SUFFIX_LENGTH:] for phone in phones}
+
+
+def score_pair(first, second):
+    score = Decimal('0')
+    reasons = []
+
+    distance = edit_distance(first['national_id_norm'], second['national_id_norm'])
+    if distance == 1:
+        score += Decimal('0.4')
+        reasons.append(_('کد ملی با یک رقم تفاوت'))
+    elif distance == 2:
+        score += Decimal('0.2')
+        reasons.append(_('کد ملی با دو رقم تفاوت'))
+
+    first_tokens = set(first['name_norm'].split())
+    second_tokens = set(second['name_norm'].split())
+    if first_tokens and first_tokens == second_tokens:
+        score += Decimal('0.35')
+        reasons.append(_('نام یکسان'))
+    elif first_tokens and len(first_tokens & second_tokens) * 2 >= len(first_tokens | second_tokens):
+        score += Decimal('0.2')
+        reasons.append(_('نام مشابه'))
+
+    first_phones = {first['phone_e164'], first['phone_optional_e164']} - {''}
+    second_phones = {second['phone_e164'], second['phone_optional_e164']} - {''}
+    if first_phones & second_phones:
+        score += Decimal('0.35')
+        reasons.append(_('شماره تماس یکسان'))
+    elif _phone_suffixes(first_phones) & _phone_suffixes(second_phones):
+        score += Decimal('0.15')
+        reasons.append(_('ارقام پایانی شماره تماس یکسان'))
+
+    return min(score, Decimal('1')), '، '.join(reasons)
+
+
+def find_duplicate_persons(threshold=DUPLICATE_SCORE_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+    pairs = iter(sorted(candidate_pairs(max_block_size)))
+    found = 0
+    while True:
+        batch = list(islice(pairs, CANDIDATE_BATCH_SIZE))
+        if not batch:
+            break
+
+        person_ids = {person_id for pair in batch for person_id in pair}
+        persons = {
+            row['pk']: row
+            for row in Person.objects.filter(pk__in=person_ids).values(*BLOCKING_FIELDS)
+        }
+        candidates = []
+        for first_id, second_id in batch:
+            score, reasons = score_pair(persons[first_id], persons[second_id])
+            if score >= threshold:
+                candidates.append(DuplicatePersonCandidate(
+                    person_a_id=first_id,
+                    person_b_id=second_id,
+                    score=score,
+                    reasons=reasons[:255],
+                ))
+        # Pairs already in the queue keep their review status.
+        DuplicatePersonCandidate.objects.bulk_create(candidates, ignore_conflicts=True)
+        found += len(candidates)
+    return found
+
+
+def merge_persons(target, duplicates):
+    duplicate_ids = [person.pk for person in duplicates if person.pk != target.pk]
+    if not duplicate_ids:
+        return 0
+
+    with transaction.atomic():
+        SalesInvoice.objects.filter(buyer_id__in=duplicate_ids).update(buyer=target)
+        PurchaseInvoice.objects.filter(vendor_id__in=duplicate_ids).update(vendor=target)
+        CustomerReport.objects.filter(customer_id__in=duplicate_ids).update(customer=target)
+        Person.objects.filter(pk__in=duplicate_ids).delete()
+        for model in (SalesInvoice, PurchaseInvoice):
+            invoices_bulk_changed.send(sender=model, days=set(), persons={target.pk})
+    return len(duplicate_ids)
@@ -1,8 +1,13 @@
 from django import forms
+from django.contrib import admin
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.utils.translation import gettext_lazy as _
+from accounts.models import CustomUser
 from .models import Person, SalesInvoice, PurchaseInvoice
 from datetime import date
 from django.urls import reverse
+from services.catalog import SERVICE_MODELS, get_service_catalog
 
 
 class PersonForm(forms.ModelForm):
@@ -95,9 +100,6 @@ class SalesInvoiceForm(forms.ModelForm):
             'is_active',
         ]
         widgets = {
-            'buyer': forms.Select(attrs={
-                'class': 'form-control',
-            }),
             'invoice_date': forms.DateInput(attrs={
                 'class': 'form-control',
                 'type': 'date',
@@ -140,31 +142,8 @@ class SalesInvoiceForm(forms.ModelForm):
             self.fields['service_id'].initial = str(self.instance.service_id)
     
     def populate_service_choices(self, service_type):
-        from services.models import (
-            CommercialService,
-            RegistrationService,
-            LegalService,
-            LeasingService,
-            LoanService
-        )
-        
-        model_map = {
-            'commercial': CommercialService,
-            'registration': RegistrationService,
-            'legal': LegalService,
-            'leasing': LeasingService,
-            'loan': LoanService,
-        }
-        
-        model = model_map.get(service_type)
-        if model:
-            choices = [('', '---------')]
-            if service_type == 'loan':
-                for service in model.objects.filter(is_active=True).order_by('bank_name', 'plan_name'):
-                    choices.append((str(service.id), str(service)))
-            else:
-                for service in model.objects.filter(is_active=True).order_by('name'):
-                    choices.append((str(service.id), service.name))
+        if service_type in SERVICE_MODELS:
+            choices = [('', '---------')] + get_service_catalog().choices(service_type)
             self.fields['service_id'].widget.choices = choices
     
     def clean(self):
@@ -203,9 +182,6 @@ class PurchaseInvoiceForm(forms.ModelForm):
             'is_active',
         ]
         widgets = {
-            'vendor': forms.Select(attrs={
-                'class': 'form-control',
-            }),
             'invoice_date': forms.DateInput(attrs={
                 'class': 'form-control',
                 'type': 'date',
@@ -248,31 +224,8 @@ class PurchaseInvoiceForm(forms.ModelForm):
             self.fields['service_id'].initial = str(self.instance.service_id)
     
     def populate_service_choices(self, service_type):
-        from services.models import (
-            CommercialService,
-            RegistrationService,
-            LegalService,
-            LeasingService,
-            LoanService
-        )
-        
-        model_map = {
-            'commercial': CommercialService,
-            'registration': RegistrationService,
-            'legal': LegalService,
-            'leasing': LeasingService,
-            'loan': LoanService,
-        }
-        
-        model = model_map.get(service_type)
-        if model:
-            choices = [('', '---------')]
-            if service_type == 'loan':
-                for service in model.objects.filter(is_active=True).order_by('bank_name', 'plan_name'):
-                    choices.append((str(service.id), str(service)))
-            else:
-                for service in model.objects.filter(is_active=True).order_by('name'):
-                    choices.append((str(service.id), service.name))
+        if service_type in SERVICE_MODELS:
+            choices = [('', '---------')] + get_service_catalog().choices(service_type)
             self.fields['service_id'].widget.choices = choices
     
     def clean(self):
@@ -283,3 +236,17 @@ class PurchaseInvoiceForm(forms.ModelForm):
         elif not service_id or (isinstance(service_id, str) and service_id == ''):
             cleaned_data['service_id'] = None
         return cleaned_data
+
+
+class InvoiceBulkActionForm(ActionForm):
+    settlement_type = forms.ChoiceField(
+        required=False,
+        choices=[('', _('نوع تسویه جدید'))] + SalesInvoice.SETTLEMENT_CHOICES,
+        label=_('نوع تسویه'),
+    )
+    created_by = forms.ModelChoiceField(
+        required=False,
+        queryset=CustomUser.objects.filter(is_active=True),
+        widget=AutocompleteSelect(SalesInvoice._meta.get_field('created_by'), admin.site),
+        label=_('کاربر ثبت‌کننده'),
+    )
@@ -0,0 +1,206 @@
+import csv
+import io
+import logging
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils.translation import gettext as _
+from accounts.normalization import normalize_digits
+from finance.models import InvoiceSequence
+from services.models import ServiceCatalogEntry
+from .models import Person, SalesInvoice, PurchaseInvoice
+from .signals import invoices_bulk_changed
+
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+
+IMPORT_FORMATS = ('csv', 'xlsx')
+
+IMPORT_COLUMNS = (
+    'national_id', 'invoice_date', 'service_category', 'service_id',
+    'other_service_title', 'price', 'settlement_type', 'description',
+)
+
+REQUIRED_COLUMNS = ('national_id', 'invoice_date', 'service_category', 'price', 'settlement_type')
+
+INVOICE_IMPORT_TYPES = {
+    'sales': (SalesInvoice, 'buyer', 'sale_price'),
+    'purchase': (PurchaseInvoice, 'vendor', 'purchase_price'),
+}
+
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def reject(self, row_number, message):
+        self.errors.append((row_number, message))
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+
+def read_import_rows(file, file_format):
+    if file_format not in IMPORT_FORMATS:
+        raise ValueError(_('فرمت فایل پشتیبانی نمی‌شود'))
+
+    if file_format == 'xlsx':
+        from reports.xlsx import iter_xlsx_rows
+        rows = iter_xlsx_rows(file)
+    else:
+        rows = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+
+    header = [column.strip().lower() for column in next(rows, [])]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(_('ستون‌های الزامی وجود ندارند: %s') % ', '.join(missing))
+
+    for row_number, values in enumerate(rows, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        yield row_number, dict(zip(header, (value.strip() for value in values)))
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return EXCEL_EPOCH + timedelta(days=int(float(value)))
+    except (ValueError, OverflowError):
+        raise ValueError(_('تاریخ نامعتبر است: %s') % value)
+
+
+def _clean_row(row, model):
+    if not row.get('national_id'):
+        raise ValueError(_('کد ملی خالی است'))
+
+    service_category = row.get('service_category', '')
+    if service_category not in dict(model.SERVICE_TYPE_CHOICES):
+        raise ValueError(_('دسته‌بندی خدمت نامعتبر است: %s') % service_category)
+
+    settlement_type = row.get('settlement_type', '')
+    if settlement_type not in dict(model.SETTLEMENT_CHOICES):
+        raise ValueError(_('نوع تسویه نامعتبر است: %s') % settlement_type)
+
+    try:
+        price = Decimal(row.get('price', '').replace(',', ''))
+    except InvalidOperation:
+        raise ValueError(_('مبلغ نامعتبر است: %s') % row.get('price', ''))
+    if not price.is_finite():
+        raise ValueError(_('مبلغ نامعتبر است: %s') % row.get('price', ''))
+    if price < 0:
+        raise ValueError(_('مبلغ نمی‌تواند منفی باشد'))
+
+    service_id = row.get('service_id') or None
+    if service_id is not None:
+        try:
+            service_id = int(float(service_id))
+        except (ValueError, OverflowError):
+            raise ValueError(_('شناسه خدمت نامعتبر است: %s') % service_id)
+
+    return {
+        'national_id': row['national_id'],
+        'invoice_date': _parse_date(row.get('invoice_date', '')),
+        'service_category': service_category,
+        'service_id': service_id,
+        'other_service_title': row.get('other_service_title') or None,
+        'price': price,
+        'settlement_type': settlement_type,
+        'description': row.get('description') or None,
+    }
+
+
+def _field_errors(exc):
+    return '؛ '.join(
+        f'{field}: {" ".join(messages)}' for field, messages in exc.message_dict.items()
+    )
+
+
+def _import_chunk(chunk, invoice_type, user, report):
+    model, person_field, price_field = INVOICE_IMPORT_TYPES[invoice_type]
+
+    cleaned = []
+    for row_number, row in chunk:
+        try:
+            cleaned.append((row_number, _clean_row(row, model)))
+        except ValueError as exc:
+            report.reject(row_number, str(exc))
+
+    people = dict(
+        Person.objects.filter(
+            national_id_norm__in={normalize_digits(data['national_id']) for _row, data in cleaned}
+        ).values_list('national_id_norm', 'pk')
+    )
+
+    catalog = ServiceCatalogEntry.entry_ids((data['service_category'], data['service_id']) for _row, data in cleaned)
+    valid = []
+    for row_number, data in cleaned:
+        person_id = people.get(normalize_digits(data['national_id']))
+        if person_id is None:
+            report.reject(row_number, _('شخصی با کد ملی %s یافت نشد') % data['national_id'])
+            continue
+        invoice = model(
+            invoice_date=data['invoice_date'],
+            service_category=data['service_category'],
+            service_id=data['service_id'],
+            catalog_service_id=catalog.get((data['service_category'], data['service_id'])),
+            other_service_title=data['other_service_title'],
+            settlement_type=data['settlement_type'],
+            description=data['description'],
+            created_by=user,
+            **{f'{person_field}_id': person_id, price_field: data['price']},
+        )
+        # Field limits (max_digits, max_length, integer ranges) are checked
+        # here so they become rejected rows instead of database errors. The
+        # relations are known to exist and would cost a query per row.
+        try:
+            invoice.clean_fields(exclude=[person_field, 'created_by', 'catalog_service', 'invoice_number'])
+        except ValidationError as exc:
+            report.reject(row_number, _field_errors(exc))
+            continue
+        invoice.fill_jalali_date()
+        valid.append((row_number, invoice))
+    if not valid:
+        return
+
+    # Numbers are reserved inside the chunk's transaction, so a chunk that
+    # fails leaves neither invoices nor a gap in the sequence behind.
+    invoices = [invoice for _row, invoice in valid]
+    try:
+        with transaction.atomic():
+            for invoice_number, invoice in zip(InvoiceSequence.reserve(model, len(invoices)), invoices):
+                invoice.invoice_number = invoice_number
+            model.objects.bulk_create(invoices, batch_size=IMPORT_CHUNK_SIZE)
+            invoices_bulk_changed.send(
+                sender=model,
+                days={invoice.invoice_date for invoice in invoices},
+                persons={getattr(invoice, f'{person_field}_id') for invoice in invoices},
+            )
+    except DatabaseError:
+        logger.exception('Invoice import chunk failed')
+        for row_number, _invoice in valid:
+            report.reject(row_number, _('ذخیره این ردیف در پایگاه داده ناموفق بود'))
+        return
+    report.created += len(invoices)
+
+
+def import_invoices(rows, invoice_type, user=None, chunk_size=IMPORT_CHUNK_SIZE):
+    report = ImportReport()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        _import_chunk(chunk, invoice_type, user, report)
+    report.errors.sort()
+    return report
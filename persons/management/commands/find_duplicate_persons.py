@@ -0,0 +1,28 @@
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from persons.duplicates import DUPLICATE_SCORE_THRESHOLD, MAX_BLOCK_SIZE, find_duplicate_persons
+
+
+class Command(BaseCommand):
+    help = 'Detect probable duplicate persons and add them to the review queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=Decimal,
+            default=DUPLICATE_SCORE_THRESHOLD,
+            help='Minimum similarity score for a pair to be queued'
+        )
+        parser.add_argument(
+            '--max-block-size',
+            type=int,
+            default=MAX_BLOCK_SIZE,
+            help='Skip blocking groups larger than this to keep the job linear'
+        )
+
+    def handle(self, *args, **options):
+        found = find_duplicate_persons(
+            threshold=options['threshold'],
+            max_block_size=options['max_block_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'{found} candidate pairs queued for review'))
@@ -0,0 +1,76 @@
+import csv
+import os
+from django.core.management.base import BaseCommand, CommandError
+from accounts.models import CustomUser
+from persons.importers import (
+    IMPORT_CHUNK_SIZE, IMPORT_FORMATS, INVOICE_IMPORT_TYPES, import_invoices, read_import_rows,
+)
+
+
+class Command(BaseCommand):
+    help = 'Bulk import sales or purchase invoices from a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of the CSV or XLSX file to import')
+        parser.add_argument(
+            '--type',
+            choices=sorted(INVOICE_IMPORT_TYPES),
+            required=True,
+            help='Kind of invoices contained in the file'
+        )
+        parser.add_argument(
+            '--format',
+            choices=IMPORT_FORMATS,
+            help='File format; inferred from the file extension when omitted'
+        )
+        parser.add_argument(
+            '--user',
+            help='Username recorded as the creator of the imported invoices'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help='Number of rows validated and inserted per transaction'
+        )
+        parser.add_argument(
+            '--errors-csv',
+            help='Write rejected rows and their reasons to this CSV file'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError(f'Unsupported file format: {file_format}')
+
+        user = None
+        if options['user']:
+            try:
+                user = CustomUser.objects.get(username=options['user'])
+            except CustomUser.DoesNotExist:
+                raise CommandError(f'Unknown user: {options["user"]}')
+
+        try:
+            with open(path, 'rb') as file:
+                report = import_invoices(
+                    read_import_rows(file, file_format),
+                    options['type'],
+                    user=user,
+                    chunk_size=options['chunk_size'],
+                )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for row_number, message in report.errors:
+            self.stderr.write(f'Row {row_number}: {message}')
+
+        if options['errors_csv'] and report.errors:
+            with open(options['errors_csv'], 'w', encoding='utf-8-sig', newline='') as errors_file:
+                writer = csv.writer(errors_file)
+                writer.writerow(['row', 'error'])
+                writer.writerows(report.errors)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{report.created} invoices imported, {report.rejected} rows rejected')
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from persons.models import Person, PersonSearchToken
+from persons.search import PERSON_SEARCH_FIELDS, person_search_tokens
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the person search token index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of persons indexed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_pk = 0
+        indexed = 0
+        while True:
+            persons = list(
+                Person.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', *PERSON_SEARCH_FIELDS)[:chunk_size]
+            )
+            if not persons:
+                break
+            last_pk = persons[-1].pk
+
+            with transaction.atomic():
+                PersonSearchToken.objects.filter(person__in=persons).delete()
+                PersonSearchToken.objects.bulk_create([
+                    PersonSearchToken(person=person, token=token)
+                    for person in persons
+                    for token in person_search_tokens(person)
+                ])
+            indexed += len(persons)
+
+        self.stdout.write(self.style.SUCCESS(f'{indexed} persons indexed'))
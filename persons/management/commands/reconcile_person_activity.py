@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from persons.activity import refresh_person_activity
+from persons.models import Person
+
+
+class Command(BaseCommand):
+    help = 'Recompute the invoice activity counters stored on every person'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of persons recomputed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        last_pk = 0
+        reconciled = 0
+        while True:
+            person_ids = list(
+                Person.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:options['chunk_size']]
+            )
+            if not person_ids:
+                break
+            last_pk = person_ids[-1]
+
+            with transaction.atomic():
+                refresh_person_activity(person_ids)
+            reconciled += len(person_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'{reconciled} persons reconciled'))
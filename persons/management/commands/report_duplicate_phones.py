@@ -0,0 +1,41 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from persons.models import Person
+
+
+class Command(BaseCommand):
+    help = 'List persons that share a mobile number'
+
+    def handle(self, *args, **options):
+        numbers = set()
+        for field in ('phone_e164', 'phone_optional_e164'):
+            numbers.update(
+                Person.objects.exclude(**{field: ''}).order_by().values(field)
+                .annotate(persons=Count('id')).filter(persons__gt=1)
+                .values_list(field, flat=True)
+            )
+        numbers.update(
+            Person.objects.exclude(phone_optional_e164='')
+            .filter(phone_optional_e164__in=Person.objects.exclude(phone_e164='').values('phone_e164'))
+            .values_list('phone_optional_e164', flat=True)
+        )
+
+        groups = defaultdict(dict)
+        persons = Person.objects.filter(
+            Q(phone_e164__in=numbers) | Q(phone_optional_e164__in=numbers)
+        ).only('id', 'first_name', 'last_name', 'national_id', 'phone_e164', 'phone_optional_e164')
+        for person in persons.iterator():
+            for number in (person.phone_e164, person.phone_optional_e164):
+                if number in numbers:
+                    groups[number][person.pk] = person
+
+        duplicates = {number: people for number, people in groups.items() if len(people) > 1}
+        for number in sorted(duplicates):
+            self.stdout.write(number)
+            for person in sorted(duplicates[number].values(), key=lambda person: person.pk):
+                self.stdout.write(f'    {person.pk}\t{person.national_id}\t{person.get_full_name()}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{len(duplicates)} numbers shared by more than one person')
+        )
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persons', '0008_person_created_by_alter_purchaseinvoice_created_by_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseinvoice',
+            index=models.Index(fields=['invoice_date', 'invoice_number'], name='persons_pur_invoice_f869e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesinvoice',
+            index=models.Index(fields=['invoice_date', 'invoice_number'], name='persons_sal_invoice_a1d826_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persons', '0009_invoice_date_number_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseinvoice',
+            name='jalali_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='ماه شمسی'),
+        ),
+        migrations.AddField(
+            model_name='purchaseinvoice',
+            name='jalali_year',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='سال شمسی'),
+        ),
+        migrations.AddField(
+            model_name='salesinvoice',
+            name='jalali_month',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='ماه شمسی'),
+        ),
+        migrations.AddField(
+            model_name='salesinvoice',
+            name='jalali_year',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='سال شمسی'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseinvoice',
+            index=models.Index(fields=['jalali_year', 'jalali_month'], name='persons_pur_jalali__da827b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesinvoice',
+            index=models.Index(fields=['jalali_year', 'jalali_month'], name='persons_sal_jalali__d411b8_idx'),
+        ),
+    ]
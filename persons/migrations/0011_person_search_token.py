@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persons', '0010_jalali_year_month'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100, verbose_name='توکن')),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='persons.person', verbose_name='شخص')),
+            ],
+            options={
+                'verbose_name': 'توکن جستجوی شخص',
+                'verbose_name_plural': 'توکن\u200cهای جستجوی اشخاص',
+                'indexes': [models.Index(fields=['token', 'person'], name='persons_per_token_e29873_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='personsearchtoken',
+            constraint=models.UniqueConstraint(fields=('person', 'token'), name='unique_person_search_token'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persons', '0011_person_search_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='name_norm',
+            field=models.CharField(blank=True, editable=False, max_length=401, verbose_name='نام نرمال\u200cشده'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='national_id_norm',
+            field=models.CharField(blank=True, editable=False, max_length=10, verbose_name='کد ملی نرمال\u200cشده'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='phone_norm',
+            field=models.CharField(blank=True, editable=False, max_length=12, verbose_name='شماره تماس نرمال\u200cشده'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['name_norm'], name='persons_per_name_no_0aae0f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['phone_norm'], name='persons_per_phone_n_c7f5a0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['national_id_norm'], name='persons_per_nationa_d72230_idx'),
+        ),
+    ]
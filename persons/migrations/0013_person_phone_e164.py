@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persons', '0012_normalized_search_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='phone_e164',
+            field=models.CharField(blank=True, editable=False, max_length=13, verbose_name='شماره تماس اولی (E.164)'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='phone_optional_e164',
+            field=models.CharField(blank=True, editable=False, max_length=13, verbose_name='شماره تماس دوم (E.164)'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['phone_e164'], name='persons_per_phone_e_48f2ae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['phone_optional_e164'], name='persons_per_phone_o_f34c57_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persons', '0013_person_phone_e164'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicatePersonCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.DecimalField(decimal_places=3, max_digits=4, verbose_name='امتیاز شباهت')),
+                ('reasons', models.CharField(blank=True, max_length=255, verbose_name='دلایل')),
+                ('status', models.CharField(choices=[('pending', 'در انتظار بررسی'), ('dismissed', 'رد شده')], default='pending', max_length=20, verbose_name='وضعیت')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('person_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='persons.person', verbose_name='شخص اول')),
+                ('person_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='persons.person', verbose_name='شخص دوم')),
+            ],
+            options={
+                'verbose_name': 'شخص تکراری احتمالی',
+                'verbose_name_plural': 'اشخاص تکراری احتمالی',
+                'ordering': ['-score', 'person_a'],
+                'indexes': [models.Index(fields=['status', 'score'], name='persons_dup_status_82f05b_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='duplicatepersoncandidate',
+            constraint=models.UniqueConstraint(fields=('person_a', 'person_b'), name='unique_duplicate_person_pair'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('persons', '0014_duplicate_person_candidate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='person',
+            name='first_invoice_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='تاریخ اولین فاکتور'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='last_invoice_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='تاریخ آخرین فاکتور'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='purchase_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='تعداد فاکتورهای خرید'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='purchase_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=18, verbose_name='جمع خرید'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='sales_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='تعداد فاکتورهای فروش'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='sales_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=18, verbose_name='جمع فروش'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['sales_total'], name='persons_per_sales_t_388fbe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['purchase_total'], name='persons_per_purchas_d760c2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['last_invoice_date'], name='persons_per_last_in_7e4c17_idx'),
+        ),
+    ]
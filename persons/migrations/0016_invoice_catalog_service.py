@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import OuterRef, Subquery
+
+
+def link_catalog_services(apps, schema_editor):
+    ServiceCatalogEntry = apps.get_model('services', 'ServiceCatalogEntry')
+    entry = ServiceCatalogEntry.objects.filter(
+        category=OuterRef('service_category'), service_id=OuterRef('service_id'),
+    ).values('pk')[:1]
+    for model_name in ('SalesInvoice', 'PurchaseInvoice'):
+        apps.get_model('persons', model_name).objects.update(catalog_service=Subquery(entry))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_service_catalog'),
+        ('persons', '0015_person_activity_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseinvoice',
+            name='catalog_service',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='services.servicecatalogentry', verbose_name='خدمت'),
+        ),
+        migrations.AddField(
+            model_name='salesinvoice',
+            name='catalog_service',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='services.servicecatalogentry', verbose_name='خدمت'),
+        ),
+        migrations.RunPython(link_catalog_services, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,17 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
-from accounts.models import CustomUser, OwnedModel
+from accounts.models import CustomUser, JalaliDatedModel, NormalizedSearchModel, OwnedModel
+from services.models import CatalogServiceModel
+from accounts.normalization import iran_mobile_e164, normalize_digits, normalize_text
+from finance.models import InvoiceNumberMixin
+from .search import PERSON_SEARCH_FIELDS, SEARCH_TOKEN_LENGTH, index_person
+
+
+PERSON_ACTIVITY_FIELDS = (
+    'sales_count', 'sales_total', 'purchase_count', 'purchase_total',
+    'first_invoice_date', 'last_invoice_date',
+)
 
 
 ALLOWED_FILE_EXTENSIONS = [
@@ -70,7 +80,7 @@ def validate_file_type(file):
             )
 
 
-class Person(OwnedModel):
+class Person(OwnedModel, NormalizedSearchModel):
     first_name = models.CharField(
         max_length=200,
         verbose_name=_('نام')
@@ -126,6 +136,81 @@ class Person(OwnedModel):
         auto_now=True,
         verbose_name=_('تاریخ به‌روز‌رسانی')
     )
+    name_norm = models.CharField(
+        max_length=401,
+        blank=True,
+        editable=False,
+        verbose_name=_('نام نرمال‌شده')
+    )
+    phone_norm = models.CharField(
+        max_length=12,
+        blank=True,
+        editable=False,
+        verbose_name=_('شماره تماس نرمال‌شده')
+    )
+    national_id_norm = models.CharField(
+        max_length=10,
+        blank=True,
+        editable=False,
+        verbose_name=_('کد ملی نرمال‌شده')
+    )
+    phone_e164 = models.CharField(
+        max_length=13,
+        blank=True,
+        editable=False,
+        verbose_name=_('شماره تماس اولی (E.164)')
+    )
+    phone_optional_e164 = models.CharField(
+        max_length=13,
+        blank=True,
+        editable=False,
+        verbose_name=_('شماره تماس دوم (E.164)')
+    )
+    
+    sales_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('تعداد فاکتورهای فروش')
+    )
+    sales_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name=_('جمع فروش')
+    )
+    purchase_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('تعداد فاکتورهای خرید')
+    )
+    purchase_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name=_('جمع خرید')
+    )
+    first_invoice_date = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_('تاریخ اولین فاکتور')
+    )
+    last_invoice_date = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_('تاریخ آخرین فاکتور')
+    )
+    
+    normalized_fields = {
+        'name_norm': (normalize_text, ('first_name', 'last_name')),
+        'phone_norm': (normalize_digits, ('phone_number',)),
+        'national_id_norm': (normalize_digits, ('national_id',)),
+        'phone_e164': (iran_mobile_e164, ('phone_number',)),
+        'phone_optional_e164': (iran_mobile_e164, ('phone_number_optional',)),
+    }
     
     class Meta:
         verbose_name = _('شخص')
@@ -135,6 +220,14 @@ class Person(OwnedModel):
             models.Index(fields=['national_id']),
             models.Index(fields=['first_name', 'last_name']),
             models.Index(fields=['phone_number']),
+            models.Index(fields=['name_norm']),
+            models.Index(fields=['phone_norm']),
+            models.Index(fields=['national_id_norm']),
+            models.Index(fields=['phone_e164']),
+            models.Index(fields=['phone_optional_e164']),
+            models.Index(fields=['sales_total']),
+            models.Index(fields=['purchase_total']),
+            models.Index(fields=['last_invoice_date']),
         ]
     
     def __str__(self):
@@ -142,9 +235,50 @@ class Person(OwnedModel):
     
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
+    
+    def save(self, *args, **kwargs):
+        # The activity counters are maintained with UPDATEs by the invoice
+        # signals; a full save of a stale instance must not overwrite them.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in PERSON_ACTIVITY_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(PERSON_SEARCH_FIELDS):
+            index_person(self)
 
 
-class SalesInvoice(OwnedModel):
+class PersonSearchToken(models.Model):
+    person = models.ForeignKey(
+        Person,
+        on_delete=models.CASCADE,
+        related_name='search_tokens',
+        verbose_name=_('شخص')
+    )
+    token = models.CharField(
+        max_length=SEARCH_TOKEN_LENGTH,
+        verbose_name=_('توکن')
+    )
+    
+    class Meta:
+        verbose_name = _('توکن جستجوی شخص')
+        verbose_name_plural = _('توکن‌های جستجوی اشخاص')
+        constraints = [
+            models.UniqueConstraint(fields=['person', 'token'], name='unique_person_search_token'),
+        ]
+        indexes = [
+            models.Index(fields=['token', 'person']),
+        ]
+    
+    def __str__(self):
+        return self.token
+
+
+class SalesInvoice(OwnedModel, JalaliDatedModel, CatalogServiceModel):
+    jalali_date_field = 'invoice_date'
+    
     SERVICE_TYPE_CHOICES = [
         ('commercial', _('خدمات بازرگانی')),
         ('registration', _('خدمات ثبت')),
@@ -232,7 +366,9 @@ class SalesInvoice(OwnedModel):
         indexes = [
             models.Index(fields=['invoice_number']),
             models.Index(fields=['invoice_date']),
+            models.Index(fields=['invoice_date', 'invoice_number']),
             models.Index(fields=['buyer']),
+            models.Index(fields=['jalali_year', 'jalali_month']),
         ]
     
     def __str__(self):
@@ -240,43 +376,13 @@ class SalesInvoice(OwnedModel):
     
     def save(self, *args, **kwargs):
         if not self.invoice_number:
-            last_invoice = SalesInvoice.objects.order_by('-invoice_number').first()
-            if last_invoice:
-                self.invoice_number = last_invoice.invoice_number + 1
-            else:
-                self.invoice_number = 1000
+            self.invoice_number = InvoiceNumberMixin.generate_next_invoice_number(SalesInvoice)
         super().save(*args, **kwargs)
-    
-    def get_service_object(self):
-        if not self.service_id or not self.service_category:
-            return None
-        
-        from services.models import (
-            CommercialService,
-            RegistrationService,
-            LegalService,
-            LeasingService,
-            LoanService
-        )
-        
-        model_map = {
-            'commercial': CommercialService,
-            'registration': RegistrationService,
-            'legal': LegalService,
-            'leasing': LeasingService,
-            'loan': LoanService,
-        }
-        
-        model = model_map.get(self.service_category)
-        if model:
-            try:
-                return model.objects.get(id=self.service_id)
-            except model.DoesNotExist:
-                return None
-        return None
 
 
-class PurchaseInvoice(OwnedModel):
+class PurchaseInvoice(OwnedModel, JalaliDatedModel, CatalogServiceModel):
+    jalali_date_field = 'invoice_date'
+    
     SERVICE_TYPE_CHOICES = [
         ('commercial', _('خدمات بازرگانی')),
         ('registration', _('خدمات ثبت')),
@@ -364,7 +470,9 @@ class PurchaseInvoice(OwnedModel):
         indexes = [
             models.Index(fields=['invoice_number']),
             models.Index(fields=['invoice_date']),
+            models.Index(fields=['invoice_date', 'invoice_number']),
             models.Index(fields=['vendor']),
+            models.Index(fields=['jalali_year', 'jalali_month']),
         ]
     
     def __str__(self):
@@ -372,37 +480,62 @@ class PurchaseInvoice(OwnedModel):
     
     def save(self, *args, **kwargs):
         if not self.invoice_number:
-            last_invoice = PurchaseInvoice.objects.order_by('-invoice_number').first()
-            if last_invoice:
-                self.invoice_number = last_invoice.invoice_number + 1
-            else:
-                self.invoice_number = 1000
+            self.invoice_number = InvoiceNumberMixin.generate_next_invoice_number(PurchaseInvoice)
         super().save(*args, **kwargs)
+
+
+class DuplicatePersonCandidate(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_DISMISSED = 'dismissed'
     
-    def get_service_object(self):
-        if not self.service_id or not self.service_category:
-            return None
-        
-        from services.models import (
-            CommercialService,
-            RegistrationService,
-            LegalService,
-            LeasingService,
-            LoanService
-        )
-        
-        model_map = {
-            'commercial': CommercialService,
-            'registration': RegistrationService,
-            'legal': LegalService,
-            'leasing': LeasingService,
-            'loan': LoanService,
-        }
-        
-        model = model_map.get(self.service_category)
-        if model:
-            try:
-                return model.objects.get(id=self.service_id)
-            except model.DoesNotExist:
-                return None
-        return None
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _('در انتظار بررسی')),
+        (STATUS_DISMISSED, _('رد شده')),
+    ]
+    
+    person_a = models.ForeignKey(
+        Person,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('شخص اول')
+    )
+    person_b = models.ForeignKey(
+        Person,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_('شخص دوم')
+    )
+    score = models.DecimalField(
+        max_digits=4,
+        decimal_places=3,
+        verbose_name=_('امتیاز شباهت')
+    )
+    reasons = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name=_('دلایل')
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name=_('وضعیت')
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('تاریخ ایجاد')
+    )
+    
+    class Meta:
+        verbose_name = _('شخص تکراری احتمالی')
+        verbose_name_plural = _('اشخاص تکراری احتمالی')
+        ordering = ['-score', 'person_a']
+        constraints = [
+            models.UniqueConstraint(fields=['person_a', 'person_b'], name='unique_duplicate_person_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'score']),
+        ]
+    
+    def __str__(self):
+        return f"{self.person_a} / {self.person_b}"
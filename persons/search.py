@@ -0,0 +1,71 @@
+import re
+from django.db import transaction
+from django.db.models import Q
+from accounts.normalization import iran_mobile_e164, normalize_digits, normalize_text
+
+
+SEARCH_TOKEN_LENGTH = 100
+
+PERSON_SEARCH_FIELDS = ('first_name', 'last_name', 'national_id', 'phone_number', 'phone_number_optional')
+
+TOKEN_SPLIT_RE = re.compile(r'[\s\-_.,()/]+')
+
+
+def search_tokens(text):
+    return [
+        token[:SEARCH_TOKEN_LENGTH]
+        for token in TOKEN_SPLIT_RE.split(normalize_text(text))
+        if token
+    ]
+
+
+def person_search_tokens(person):
+    tokens = set()
+    for field in PERSON_SEARCH_FIELDS:
+        tokens.update(search_tokens(getattr(person, field)))
+    return tokens
+
+
+def index_person(person):
+    from .models import PersonSearchToken
+
+    tokens = person_search_tokens(person)
+    with transaction.atomic():
+        existing = set(
+            PersonSearchToken.objects.filter(person=person).values_list('token', flat=True)
+        )
+        if existing - tokens:
+            PersonSearchToken.objects.filter(person=person, token__in=existing - tokens).delete()
+        PersonSearchToken.objects.bulk_create(
+            [PersonSearchToken(person=person, token=token) for token in tokens - existing],
+            ignore_conflicts=True,
+        )
+
+
+def search_persons_queryset(queryset, query):
+    from .models import PersonSearchToken
+
+    # A complete mobile number is an exact match on the E.164 columns and
+    # other digit-only queries are national id / phone prefixes. Otherwise
+    # every term has to prefix-match one of the person's tokens; each term
+    # is a range scan on the token index.
+    terms = search_tokens(query)
+    if not terms:
+        return queryset.none()
+    digits = normalize_digits(query)
+    if digits == ''.join(terms).replace('+', ''):
+        phone = iran_mobile_e164(digits)
+        if phone:
+            return queryset.filter(
+                Q(phone_e164=phone) | Q(phone_optional_e164=phone) | Q(national_id_norm=digits)
+            )
+        phone_match = Q(phone_norm__startswith=digits)
+        if not digits.startswith('0'):
+            # Numbers are usually typed without their leading zero.
+            phone_match |= Q(phone_norm__startswith='0' + digits)
+        return queryset.filter(Q(national_id_norm__startswith=digits) | phone_match)
+    for term in terms:
+        queryset = queryset.filter(
+            pk__in=PersonSearchToken.objects.filter(token__startswith=term).values('person_id')
+        )
+    return queryset
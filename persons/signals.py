@@ -0,0 +1,69 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+from .activity import ACTIVITY_SOURCES, add_invoice_activity, invoice_activity_state, refresh_person_activity
+from .models import SalesInvoice, PurchaseInvoice
+
+
+# Sent with sender=SalesInvoice or PurchaseInvoice after bulk_create, update()
+# or delete() calls that skip the per-row model signals. ``days`` is the set
+# of invoice dates whose rows were inserted, changed or removed and
+# ``persons`` the set of buyer/vendor ids they belong to.
+invoices_bulk_changed = Signal()
+
+# Sent with sender=SalesInvoice or PurchaseInvoice inside the transaction of
+# a bulk update() of existing rows. ``invoices`` are the rows as they were
+# before the update and ``changes`` the field values written to all of them,
+# so receivers can apply deltas instead of recomputing.
+invoices_bulk_updated = Signal()
+
+
+@receiver(pre_save, sender=SalesInvoice)
+@receiver(pre_save, sender=PurchaseInvoice)
+def remember_invoice_activity_state(sender, instance, raw=False, **kwargs):
+    instance._activity_previous = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+
+    person_field, _count_field, _total_field, price_field = ACTIVITY_SOURCES[sender]
+    instance._activity_previous = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(person_field, price_field, 'invoice_date').first()
+    )
+
+
+@receiver(post_save, sender=SalesInvoice)
+@receiver(post_save, sender=PurchaseInvoice)
+def update_invoice_activity(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, '_activity_previous', None)
+    current = invoice_activity_state(instance)
+    if previous is None:
+        add_invoice_activity(sender, *current)
+    elif tuple(previous) != current:
+        refresh_person_activity({previous[0], current[0]})
+
+
+@receiver(post_delete, sender=SalesInvoice)
+@receiver(post_delete, sender=PurchaseInvoice)
+def remove_invoice_activity(sender, instance, **kwargs):
+    refresh_person_activity({invoice_activity_state(instance)[0]})
+
+
+@receiver(invoices_bulk_changed)
+def refresh_activity_after_bulk_change(sender, persons=(), **kwargs):
+    refresh_person_activity(persons)
+
+
+@receiver(invoices_bulk_updated)
+def refresh_activity_after_bulk_update(sender, invoices, changes, **kwargs):
+    person_field, _count_field, _total_field, price_field = ACTIVITY_SOURCES[sender]
+    activity_fields = {person_field, person_field.removesuffix('_id'), price_field, 'invoice_date'}
+    if activity_fields.isdisjoint(changes):
+        return
+    persons = {getattr(invoice, person_field) for invoice in invoices}
+    person = changes.get(person_field.removesuffix('_id'), changes.get(person_field))
+    if person is not None:
+        persons.add(getattr(person, 'pk', person))
+    refresh_person_activity(persons)
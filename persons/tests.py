@@ -1,3 +1,534 @@
-from django.test import TestCase
+import io
+from unittest import mock
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.normalization import iran_mobile_e164, normalize_digits, normalize_text
+from factories import CustomUserFactory, PersonFactory
+from reports.forms import CustomerReportForm
+from reports.models import InvoiceDailyRollup
+from reports.xlsx import stream_xlsx
+from reports.rollup import rollup_totals
+from .bulk import bulk_update_invoices
+from .duplicates import edit_distance, find_duplicate_persons, merge_persons
+from .importers import IMPORT_COLUMNS, import_invoices, read_import_rows
+from .models import PERSON_ACTIVITY_FIELDS, DuplicatePersonCandidate, Person, PersonSearchToken, SalesInvoice, PurchaseInvoice
+from .search import search_persons_queryset
 
-# Create your tests here.
+
+def csv_file(*rows):
+    lines = [','.join(IMPORT_COLUMNS)] + [','.join(row) for row in rows]
+    return io.BytesIO('\n'.join(lines).encode('utf-8'))
+
+
+class InvoiceImportTests(TestCase):
+    def setUp(self):
+        self.user = CustomUserFactory()
+        self.person = PersonFactory(national_id='1234567890')
+
+    def row(self, **kwargs):
+        data = {
+            'national_id': '1234567890',
+            'invoice_date': '2024-03-01',
+            'service_category': 'legal',
+            'service_id': '',
+            'other_service_title': 'مشاوره',
+            'price': '1000',
+            'settlement_type': 'cash',
+            'description': '',
+        }
+        data.update(kwargs)
+        return [data[column] for column in IMPORT_COLUMNS]
+
+    def test_csv_import_creates_invoices_with_sequential_numbers(self):
+        rows = [self.row(), self.row(invoice_date='2024-03-02', price='2500')]
+        report = import_invoices(read_import_rows(csv_file(*rows), 'csv'), 'sales', user=self.user, chunk_size=1)
+
+        self.assertEqual(report.created, 2)
+        self.assertEqual(report.errors, [])
+        invoices = list(SalesInvoice.objects.order_by('invoice_number'))
+        self.assertEqual([invoice.invoice_number for invoice in invoices], [1000, 1001])
+        self.assertEqual(invoices[1].sale_price, Decimal('2500'))
+        self.assertEqual(invoices[0].buyer, self.person)
+        self.assertEqual(invoices[0].created_by, self.user)
+        self.assertIsNotNone(invoices[0].jalali_year)
+        self.assertEqual(sum(InvoiceDailyRollup.objects.values_list('sales_count', flat=True)), 2)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        rows = [
+            self.row(),
+            self.row(national_id='0000000000'),
+            self.row(price='abc'),
+            self.row(settlement_type='barter'),
+        ]
+        report = import_invoices(read_import_rows(csv_file(*rows), 'csv'), 'sales')
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual([row_number for row_number, _message in report.errors], [3, 4, 5])
+        self.assertEqual(SalesInvoice.objects.count(), 1)
+
+    def test_rows_over_field_limits_are_rejected(self):
+        rows = [
+            self.row(national_id='۱۲۳۴۵۶۷۸۹۰'),
+            self.row(price='1' * 30),
+            self.row(price='NaN'),
+            self.row(other_service_title='x' * 300),
+            self.row(invoice_date='1e400'),
+        ]
+        report = import_invoices(read_import_rows(csv_file(*rows), 'csv'), 'sales')
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual([row_number for row_number, _message in report.errors], [3, 4, 5, 6])
+        self.assertIn('sale_price', report.errors[0][1])
+        self.assertEqual(SalesInvoice.objects.get().buyer, self.person)
+
+    def test_database_errors_reject_the_chunk_and_keep_going(self):
+        rows = [self.row(), self.row(invoice_date='2024-03-02'), self.row(invoice_date='2024-03-03')]
+        original = SalesInvoice.objects.bulk_create
+        calls = []
+
+        def bulk_create(invoices, **kwargs):
+            calls.append(invoices)
+            if len(calls) == 2:
+                raise IntegrityError('duplicate')
+            return original(invoices, **kwargs)
+
+        with mock.patch.object(SalesInvoice.objects, 'bulk_create', side_effect=bulk_create):
+            report = import_invoices(read_import_rows(csv_file(*rows), 'csv'), 'sales', chunk_size=1)
+
+        self.assertEqual(report.created, 2)
+        self.assertEqual([row_number for row_number, _message in report.errors], [3])
+        self.assertEqual(
+            list(SalesInvoice.objects.order_by('invoice_date').values_list('invoice_date', flat=True)),
+            [date(2024, 3, 1), date(2024, 3, 3)],
+        )
+
+    def test_missing_columns_are_rejected(self):
+        with self.assertRaises(ValueError):
+            list(read_import_rows(io.BytesIO(b'national_id,price\n1,2\n'), 'csv'))
+
+    def test_xlsx_import_accepts_excel_date_serials(self):
+        workbook = b''.join(stream_xlsx([
+            list(IMPORT_COLUMNS),
+            self.row(invoice_date=date(2024, 3, 1), price=Decimal('750')),
+        ]))
+        report = import_invoices(read_import_rows(io.BytesIO(workbook), 'xlsx'), 'purchase')
+
+        self.assertEqual(report.created, 1)
+        invoice = PurchaseInvoice.objects.get()
+        self.assertEqual(invoice.vendor, self.person)
+        self.assertEqual(invoice.invoice_date, date(2024, 3, 1))
+        self.assertEqual(invoice.purchase_price, Decimal('750'))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class InvoiceImportAdminTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUserFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        PersonFactory(national_id='1234567890')
+
+    def test_upload_page_imports_file(self):
+        url = reverse('admin:persons_salesinvoice_import')
+        upload = SimpleUploadedFile(
+            'invoices.csv',
+            csv_file(['1234567890', '2024-03-01', 'legal', '', '', '1000', 'cash', '']).getvalue(),
+        )
+        response = self.client.post(url, {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report'].created, 1)
+        self.assertEqual(SalesInvoice.objects.get().created_by, self.admin)
+
+    def test_changelist_links_to_upload_page(self):
+        response = self.client.get(reverse('admin:persons_salesinvoice_changelist'))
+        self.assertContains(response, reverse('admin:persons_salesinvoice_import'))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class InvoiceBulkActionTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUserFactory(is_staff=True, is_superuser=True)
+        self.clerk = CustomUserFactory()
+        self.person = PersonFactory()
+        self.invoices = [
+            SalesInvoice.objects.create(
+                buyer=self.person,
+                invoice_date=date(2024, 3, day),
+                service_category='legal',
+                sale_price=Decimal('100'),
+                settlement_type='cash',
+                created_by=self.admin,
+            )
+            for day in range(1, 6)
+        ]
+
+    def test_updates_run_in_chunks_and_refresh_the_rollup(self):
+        queryset = SalesInvoice.objects.filter(pk__in=[invoice.pk for invoice in self.invoices[:4]])
+        report = bulk_update_invoices(queryset, {'created_by': self.clerk}, chunk_size=3)
+
+        self.assertEqual((report.updated, report.chunks), (4, 2))
+        self.assertEqual(SalesInvoice.objects.filter(created_by=self.clerk).count(), 4)
+        totals = rollup_totals(date(2024, 3, 1), date(2024, 3, 31), created_by=self.clerk.pk)
+        self.assertEqual((totals['sales_count'], totals['sales_total']), (4, Decimal('400')))
+        totals = rollup_totals(date(2024, 3, 1), date(2024, 3, 31), created_by=self.admin.pk)
+        self.assertEqual((totals['sales_count'], totals['sales_total']), (1, Decimal('100')))
+
+    def test_updates_only_touch_the_derived_data_they_affect(self):
+        queryset = SalesInvoice.objects.filter(pk__in=[invoice.pk for invoice in self.invoices])
+        with CaptureQueriesContext(connection) as queries:
+            bulk_update_invoices(queryset, {'is_active': False}, chunk_size=2)
+        touched = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('persons_person', touched)
+        self.assertNotIn('reports_invoicedailyrollup', touched)
+
+        with CaptureQueriesContext(connection) as queries:
+            bulk_update_invoices(queryset, {'settlement_type': 'conditional'})
+        self.assertFalse(any('GROUP BY' in query['sql'] for query in queries.captured_queries))
+        self.assertFalse(any('persons_person' in query['sql'] for query in queries.captured_queries))
+        totals = rollup_totals(date(2024, 3, 1), date(2024, 3, 31), settlement_type='conditional')
+        self.assertEqual((totals['sales_count'], totals['sales_total']), (5, Decimal('500')))
+        self.assertEqual(rollup_totals(date(2024, 3, 1), date(2024, 3, 31), settlement_type='cash')['sales_count'], 0)
+
+    def test_admin_actions_use_the_action_form_values(self):
+        self.client.force_login(self.admin)
+        url = reverse('admin:persons_salesinvoice_changelist')
+        selected = [invoice.pk for invoice in self.invoices[:2]]
+
+        response = self.client.post(url, {
+            'action': 'change_settlement_type', '_selected_action': selected, 'settlement_type': 'conditional',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(SalesInvoice.objects.filter(settlement_type='conditional').count(), 2)
+
+        self.client.post(url, {'action': 'deactivate_invoices', '_selected_action': selected})
+        self.assertEqual(SalesInvoice.objects.filter(is_active=False).count(), 2)
+
+        self.client.post(url, {'action': 'change_settlement_type', '_selected_action': selected, 'settlement_type': ''})
+        self.assertEqual(SalesInvoice.objects.filter(settlement_type='conditional').count(), 2)
+
+        self.client.post(url, {
+            'action': 'reassign_created_by', '_selected_action': selected, 'created_by': self.clerk.pk,
+        })
+        self.assertEqual(SalesInvoice.objects.filter(created_by=self.clerk).count(), 2)
+
+    def test_created_by_picker_loads_users_on_demand(self):
+        CustomUserFactory(first_name='Unlisted', last_name='Clerk')
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:persons_salesinvoice_changelist'))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'Unlisted')
+
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'term': 'Unlisted', 'app_label': 'persons', 'model_name': 'salesinvoice', 'field_name': 'created_by',
+        })
+        self.assertEqual(len(response.json()['results']), 1)
+
+
+class PersonSearchTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUserFactory(is_staff=True, is_superuser=True)
+        self.person = PersonFactory(
+            first_name='Ali', last_name='Rezaei Tehrani',
+            national_id='1234567890', phone_number='09121234567',
+        )
+        PersonFactory(first_name='Sara', last_name='Ahmadi', national_id='5555555555', phone_number='09351111111')
+
+    def search(self, query):
+        return list(search_persons_queryset(Person.objects.all(), query))
+
+    def test_tokens_follow_person_changes(self):
+        tokens = set(self.person.search_tokens.values_list('token', flat=True))
+        self.assertTrue({'ali', 'rezaei', 'tehrani', '1234567890', '09121234567'} <= tokens)
+
+        self.person.last_name = 'Karimi'
+        self.person.save()
+        tokens = set(self.person.search_tokens.values_list('token', flat=True))
+        self.assertIn('karimi', tokens)
+        self.assertNotIn('rezaei', tokens)
+
+    def test_prefix_search(self):
+        self.assertEqual(self.search('teh'), [self.person])
+        self.assertEqual(self.search('ALI reza'), [self.person])
+        self.assertEqual(self.search('12345'), [self.person])
+        self.assertEqual(self.search('0912'), [self.person])
+        self.assertEqual(self.search('ali ahmadi'), [])
+
+    def test_search_endpoint(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('persons:api_search_persons'), {'q': 'rez'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.person.pk])
+
+    def test_rebuild_command_restores_index(self):
+        PersonSearchToken.objects.all().delete()
+        call_command('rebuild_person_search_index', chunk_size=1, stdout=io.StringIO())
+        self.assertEqual(self.search('sara'), [Person.objects.get(national_id='5555555555')])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class NormalizedSearchTests(TestCase):
+    def setUp(self):
+        self.person = PersonFactory(
+            first_name='علی', last_name='کریمی‌زاده',
+            national_id='0012345678', phone_number='09121234567',
+        )
+
+    def test_normalizers(self):
+        self.assertEqual(normalize_text(' علي  كريمي‌زاده '), 'علی کریمیزاده')
+        self.assertEqual(normalize_digits('۰۹۱۲-۱۲۳ ٤٥٦٧'), '09121234567')
+
+    def test_shadow_columns_are_filled_on_save(self):
+        self.assertEqual(self.person.name_norm, 'علی کریمیزاده')
+        self.assertEqual(self.person.national_id_norm, '0012345678')
+
+        self.person.phone_number = '+989351112233'
+        self.person.save(update_fields=['phone_number'])
+        self.person.refresh_from_db()
+        self.assertEqual(self.person.phone_norm, '989351112233')
+
+    def test_backfill_command(self):
+        Person.objects.update(name_norm='', phone_norm='', national_id_norm='')
+        call_command('backfill_normalized_fields', chunk_size=1, stdout=io.StringIO())
+        self.person.refresh_from_db()
+        self.assertEqual(self.person.phone_norm, '09121234567')
+
+    def test_search_matches_arabic_letters_and_persian_digits(self):
+        people = Person.objects.all()
+        self.assertEqual(list(search_persons_queryset(people, 'علي كريمي')), [self.person])
+        self.assertEqual(list(search_persons_queryset(people, '۰۰۱۲۳')), [self.person])
+        self.assertEqual(list(search_persons_queryset(people, '٠٩١٢')), [self.person])
+
+    def test_admin_search_normalizes_term(self):
+        admin_user = CustomUserFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse('admin:persons_person_changelist'), {'q': 'كريمي'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.person])
+
+
+class AutocompleteCachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUserFactory(role='user')
+        self.client.force_login(self.user)
+        self.person = PersonFactory(first_name='Ali', national_id='1234567890', created_by=self.user)
+        self.url = reverse('persons:api_search_persons')
+
+    def test_repeat_lookup_is_served_from_cache(self):
+        first = self.client.get(self.url, {'q': 'ali'})
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('private', first['Cache-Control'])
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.url, {'q': 'ali'})
+        self.assertEqual(second.content, first.content)
+        self.assertFalse([q for q in queries.captured_queries if 'persons_person' in q['sql']])
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(self.url, {'q': 'ali'})['ETag']
+        response = self.client.get(self.url, {'q': 'ali'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_person_change_invalidates_etag(self):
+        etag = self.client.get(self.url, {'q': 'ali'})['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            PersonFactory(first_name='Alireza', created_by=self.user)
+
+        response = self.client.get(self.url, {'q': 'ali'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_scope_is_part_of_the_key(self):
+        self.client.get(self.url, {'q': 'ali'})
+        other = CustomUserFactory(role='user')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(self.url, {'q': 'ali'}).json()['results'], [])
+
+
+class PhoneE164Tests(TestCase):
+    def setUp(self):
+        self.first = PersonFactory(phone_number='09121234567', phone_number_optional=None)
+        self.second = PersonFactory(phone_number='+989351112233', phone_number_optional='9121234567')
+        self.third = PersonFactory(phone_number='9190000000', phone_number_optional=None)
+
+    def test_formats_share_one_canonical_value(self):
+        self.assertEqual(iran_mobile_e164('۰۹۱۲۱۲۳۴۵۶۷'), '+989121234567')
+        self.assertEqual(iran_mobile_e164('00989121234567'), '+989121234567')
+        self.assertEqual(iran_mobile_e164('12345'), '')
+        self.assertEqual(self.first.phone_e164, '+989121234567')
+        self.assertEqual(self.second.phone_e164, '+989351112233')
+        self.assertEqual(self.second.phone_optional_e164, '+989121234567')
+        self.assertEqual(self.third.phone_optional_e164, '')
+
+    def test_full_number_is_an_exact_match(self):
+        people = Person.objects.order_by('pk')
+        self.assertEqual(list(search_persons_queryset(people, '+98 912 123 4567')), [self.first, self.second])
+        self.assertEqual(list(search_persons_queryset(people, '9190000000')), [self.third])
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_admin_search_finds_national_id_shaped_like_a_mobile(self):
+        person = PersonFactory(national_id='9123456789', phone_number='02188776655', phone_number_optional=None)
+        self.client.force_login(CustomUserFactory(is_staff=True, is_superuser=True))
+        response = self.client.get(reverse('admin:persons_person_changelist'), {'q': '9123456789'})
+        self.assertEqual(list(response.context['cl'].result_list), [person])
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_admin_search_finds_partial_phone_without_leading_zero(self):
+        self.client.force_login(CustomUserFactory(is_staff=True, is_superuser=True))
+        url = reverse('admin:persons_person_changelist')
+        for term in ('912123', '0912123', '۹۱۲۱۲۳'):
+            response = self.client.get(url, {'q': term})
+            self.assertEqual(list(response.context['cl'].result_list), [self.first], term)
+
+    def test_duplicate_report(self):
+        out = io.StringIO()
+        call_command('report_duplicate_phones', stdout=out)
+        output = out.getvalue()
+        self.assertIn('+989121234567', output)
+        self.assertNotIn('+989351112233', output)
+        self.assertIn('1 numbers shared', output)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class DuplicatePersonTests(TestCase):
+    def setUp(self):
+        self.original = PersonFactory(
+            first_name='علی', last_name='کریمی', national_id='0012345678', phone_number='09121234567',
+        )
+        self.typo = PersonFactory(
+            first_name='علي', last_name='كريمي', national_id='0012345679', phone_number='9121234567',
+        )
+        self.other = PersonFactory(
+            first_name='سارا', last_name='احمدی', national_id='0099999999', phone_number='09350000000',
+        )
+
+    def test_edit_distance_counts_transpositions_once(self):
+        self.assertEqual(edit_distance('0012345678', '0012345687'), 1)
+        self.assertEqual(edit_distance('0012345678', '0012345699'), 2)
+
+    def test_job_queues_scored_pairs(self):
+        self.assertEqual(find_duplicate_persons(), 1)
+        candidate = DuplicatePersonCandidate.objects.get()
+        self.assertEqual((candidate.person_a, candidate.person_b), (self.original, self.typo))
+        self.assertEqual(candidate.score, Decimal('1'))
+
+        candidate.status = DuplicatePersonCandidate.STATUS_DISMISSED
+        candidate.save()
+        find_duplicate_persons()
+        self.assertEqual(DuplicatePersonCandidate.objects.get().status, DuplicatePersonCandidate.STATUS_DISMISSED)
+
+    def test_merge_repoints_invoices(self):
+        sale = SalesInvoice.objects.create(
+            buyer=self.typo, invoice_date=date(2024, 3, 1), service_category='legal',
+            sale_price=Decimal('1000'), settlement_type='cash',
+        )
+        purchase = PurchaseInvoice.objects.create(
+            vendor=self.typo, invoice_date=date(2024, 3, 1), service_category='legal',
+            purchase_price=Decimal('500'), settlement_type='cash',
+        )
+        self.assertEqual(merge_persons(self.original, [self.typo]), 1)
+
+        sale.refresh_from_db()
+        purchase.refresh_from_db()
+        self.assertEqual(sale.buyer, self.original)
+        self.assertEqual(purchase.vendor, self.original)
+        self.assertFalse(Person.objects.filter(pk=self.typo.pk).exists())
+
+    def test_person_admin_merge_action(self):
+        admin_user = CustomUserFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(admin_user)
+        self.client.post(reverse('admin:persons_person_changelist'), {
+            'action': 'merge_selected_persons',
+            '_selected_action': [self.original.pk, self.typo.pk],
+        })
+        self.assertEqual(set(Person.objects.all()), {self.original, self.other})
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class PersonActivityTests(TestCase):
+    def setUp(self):
+        self.person = PersonFactory()
+        self.other = PersonFactory()
+
+    def sale(self, **kwargs):
+        data = {
+            'buyer': self.person,
+            'invoice_date': date(2024, 3, 1),
+            'service_category': 'legal',
+            'sale_price': Decimal('1000'),
+            'settlement_type': 'cash',
+        }
+        data.update(kwargs)
+        return SalesInvoice.objects.create(**data)
+
+    def activity(self, person):
+        return Person.objects.values(*PERSON_ACTIVITY_FIELDS).get(pk=person.pk)
+
+    def test_counters_follow_invoice_changes(self):
+        first = self.sale()
+        self.sale(invoice_date=date(2024, 5, 1), sale_price=Decimal('500'))
+        PurchaseInvoice.objects.create(
+            vendor=self.person, invoice_date=date(2024, 1, 1), service_category='legal',
+            purchase_price=Decimal('300'), settlement_type='cash',
+        )
+        self.assertEqual(self.activity(self.person), {
+            'sales_count': 2, 'sales_total': Decimal('1500'),
+            'purchase_count': 1, 'purchase_total': Decimal('300'),
+            'first_invoice_date': date(2024, 1, 1), 'last_invoice_date': date(2024, 5, 1),
+        })
+
+        first.buyer = self.other
+        first.save()
+        self.assertEqual(self.activity(self.person)['sales_total'], Decimal('500'))
+        self.assertEqual(self.activity(self.other)['sales_count'], 1)
+
+        first.delete()
+        self.assertEqual(self.activity(self.other)['sales_count'], 0)
+        self.assertIsNone(self.activity(self.other)['last_invoice_date'])
+
+    def test_stale_person_save_keeps_counters(self):
+        stale = Person.objects.get(pk=self.person.pk)
+        self.sale()
+        stale.first_name = 'Changed'
+        stale.save()
+        self.assertEqual(self.activity(self.person)['sales_count'], 1)
+
+    def test_reconcile_command(self):
+        self.sale()
+        Person.objects.update(sales_count=0, sales_total=0, last_invoice_date=None)
+        call_command('reconcile_person_activity', chunk_size=1, stdout=io.StringIO())
+        self.assertEqual(self.activity(self.person)['sales_count'], 1)
+        self.assertEqual(self.activity(self.person)['last_invoice_date'], date(2024, 3, 1))
+
+    def test_admin_sorts_and_filters_on_counters(self):
+        self.sale()
+        admin_user = CustomUserFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse('admin:persons_person_changelist'), {'o': '-5', 'activity': 'never'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.other])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class InvoicePickerTests(TestCase):
+    def test_invoice_form_uses_autocomplete_for_buyer(self):
+        admin_user = CustomUserFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(admin_user)
+        PersonFactory(first_name='Zhubin')
+
+        response = self.client.get(reverse('admin:persons_salesinvoice_add'))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'Zhubin')
+
+    def test_remote_select_renders_only_the_selected_option(self):
+        selected = PersonFactory(first_name='Selected')
+        PersonFactory(first_name='Zhubin')
+        form = CustomerReportForm(initial={'customer': selected.pk})
+        html = str(form['customer'])
+        self.assertIn('Selected', html)
+        self.assertNotIn('Zhubin', html)
+        self.assertIn(reverse('persons:api_search_persons'), html)
@@ -4,6 +4,6 @@ from . import views
 app_name = 'persons'
 
 urlpatterns = [
-    path('api/services-by-category/', views.get_services_by_category, name='api_services_by_category'),
+    path('api/service-catalog/', views.get_service_catalog_view, name='api_service_catalog'),
     path('api/search-persons/', views.search_persons, name='api_search_persons'),
 ]
@@ -8,59 +8,31 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 from django.db.models import Q
 from .models import Person, SalesInvoice
 from .forms import PersonForm, SalesInvoiceForm
+from .search import search_persons_queryset
+from .caching import cached_autocomplete
+from reports.versioning import PERSON_DATA, SERVICE_DATA
+from services.catalog import get_service_catalog
 
 
 @require_http_methods(["GET"])
 @ensure_csrf_cookie
-def get_services_by_category(request):
-    service_type = request.GET.get('service_type')
-    if not service_type:
-        return JsonResponse({'error': 'service_type is required'}, status=400)
-    
+@cached_autocomplete(SERVICE_DATA)
+def get_service_catalog_view(request):
     if not request.user.is_authenticated:
         return JsonResponse({'error': 'Authentication required'}, status=401)
     
     try:
-        from services.models import (
-            CommercialService,
-            RegistrationService,
-            LegalService,
-            LeasingService,
-            LoanService
-        )
-        
-        model_map = {
-            'commercial': CommercialService,
-            'registration': RegistrationService,
-            'legal': LegalService,
-            'leasing': LeasingService,
-            'loan': LoanService,
-        }
-        
-        model = model_map.get(service_type)
-        if not model:
-            return JsonResponse({'error': 'Invalid service_type'}, status=400)
-        
-        queryset = model.objects.filter(is_active=True)
+        owner_id = None
         if request.user.role != 'admin' and not request.user.is_superuser:
-            queryset = queryset.filter(created_by=request.user)
-            
-        if service_type == 'loan':
-            services_qs = queryset.order_by('bank_name', 'plan_name')
-            services = [{'id': s.id, 'name': str(s)} for s in services_qs]
-        else:
-            services = list(queryset.values('id', 'name').order_by('name'))
-        
-        return JsonResponse({
-            'success': True,
-            'services': services
-        })
+            owner_id = request.user.pk
+        return JsonResponse({'services': get_service_catalog().as_payload(owner_id=owner_id)})
     except Exception as e:
         return JsonResponse({'error': 'Server error occurred'}, status=500)
 
 
 @require_http_methods(["GET"])
 @ensure_csrf_cookie
+@cached_autocomplete(PERSON_DATA)
 def search_persons(request):
     query = request.GET.get('q', '').strip()
     if not query or len(query) < 2:
@@ -74,12 +46,9 @@ def search_persons(request):
         if request.user.role != 'admin' and not request.user.is_superuser:
             queryset = queryset.filter(created_by=request.user)
             
-        persons = queryset.filter(
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query) |
-            Q(national_id__icontains=query) |
-            Q(phone_number__icontains=query)
-        ).values('id', 'first_name', 'last_name', 'national_id', 'phone_number')[:10]
+        persons = search_persons_queryset(queryset, query).values(
+            'id', 'first_name', 'last_name', 'national_id', 'phone_number'
+        )[:10]
         
         results = []
         for person in persons:
@@ -0,0 +1,35 @@
+from django import forms
+from django.urls import reverse
+
+
+class RemoteSelect(forms.Select):
+    # Only the selected option is rendered; remote_select.js fetches the
+    # rest from a JSON endpoint returning {"results": [{"id", "text"}]}.
+    def __init__(self, url_name, attrs=None, min_length=2):
+        super().__init__(attrs)
+        self.url_name = url_name
+        self.min_length = min_length
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs'].update({
+            'data-remote-url': reverse(self.url_name),
+            'data-min-length': self.min_length,
+        })
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        selected = {str(v) for v in value if v not in (None, '')}
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', self.choices.field.empty_label or '', not selected, 0))
+        if selected:
+            queryset = self.choices.queryset.filter(pk__in=selected)
+            for index, obj in enumerate(queryset, start=1):
+                options.append(self.create_option(
+                    name, str(obj.pk), self.choices.field.label_from_instance(obj), True, index
+                ))
+        return [(None, options, 0)]
+
+    class Media:
+        js = ('js/remote_select.js',)
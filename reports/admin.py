@@ -3,22 +3,116 @@ from django.utils.translation import gettext_lazy as _
 from django.urls import path, reverse
 from django.template.response import TemplateResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.db import models
 from django.db.models import Q
 from django.utils.html import format_html
 from datetime import datetime, timedelta
 import json
-from .models import EmployeeReport, FinancialReport, CustomerReport
+from .forms import CustomerReportFiltersForm, EmployeeReportFiltersForm
+from .jobs import enqueue_report_job
+from .models import EmployeeReport, FinancialReport, CustomerReport, ReportJob
+from .exports import (
+    CUSTOMER_REPORT_HEADER, EMPLOYEE_REPORT_HEADER, FINANCIAL_REPORT_HEADER,
+    customer_report_rows, employee_report_rows, financial_report_rows,
+    streaming_export_response,
+)
+from .cache import (
+    cash_flow_result, customer_report_result, employee_report_result, financial_report_result, report_job_result,
+)
+from .pagination import decode_cursor, decode_ledger_cursor, page_links
+from .queries import (
+    customer_report_querysets, employee_report_querysets, financial_report_querysets, is_report_admin,
+)
+from .rollup import rollup_totals, rollup_totals_for_ranges
+from .versioning import SERVICE_DATA
 from persons.models import SalesInvoice, PurchaseInvoice
 from finance.models import Salary
 from accounts.models import CustomUser
 
 
 from accounts.admin import OwnedAdminMixin
+from persons.caching import cached_autocomplete
+from services.catalog import get_service_catalog
 
 
-class EmployeeReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
+class ReportJobAdminMixin:
+    report_job_type = None
+    
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        job_urls = [
+            path(
+                'jobs/<int:job_id>/',
+                self.admin_site.admin_view(self.job_progress),
+                name='%s_%s_job_progress' % info,
+            ),
+            path(
+                'jobs/<int:job_id>/status/',
+                self.admin_site.admin_view(self.job_status),
+                name='%s_%s_job_status' % info,
+            ),
+        ]
+        return job_urls + super().get_urls()
+    
+    def start_report_job(self, request, report):
+        job = enqueue_report_job(report, request.user)
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return redirect(reverse('admin:%s_%s_job_progress' % info, args=[job.pk]))
+    
+    def get_job(self, request, job_id):
+        job = get_object_or_404(ReportJob, pk=job_id, report_type=self.report_job_type)
+        if not is_report_admin(request.user) and job.created_by_id != request.user.pk:
+            raise Http404
+        return job
+    
+    def job_progress(self, request, job_id):
+        job = self.get_job(request, job_id)
+        info = self.model._meta.app_label, self.model._meta.model_name
+        context = {
+            'job': job,
+            'status_url': reverse('admin:%s_%s_job_status' % info, args=[job.pk]),
+            'title': _('در حال تولید گزارش'),
+            'opts': self.model._meta,
+        }
+        
+        response = TemplateResponse(
+            request,
+            'admin/reports/report_job_progress.html',
+            context,
+        )
+        response['Content-Type'] = 'text/html; charset=utf-8'
+        return response
+    
+    def job_status(self, request, job_id):
+        job = self.get_job(request, job_id)
+        data = {
+            'status': job.status,
+            'status_display': str(job.get_status_display()),
+            'progress': job.progress,
+        }
+        if job.status == ReportJob.STATUS_DONE:
+            report_url = reverse(
+                'admin:%s_%s_view_%s_report' % (
+                    self.model._meta.app_label, self.model._meta.model_name, self.report_job_type,
+                ),
+                args=[job.report_id],
+            )
+            data['report_url'] = f'{report_url}?job={job.pk}'
+        elif job.status == ReportJob.STATUS_FAILED:
+            data['error'] = str(_('تولید گزارش ناموفق بود؛ دوباره تلاش کنید.'))
+        return JsonResponse(data)
+    
+    def job_result(self, request, report):
+        job_id = request.GET.get('job', '')
+        if not job_id.isdigit():
+            return None
+        return report_job_result(int(job_id), self.report_job_type, report.pk)
+
+
+class EmployeeReportAdmin(ReportJobAdminMixin, OwnedAdminMixin, admin.ModelAdmin):
+    report_job_type = 'employee'
+    
     list_display = [
         'get_employee_name',
         'start_date',
@@ -67,22 +161,31 @@ class EmployeeReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
     
     ordering = ['-created_at']
     
+    list_select_related = ['employee']
+    
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        reports = list(changelist.result_list)
+        page_totals = rollup_totals_for_ranges(
+            [(report.start_date, report.end_date, report.employee_id) for report in reports],
+            by_creator=True,
+        )
+        for report, totals in zip(reports, page_totals):
+            report.rollup_totals = totals
+        return changelist
+    
+    def get_rollup_totals(self, obj):
+        if not hasattr(obj, 'rollup_totals'):
+            obj.rollup_totals = rollup_totals(obj.start_date, obj.end_date, created_by=obj.employee_id)
+        return obj.rollup_totals
+    
     def get_employee_name(self, obj):
         return obj.employee.get_display_name()
     get_employee_name.short_description = _('کارمند')
     
     def get_total_activities(self, obj):
-        sales_count = SalesInvoice.objects.filter(
-            created_by=obj.employee,
-            invoice_date__gte=obj.start_date,
-            invoice_date__lte=obj.end_date
-        ).count()
-        purchase_count = PurchaseInvoice.objects.filter(
-            created_by=obj.employee,
-            invoice_date__gte=obj.start_date,
-            invoice_date__lte=obj.end_date
-        ).count()
-        return sales_count + purchase_count
+        totals = self.get_rollup_totals(obj)
+        return totals['sales_count'] + totals['purchase_count']
     get_total_activities.short_description = _('تعداد فعالیت‌ها')
     
     def view_details_link(self, obj):
@@ -110,6 +213,11 @@ class EmployeeReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
                 self.admin_site.admin_view(self.view_report),
                 name='reports_employeereport_view_employee_report',
             ),
+            path(
+                '<int:report_id>/export/<str:file_format>/',
+                self.admin_site.admin_view(self.export_report),
+                name='reports_employeereport_export_employee_report',
+            ),
             path(
                 'generate-report/',
                 self.admin_site.admin_view(self.generate_report_form),
@@ -121,40 +229,18 @@ class EmployeeReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
     def view_report(self, request, report_id):
         report = get_object_or_404(EmployeeReport, pk=report_id)
         
-        sales_invoices = SalesInvoice.objects.filter(
-            created_by=report.employee,
-            invoice_date__gte=report.start_date,
-            invoice_date__lte=report.end_date
-        ).select_related('buyer', 'created_by').order_by('-invoice_date')
-        
-        purchase_invoices = PurchaseInvoice.objects.filter(
-            created_by=report.employee,
-            invoice_date__gte=report.start_date,
-            invoice_date__lte=report.end_date
-        ).select_related('vendor', 'created_by').order_by('-invoice_date')
+        cursor = decode_cursor(request.GET.get('cursor'))
+        salary_cursor = decode_cursor(request.GET.get('salary_cursor'))
         
-        salaries = Salary.objects.filter(
-            employee=report.employee,
-            date__gte=report.start_date,
-            date__lte=report.end_date
-        ).order_by('-date')
-        
-        paid_salaries = salaries.filter(is_paid=True)
-        unpaid_salaries = salaries.filter(is_paid=False)
-        total_salary_amount = sum(s.amount for s in salaries)
-        paid_salary_amount = sum(s.amount for s in paid_salaries)
-        unpaid_salary_amount = sum(s.amount for s in unpaid_salaries)
+        result = None if cursor or salary_cursor else self.job_result(request, report)
+        if result is None:
+            result = employee_report_result(report, cursor, salary_cursor)
         
         context = {
             'report': report,
-            'sales_invoices': sales_invoices,
-            'purchase_invoices': purchase_invoices,
-            'salaries': salaries,
-            'paid_salaries_count': paid_salaries.count(),
-            'unpaid_salaries_count': unpaid_salaries.count(),
-            'total_salary_amount': total_salary_amount,
-            'paid_salary_amount': paid_salary_amount,
-            'unpaid_salary_amount': unpaid_salary_amount,
+            **result,
+            'invoice_pages': page_links(request, 'cursor', cursor, result['next_cursor']),
+            'salary_pages': page_links(request, 'salary_cursor', salary_cursor, result['next_salary_cursor']),
             'title': _('گزارش فعالیت‌های کارمند'),
             'opts': self.model._meta,
             'has_change_permission': self.has_change_permission(request),
@@ -168,6 +254,15 @@ class EmployeeReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
         response['Content-Type'] = 'text/html; charset=utf-8'
         return response
     
+    def export_report(self, request, report_id, file_format):
+        report = get_object_or_404(EmployeeReport, pk=report_id)
+        return streaming_export_response(
+            f'employee-report-{report.pk}',
+            EMPLOYEE_REPORT_HEADER,
+            employee_report_rows(*employee_report_querysets(report)),
+            file_format,
+        )
+    
     def generate_report_form(self, request):
         if request.method == 'POST':
             employee_id = request.POST.get('employee')
@@ -183,16 +278,14 @@ class EmployeeReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
                         end_date=end_date,
                         created_by=request.user
                     )
-                    report_url = reverse('admin:reports_employeereport_view_employee_report', args=[report.id])
-                    return redirect(report_url)
+                    return self.start_report_job(request, report)
                 except EmployeeReport.DoesNotExist:
                     pass
                 except Exception as e:
                     pass
         
-        employees = CustomUser.objects.filter(is_active=True).order_by('first_name', 'last_name')
         context = {
-            'employees': employees,
+            'form': EmployeeReportFiltersForm(),
             'title': _('تولید گزارش کارمند'),
             'opts': self.model._meta,
         }
@@ -206,7 +299,9 @@ class EmployeeReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
         return response
 
 
-class FinancialReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
+class FinancialReportAdmin(ReportJobAdminMixin, OwnedAdminMixin, admin.ModelAdmin):
+    report_job_type = 'financial'
+    
     list_display = [
         'date_range',
         'get_total_income',
@@ -249,32 +344,34 @@ class FinancialReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
         return f"{obj.start_date} تا {obj.end_date}"
     date_range.short_description = _('بازه تاریخی')
     
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        reports = list(changelist.result_list)
+        page_totals = rollup_totals_for_ranges(
+            [(report.start_date, report.end_date, None) for report in reports]
+        )
+        for report, totals in zip(reports, page_totals):
+            report.rollup_totals = totals
+        return changelist
+    
+    def get_rollup_totals(self, obj):
+        if not hasattr(obj, 'rollup_totals'):
+            obj.rollup_totals = rollup_totals(obj.start_date, obj.end_date)
+        return obj.rollup_totals
+    
     def get_total_income(self, obj):
-        total = SalesInvoice.objects.filter(
-            invoice_date__gte=obj.start_date,
-            invoice_date__lte=obj.end_date
-        ).aggregate(total=models.Sum('sale_price'))['total'] or 0
+        total = self.get_rollup_totals(obj)['sales_total']
         return f"{total:,.0f}"
     get_total_income.short_description = _('کل درامد')
     
     def get_total_expenses(self, obj):
-        total = PurchaseInvoice.objects.filter(
-            invoice_date__gte=obj.start_date,
-            invoice_date__lte=obj.end_date
-        ).aggregate(total=models.Sum('purchase_price'))['total'] or 0
+        total = self.get_rollup_totals(obj)['purchase_total']
         return f"{total:,.0f}"
     get_total_expenses.short_description = _('کل هزینه')
     
     def get_net_amount(self, obj):
-        income = SalesInvoice.objects.filter(
-            invoice_date__gte=obj.start_date,
-            invoice_date__lte=obj.end_date
-        ).aggregate(total=models.Sum('sale_price'))['total'] or 0
-        expenses = PurchaseInvoice.objects.filter(
-            invoice_date__gte=obj.start_date,
-            invoice_date__lte=obj.end_date
-        ).aggregate(total=models.Sum('purchase_price'))['total'] or 0
-        net = income - expenses
+        totals = self.get_rollup_totals(obj)
+        net = totals['sales_total'] - totals['purchase_total']
         return f"{net:,.0f}"
     get_net_amount.short_description = _('خالص')
     
@@ -301,6 +398,16 @@ class FinancialReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
                 self.admin_site.admin_view(self.view_report),
                 name='reports_financialreport_view_financial_report',
             ),
+            path(
+                '<int:report_id>/export/<str:file_format>/',
+                self.admin_site.admin_view(self.export_report),
+                name='reports_financialreport_export_financial_report',
+            ),
+            path(
+                '<int:report_id>/cash-flow/',
+                self.admin_site.admin_view(self.cash_flow_view),
+                name='reports_financialreport_cash_flow',
+            ),
             path(
                 'generate-report/',
                 self.admin_site.admin_view(self.generate_report_form),
@@ -312,34 +419,16 @@ class FinancialReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
     def view_report(self, request, report_id):
         report = get_object_or_404(FinancialReport, pk=report_id)
         
-        sales_invoices = SalesInvoice.objects.filter(
-            invoice_date__gte=report.start_date,
-            invoice_date__lte=report.end_date
-        ).select_related('created_by', 'buyer').order_by('-invoice_date')
-        
-        purchase_invoices = PurchaseInvoice.objects.filter(
-            invoice_date__gte=report.start_date,
-            invoice_date__lte=report.end_date
-        ).select_related('created_by', 'vendor').order_by('-invoice_date')
-        
-        total_income = sum(inv.sale_price for inv in sales_invoices)
-        total_expenses = sum(inv.purchase_price for inv in purchase_invoices)
-        net_amount = total_income - total_expenses
+        cursor = decode_cursor(request.GET.get('cursor'))
         
-        sales_count = sales_invoices.count()
-        purchase_count = purchase_invoices.count()
-        total_invoices = sales_count + purchase_count
+        result = None if cursor else self.job_result(request, report)
+        if result is None:
+            result = financial_report_result(report, cursor)
         
         context = {
             'report': report,
-            'sales_invoices': sales_invoices,
-            'purchase_invoices': purchase_invoices,
-            'total_income': total_income,
-            'total_expenses': total_expenses,
-            'net_amount': net_amount,
-            'sales_count': sales_count,
-            'purchase_count': purchase_count,
-            'total_invoices': total_invoices,
+            **result,
+            'invoice_pages': page_links(request, 'cursor', cursor, result['next_cursor']),
             'title': _('گزارش مالی'),
             'opts': self.model._meta,
             'has_change_permission': self.has_change_permission(request),
@@ -353,6 +442,38 @@ class FinancialReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
         response['Content-Type'] = 'text/html; charset=utf-8'
         return response
     
+    def cash_flow_view(self, request, report_id):
+        report = get_object_or_404(FinancialReport, pk=report_id)
+        
+        cursor = decode_ledger_cursor(request.GET.get('cursor'))
+        result = cash_flow_result(report, cursor)
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'report': report,
+            **result,
+            'ledger_pages': page_links(request, 'cursor', cursor, result['next_cursor']),
+            'title': _('گردش نقدی'),
+            'opts': self.model._meta,
+        }
+        
+        response = TemplateResponse(
+            request,
+            'admin/reports/cash_flow_detail.html',
+            context,
+        )
+        response['Content-Type'] = 'text/html; charset=utf-8'
+        return response
+    
+    def export_report(self, request, report_id, file_format):
+        report = get_object_or_404(FinancialReport, pk=report_id)
+        return streaming_export_response(
+            f'financial-report-{report.pk}',
+            FINANCIAL_REPORT_HEADER,
+            financial_report_rows(*financial_report_querysets(report)),
+            file_format,
+        )
+    
     def generate_report_form(self, request):
         if request.method == 'POST':
             start_date = request.POST.get('start_date')
@@ -365,8 +486,7 @@ class FinancialReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
                         end_date=end_date,
                         created_by=request.user
                     )
-                    report_url = reverse('admin:reports_financialreport_view_financial_report', args=[report.id])
-                    return redirect(report_url)
+                    return self.start_report_job(request, report)
                 except Exception as e:
                     pass
         
@@ -384,7 +504,9 @@ class FinancialReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
         return response
 
 
-class CustomerReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
+class CustomerReportAdmin(ReportJobAdminMixin, OwnedAdminMixin, admin.ModelAdmin):
+    report_job_type = 'customer'
+    
     list_display = [
         'get_customer_name',
         'service_category',
@@ -490,14 +612,19 @@ class CustomerReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
                 self.admin_site.admin_view(self.view_report),
                 name='reports_customerreport_view_customer_report',
             ),
+            path(
+                '<int:report_id>/export/<str:file_format>/',
+                self.admin_site.admin_view(self.export_report),
+                name='reports_customerreport_export_customer_report',
+            ),
             path(
                 'generate-report/',
                 self.admin_site.admin_view(self.generate_report_form),
                 name='reports_customerreport_generate_customer_report',
             ),
             path(
-                'api/services-by-category/',
-                self.admin_site.admin_view(self.api_services_by_category),
+                'api/service-catalog/',
+                self.admin_site.admin_view(cached_autocomplete(SERVICE_DATA)(self.api_service_catalog)),
                 name='reports_customerreport_api_services',
             ),
             path(
@@ -509,100 +636,17 @@ class CustomerReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
         return custom_urls + urls
     
     def view_report(self, request, report_id):
-        from services.models import (
-            CommercialService, RegistrationService, LegalService,
-            LeasingService, LoanService
-        )
-        
         report = get_object_or_404(CustomerReport, pk=report_id)
         
-        sales_query = SalesInvoice.objects.all()
-        purchase_query = PurchaseInvoice.objects.all()
-        
-        if report.customer:
-            sales_query = sales_query.filter(buyer=report.customer)
-            purchase_query = purchase_query.filter(vendor=report.customer)
-        
-        if report.service_category:
-            sales_query = sales_query.filter(service_category=report.service_category)
-            purchase_query = purchase_query.filter(service_category=report.service_category)
-        
-        if report.service_id:
-            sales_query = sales_query.filter(service_id=report.service_id)
-            purchase_query = purchase_query.filter(service_id=report.service_id)
-        
-        if report.settlement_type != 'all':
-            sales_query = sales_query.filter(settlement_type=report.settlement_type)
-            purchase_query = purchase_query.filter(settlement_type=report.settlement_type)
-        
-        if report.single_date:
-            sales_query = sales_query.filter(invoice_date=report.single_date)
-            purchase_query = purchase_query.filter(invoice_date=report.single_date)
-        elif report.start_date and report.end_date:
-            sales_query = sales_query.filter(
-                invoice_date__gte=report.start_date,
-                invoice_date__lte=report.end_date
-            )
-            purchase_query = purchase_query.filter(
-                invoice_date__gte=report.start_date,
-                invoice_date__lte=report.end_date
-            )
-        
-        if report.filter_user:
-            sales_query = sales_query.filter(created_by=report.filter_user)
-            purchase_query = purchase_query.filter(created_by=report.filter_user)
-        
-        invoices = []
-        
-        if report.invoice_type in ['sales', 'all']:
-            for invoice in sales_query.select_related('buyer', 'created_by'):
-                service_obj = self.get_service_object(invoice.service_id, invoice.service_category)
-                invoices.append({
-                    'type': _('فروش'),
-                    'invoice_type_key': 'sales',
-                    'id': invoice.id,
-                    'invoice_number': invoice.invoice_number,
-                    'invoice_date': invoice.invoice_date,
-                    'customer_first_name': invoice.buyer.first_name,
-                    'customer_last_name': invoice.buyer.last_name,
-                    'service_category': invoice.get_service_category_display(),
-                    'service_name': service_obj.name if service_obj else (invoice.other_service_title or _('نامشخص')),
-                    'settlement_type': invoice.get_settlement_type_display(),
-                    'created_by': invoice.created_by.get_display_name() if invoice.created_by else '-',
-                    'price': invoice.sale_price,
-                    'attachment': invoice.attachment if invoice.attachment else None,
-                    'attachment_name': invoice.attachment.name.split('/')[-1] if invoice.attachment else None,
-                })
-        
-        if report.invoice_type in ['purchase', 'all']:
-            for invoice in purchase_query.select_related('vendor', 'created_by'):
-                service_obj = self.get_service_object(invoice.service_id, invoice.service_category)
-                invoices.append({
-                    'type': _('خرید'),
-                    'invoice_type_key': 'purchase',
-                    'id': invoice.id,
-                    'invoice_number': invoice.invoice_number,
-                    'invoice_date': invoice.invoice_date,
-                    'customer_first_name': invoice.vendor.first_name,
-                    'customer_last_name': invoice.vendor.last_name,
-                    'service_category': invoice.get_service_category_display(),
-                    'service_name': service_obj.name if service_obj else (invoice.other_service_title or _('نامشخص')),
-                    'settlement_type': invoice.get_settlement_type_display(),
-                    'created_by': invoice.created_by.get_display_name() if invoice.created_by else '-',
-                    'price': invoice.purchase_price,
-                    'attachment': invoice.attachment if invoice.attachment else None,
-                    'attachment_name': invoice.attachment.name.split('/')[-1] if invoice.attachment else None,
-                })
-        
-        invoices.sort(key=lambda x: x['invoice_date'], reverse=True)
-        
-        total_price = sum(inv['price'] for inv in invoices)
+        cursor = decode_cursor(request.GET.get('cursor'))
+        result = None if cursor else self.job_result(request, report)
+        if result is None:
+            result = customer_report_result(report, cursor)
         
         context = {
             'report': report,
-            'invoices': invoices,
-            'total_count': len(invoices),
-            'total_price': total_price,
+            **result,
+            'invoice_pages': page_links(request, 'cursor', cursor, result['next_cursor']),
             'title': _('گزارش مشتری'),
             'opts': self.model._meta,
             'has_change_permission': self.has_change_permission(request),
@@ -616,6 +660,15 @@ class CustomerReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
         response['Content-Type'] = 'text/html; charset=utf-8'
         return response
     
+    def export_report(self, request, report_id, file_format):
+        report = get_object_or_404(CustomerReport, pk=report_id)
+        return streaming_export_response(
+            f'customer-report-{report.pk}',
+            CUSTOMER_REPORT_HEADER,
+            customer_report_rows(*customer_report_querysets(report)),
+            file_format,
+        )
+    
     def generate_report_form(self, request):
         from persons.models import Person
         
@@ -653,18 +706,14 @@ class CustomerReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
                 }
                 
                 report = CustomerReport.objects.create(**report_data)
-                report_url = reverse('admin:reports_customerreport_view_customer_report', args=[report.id])
-                return redirect(report_url)
+                return self.start_report_job(request, report)
             except Exception as e:
                 pass
         
-        customers = Person.objects.filter(is_active=True).order_by('first_name', 'last_name')
-        users = CustomUser.objects.filter(is_active=True).order_by('first_name', 'last_name')
         service_categories = CustomerReport.SERVICE_CATEGORY_CHOICES
         
         context = {
-            'customers': customers,
-            'users': users,
+            'form': CustomerReportFiltersForm(),
             'service_categories': service_categories,
             'title': _('تولید گزارش مشتری'),
             'opts': self.model._meta,
@@ -678,30 +727,8 @@ class CustomerReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
         response['Content-Type'] = 'text/html; charset=utf-8'
         return response
     
-    def api_services_by_category(self, request):
-        import json
-        from django.http import JsonResponse
-        from services.models import (
-            CommercialService, RegistrationService, LegalService,
-            LeasingService, LoanService
-        )
-        
-        category = request.GET.get('category')
-        
-        model_map = {
-            'commercial': CommercialService,
-            'registration': RegistrationService,
-            'legal': LegalService,
-            'leasing': LeasingService,
-            'loan': LoanService,
-        }
-        
-        model = model_map.get(category)
-        if model:
-            services = model.objects.filter(is_active=True).values('id', 'name')
-            return JsonResponse({'services': list(services)})
-        
-        return JsonResponse({'services': []})
+    def api_service_catalog(self, request):
+        return JsonResponse({'services': get_service_catalog().as_payload()})
     
     def download_attachment(self, request, invoice_type, invoice_id):
         from django.http import FileResponse, HttpResponseNotFound
@@ -734,31 +761,6 @@ class CustomerReportAdmin(OwnedAdminMixin, admin.ModelAdmin):
             return response
         except FileNotFoundError:
             return HttpResponseNotFound('File not found')
-    
-    def get_service_object(self, service_id, service_type):
-        from services.models import (
-            CommercialService, RegistrationService, LegalService,
-            LeasingService, LoanService
-        )
-        
-        if not service_id or not service_type:
-            return None
-        
-        model_map = {
-            'commercial': CommercialService,
-            'registration': RegistrationService,
-            'legal': LegalService,
-            'leasing': LeasingService,
-            'loan': LoanService,
-        }
-        
-        model = model_map.get(service_type)
-        if model:
-            try:
-                return model.objects.get(id=service_id)
-            except model.DoesNotExist:
-                return None
-        return None
 
 
 admin.site.register(EmployeeReport, EmployeeReportAdmin)
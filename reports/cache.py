@@ -0,0 +1,82 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from .ledger import cash_flow_page
+from .queries import customer_report_page, employee_report_page, financial_report_page
+from .versioning import REPORT_DATA, get_data_version
+
+
+REPORT_CACHE_IGNORED_FIELDS = ('id', 'created_by', 'created_at', 'generated_at')
+
+
+def report_cache_key(report, *extra):
+    filters = [
+        (field.attname, getattr(report, field.attname))
+        for field in report._meta.concrete_fields
+        if field.name not in REPORT_CACHE_IGNORED_FIELDS
+    ]
+    digest = hashlib.sha256(repr((filters, extra)).encode('utf-8')).hexdigest()
+    return f'report:{report._meta.model_name}:{get_data_version(REPORT_DATA)}:{digest}'
+
+
+def cached_report(report, builder, *extra):
+    # The data version is part of the key, so any invoice, salary or service
+    # change makes older entries unreachable instead of deleting them.
+    key = report_cache_key(report, *extra)
+    result = cache.get(key)
+    if result is None:
+        result = builder()
+        cache.set(key, result, settings.REPORT_CACHE_TIMEOUT)
+    return result
+
+
+def report_job_cache_key(job_id):
+    return f'report-job:{job_id}'
+
+
+def store_report_job_result(job, result):
+    cache.set(
+        report_job_cache_key(job.pk),
+        (job.report_type, job.report_id, result),
+        settings.REPORT_CACHE_TIMEOUT,
+    )
+
+
+def report_job_result(job_id, report_type, report_id):
+    # First page built by a background job, or None once it expired or when
+    # the job belongs to another report.
+    stored = cache.get(report_job_cache_key(job_id))
+    if stored is None or stored[:2] != (report_type, report_id):
+        return None
+    return stored[2]
+
+
+def customer_report_result(report, cursor=None, owner=None, progress=None):
+    return cached_report(
+        report,
+        lambda: customer_report_page(report, cursor, owner=owner, progress=progress),
+        cursor,
+        owner.pk if owner else None,
+    )
+
+
+def financial_report_result(report, cursor=None, progress=None):
+    return cached_report(report, lambda: financial_report_page(report, cursor, progress=progress), cursor)
+
+
+def cash_flow_result(report, cursor=None):
+    return cached_report(
+        report,
+        lambda: cash_flow_page(report.start_date, report.end_date, cursor),
+        'cash-flow',
+        cursor,
+    )
+
+
+def employee_report_result(report, cursor=None, salary_cursor=None, progress=None):
+    return cached_report(
+        report,
+        lambda: employee_report_page(report, cursor, salary_cursor, progress=progress),
+        cursor,
+        salary_cursor,
+    )
@@ -0,0 +1,118 @@
+import csv
+import heapq
+from itertools import chain
+from django.http import Http404, StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from .pagination import keyset_iterator
+from .queries import customer_invoice_row, customer_invoice_sources
+from .xlsx import XLSX_CONTENT_TYPE, stream_xlsx
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield '\ufeff'
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def streaming_export_response(filename, header, rows, file_format):
+    if file_format not in EXPORT_FORMATS:
+        raise Http404('Unsupported export format')
+
+    rows = chain([header], rows)
+    if file_format == 'xlsx':
+        response = StreamingHttpResponse(stream_xlsx(rows), content_type=XLSX_CONTENT_TYPE)
+    else:
+        response = StreamingHttpResponse(stream_csv(rows), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+    return response
+
+
+def _display_name(user):
+    return user.get_display_name() if user else ''
+
+
+CUSTOMER_REPORT_HEADER = [
+    _('نوع'), _('شماره فاکتور'), _('تاریخ'), _('نام'), _('نام خانوادگی'),
+    _('دسته‌بندی خدمت'), _('خدمت'), _('نوع تسویه'), _('کاربر ثبت کننده'), _('مبلغ'),
+]
+
+
+def _customer_invoice_key(row):
+    return row['invoice_date'], row['invoice_number'], row['kind']
+
+
+def customer_report_rows(sales_query, purchase_query):
+    # Each table is read in its own keyset chunks and the two ordered
+    # streams are merged here, so no query reads more than one chunk.
+    rows = heapq.merge(
+        *(keyset_iterator(queryset, EXPORT_CHUNK_SIZE)
+          for _kind, queryset in customer_invoice_sources(sales_query, purchase_query)),
+        key=_customer_invoice_key,
+        reverse=True,
+    )
+    for row in rows:
+        invoice = customer_invoice_row(row)
+        yield [
+            invoice['type'], invoice['invoice_number'], invoice['invoice_date'],
+            invoice['customer_first_name'], invoice['customer_last_name'],
+            invoice['service_category'], invoice['service_name'],
+            invoice['settlement_type'], invoice['created_by'], invoice['price'],
+        ]
+
+
+FINANCIAL_REPORT_HEADER = [
+    _('شماره فاکتور'), _('نوع'), _('مبلغ'), _('تاریخ'), _('کاربر ثبت کننده'),
+]
+
+
+def financial_report_rows(sales_query, purchase_query):
+    for invoice in keyset_iterator(sales_query, EXPORT_CHUNK_SIZE):
+        yield [
+            invoice.invoice_number, _('درامد'), invoice.sale_price,
+            invoice.invoice_date, _display_name(invoice.created_by),
+        ]
+    for invoice in keyset_iterator(purchase_query, EXPORT_CHUNK_SIZE):
+        yield [
+            invoice.invoice_number, _('هزینه'), invoice.purchase_price,
+            invoice.invoice_date, _display_name(invoice.created_by),
+        ]
+
+
+EMPLOYEE_REPORT_HEADER = [
+    _('نوع'), _('شماره پرونده'), _('تاریخ'), _('طرف حساب'), _('خدمت'),
+    _('مبلغ'), _('نوع تسویه / وضعیت'),
+]
+
+
+def employee_report_rows(sales_query, purchase_query, salary_query):
+    sales_query = sales_query.select_related('buyer', 'catalog_service')
+    purchase_query = purchase_query.select_related('vendor', 'catalog_service')
+    for invoice in keyset_iterator(sales_query, EXPORT_CHUNK_SIZE):
+        yield [
+            _('فاکتور فروش'), invoice.invoice_number, invoice.invoice_date,
+            invoice.buyer.get_full_name(), invoice.get_service_name(),
+            invoice.sale_price, invoice.get_settlement_type_display(),
+        ]
+    for invoice in keyset_iterator(purchase_query, EXPORT_CHUNK_SIZE):
+        yield [
+            _('فاکتور خرید'), invoice.invoice_number, invoice.invoice_date,
+            invoice.vendor.get_full_name(), invoice.get_service_name(),
+            invoice.purchase_price, invoice.get_settlement_type_display(),
+        ]
+    for salary in keyset_iterator(salary_query, EXPORT_CHUNK_SIZE, date_field='date', number_field='pk'):
+        yield [
+            _('حقوق'), '', salary.date,
+            salary.employee.get_display_name(), '',
+            salary.amount, _('پرداخت شده') if salary.is_paid else _('پرداخت نشده'),
+        ]
@@ -1,9 +1,12 @@
 from django import forms
+from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.utils.translation import gettext_lazy as _
 from datetime import date
 from persons.models import Person
+from persons.widgets import RemoteSelect
 from accounts.models import CustomUser
-from .models import CustomerReport
+from .models import CustomerReport, EmployeeReport
 
 
 class CustomerReportForm(forms.ModelForm):
@@ -28,8 +31,9 @@ class CustomerReportForm(forms.ModelForm):
             'filter_user',
         ]
         widgets = {
-            'customer': forms.Select(attrs={
+            'customer': RemoteSelect('persons:api_search_persons', attrs={
                 'class': 'form-control',
+                'data-placeholder': _('جستجوی نام، کد ملی یا شماره تماس'),
             }),
             'service_category': forms.Select(attrs={
                 'class': 'form-control',
@@ -93,3 +97,26 @@ class CustomerReportForm(forms.ModelForm):
         self.fields['filter_user'].required = False
         self.fields['filter_user'].empty_label = _('تمام کاربران')
         self.fields['filter_user'].queryset = CustomUser.objects.filter(is_active=True)
+
+
+class CustomerReportFiltersForm(forms.Form):
+    customer = forms.ModelChoiceField(
+        queryset=Person.objects.filter(is_active=True),
+        required=False,
+        widget=AutocompleteSelect(CustomerReport._meta.get_field('customer'), admin.site),
+        label=_('مشتری'),
+    )
+    filter_user = forms.ModelChoiceField(
+        queryset=CustomUser.objects.filter(is_active=True),
+        required=False,
+        widget=AutocompleteSelect(CustomerReport._meta.get_field('filter_user'), admin.site),
+        label=_('کاربر ثبت‌کننده'),
+    )
+
+
+class EmployeeReportFiltersForm(forms.Form):
+    employee = forms.ModelChoiceField(
+        queryset=CustomUser.objects.filter(is_active=True),
+        widget=AutocompleteSelect(EmployeeReport._meta.get_field('employee'), admin.site),
+        label=_('کارمند'),
+    )
@@ -0,0 +1,97 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .cache import customer_report_result, employee_report_result, financial_report_result, store_report_job_result
+from .models import CustomerReport, EmployeeReport, FinancialReport, ReportJob
+
+
+logger = logging.getLogger(__name__)
+
+REPORT_JOB_TYPES = {
+    'customer': (CustomerReport, customer_report_result),
+    'financial': (FinancialReport, financial_report_result),
+    'employee': (EmployeeReport, employee_report_result),
+}
+
+
+def enqueue_report_job(report, user=None):
+    report_type = next(
+        report_type for report_type, (model, _build) in REPORT_JOB_TYPES.items()
+        if isinstance(report, model)
+    )
+    return ReportJob.objects.create(report_type=report_type, report_id=report.pk, created_by=user)
+
+
+def reclaim_stale_jobs():
+    # A running job whose worker stopped sending heartbeats was most likely
+    # killed with it; it is queued again unless it already used up its
+    # attempts, so a job that crashes every worker cannot loop forever.
+    stale_before = timezone.now() - timedelta(seconds=settings.REPORT_JOB_STALE_AFTER)
+    stale = ReportJob.objects.filter(
+        Q(heartbeat_at__lt=stale_before) | Q(heartbeat_at__isnull=True, started_at__lt=stale_before),
+        status=ReportJob.STATUS_RUNNING,
+    )
+    failed = stale.filter(attempts__gte=settings.REPORT_JOB_MAX_ATTEMPTS).update(
+        status=ReportJob.STATUS_FAILED,
+        error='Worker stopped responding',
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=ReportJob.STATUS_PENDING)
+    return requeued + failed
+
+
+def claim_next_job():
+    with transaction.atomic():
+        job = (
+            ReportJob.objects.select_for_update(skip_locked=True)
+            .filter(status=ReportJob.STATUS_PENDING)
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ReportJob.STATUS_RUNNING
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.progress = 0
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at', 'progress', 'attempts'])
+    return job
+
+
+def run_job(job):
+    model, build_result = REPORT_JOB_TYPES[job.report_type]
+    try:
+        report = model.objects.get(pk=job.report_id)
+        # The first page is kept under the job's own cache key: the report
+        # data version moves with every invoice save, so the detail view the
+        # user is redirected to could not rely on the shared entry.
+        store_report_job_result(job, build_result(report, progress=job.set_progress))
+    except Exception as exc:
+        logger.exception('Report job %s failed', job.pk)
+        job.status = ReportJob.STATUS_FAILED
+        job.error = f'{type(exc).__name__}: {exc}'
+    else:
+        job.status = ReportJob.STATUS_DONE
+        job.progress = 100
+    job.finished_at = timezone.now()
+    finished = job.current_run().update(
+        status=job.status, progress=job.progress, error=job.error, finished_at=job.finished_at,
+    )
+    if not finished:
+        logger.warning('Report job %s was reclaimed while running; its result is discarded', job.pk)
+    return job
+
+
+def run_pending_jobs(limit=None):
+    reclaim_stale_jobs()
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
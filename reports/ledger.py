@@ -0,0 +1,129 @@
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from django.db.models import CharField, F, Q, Value
+from django.db.models.functions import Concat
+from django.utils.translation import gettext_lazy as _
+from finance.models import ExpenseInvoice, IncomeInvoice, Salary
+from persons.models import PurchaseInvoice, SalesInvoice
+from .pagination import REPORT_PAGE_SIZE, encode_ledger_cursor
+from .rollup import cash_balance_before
+
+
+LEDGER_ORDERING = 'entry_date, number, kind'
+
+LEDGER_KIND_LABELS = {
+    'expense': _('هزینه'),
+    'income': _('درامد'),
+    'purchase': _('فاکتور خرید'),
+    'salary': _('حقوق'),
+    'sales': _('فاکتور فروش'),
+}
+
+CENT = Decimal('0.01')
+
+
+def _person_name(field):
+    return Concat(f'{field}__first_name', Value(' '), f'{field}__last_name', output_field=CharField())
+
+
+def ledger_sources():
+    # (kind, queryset, date field, number field, signed amount, title);
+    # money coming in is positive and money going out negative. Salaries
+    # only move cash once they are paid.
+    return [
+        ('expense', ExpenseInvoice.objects.all(), 'date', 'invoice_number', -F('amount'), F('babet')),
+        ('income', IncomeInvoice.objects.all(), 'date', 'invoice_number', F('amount'), F('babet')),
+        ('purchase', PurchaseInvoice.objects.all(), 'invoice_date', 'invoice_number',
+         -F('purchase_price'), _person_name('vendor')),
+        ('salary', Salary.objects.filter(is_paid=True), 'date', 'pk', -F('amount'), _person_name('employee')),
+        ('sales', SalesInvoice.objects.all(), 'invoice_date', 'invoice_number',
+         F('sale_price'), _person_name('buyer')),
+    ]
+
+
+def _after_cursor(queryset, key, kind, date_field, number_field):
+    # Ascending counterpart of pagination.keyset_filter: rows ordered by
+    # (date, number, kind) that come strictly after the cursor.
+    cursor_date, cursor_number, cursor_kind = key
+    number_lookup = 'gte' if kind > cursor_kind else 'gt'
+    return queryset.filter(
+        Q(**{f'{date_field}__gt': cursor_date}) |
+        Q(**{date_field: cursor_date, f'{number_field}__{number_lookup}': cursor_number})
+    )
+
+
+def _as_date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _as_amount(value):
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+def opening_balance(before_date):
+    return _as_amount(cash_balance_before(before_date))
+
+
+def cash_flow_page(start_date, end_date, cursor=None, page_size=REPORT_PAGE_SIZE):
+    # Each branch reads at most page_size + 1 rows through its date index;
+    # the running balance of the page comes from SUM() OVER and is shifted by
+    # the opening balance, read from the daily rollups on the first page and
+    # carried in the cursor afterwards.
+    if cursor:
+        key, opening = cursor
+    else:
+        key, opening = None, opening_balance(start_date)
+
+    branches = []
+    params = []
+    for kind, queryset, date_field, number_field, flow, title in ledger_sources():
+        queryset = queryset.filter(**{f'{date_field}__gte': start_date, f'{date_field}__lte': end_date})
+        if key:
+            queryset = _after_cursor(queryset, key, kind, date_field, number_field)
+        queryset = queryset.order_by(date_field, number_field).values(
+            entry_date=F(date_field),
+            number=F(number_field),
+            kind=Value(kind, output_field=CharField()),
+            flow=flow,
+            title=title,
+        )[:page_size + 1]
+        sql, branch_params = queryset.query.sql_with_params()
+        branches.append(f'SELECT * FROM ({sql}) {kind}_rows')
+        params.extend(branch_params)
+
+    sql = (
+        f'SELECT entry_date, number, kind, flow, title, '
+        f'SUM(flow) OVER (ORDER BY {LEDGER_ORDERING} ROWS UNBOUNDED PRECEDING) '
+        f'FROM (SELECT * FROM ({" UNION ALL ".join(branches)}) ledger '
+        f'ORDER BY {LEDGER_ORDERING} LIMIT %s) page '
+        f'ORDER BY {LEDGER_ORDERING}'
+    )
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, [*params, page_size + 1])
+        rows = db_cursor.fetchall()
+
+    entries = []
+    for entry_date, number, kind, flow, title, running_total in rows[:page_size]:
+        flow = _as_amount(flow)
+        entries.append({
+            'date': _as_date(entry_date),
+            'number': number,
+            'kind': kind,
+            'kind_label': LEDGER_KIND_LABELS[kind],
+            'title': title or '',
+            'inflow': flow if flow > 0 else None,
+            'outflow': -flow if flow < 0 else None,
+            'balance': opening + _as_amount(running_total),
+        })
+
+    next_cursor = None
+    if len(rows) > page_size:
+        last = entries[-1]
+        next_cursor = encode_ledger_cursor((last['date'], last['number'], last['kind']), last['balance'])
+    return {
+        'entries': entries,
+        'opening_balance': opening,
+        'closing_balance': entries[-1]['balance'] if entries else opening,
+        'next_cursor': next_cursor,
+    }
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from reports.rollup import rebuild_cash_flow_rollup, rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily invoice and cash-flow rollup tables from the invoices, income, expenses and salaries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start-date',
+            help='Only rebuild days on or after this date (YYYY-MM-DD)'
+        )
+        parser.add_argument(
+            '--end-date',
+            help='Only rebuild days on or before this date (YYYY-MM-DD)'
+        )
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollup(options['start_date'], options['end_date'])
+        cash_flow_rows = rebuild_cash_flow_rollup(options['start_date'], options['end_date'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt invoice rollup ({rows} rows) and cash-flow rollup ({cash_flow_rows} rows)')
+        )
@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from reports.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Process queued report generation jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the jobs currently in the queue and exit'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2,
+            help='Seconds to wait between polls when the queue is empty'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            processed = run_pending_jobs()
+            if processed:
+                self.stdout.write(f'Processed {processed} report job(s)')
+            if options['once']:
+                break
+            if not processed:
+                time.sleep(options['sleep'])
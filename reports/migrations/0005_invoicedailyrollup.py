@@ -0,0 +1,78 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_rollup(apps, schema_editor):
+    InvoiceDailyRollup = apps.get_model('reports', 'InvoiceDailyRollup')
+    sources = [
+        (apps.get_model('persons', 'SalesInvoice'), 'sales_count', 'sales_total', 'sale_price'),
+        (apps.get_model('persons', 'PurchaseInvoice'), 'purchase_count', 'purchase_total', 'purchase_price'),
+    ]
+
+    rows = {}
+    for model, count_field, total_field, price_field in sources:
+        grouped = model.objects.values(
+            'invoice_date', 'service_category', 'settlement_type', 'created_by'
+        ).annotate(
+            count=models.Count('id'),
+            total=models.Sum(price_field),
+        ).order_by()
+        for row in grouped:
+            key = (row['invoice_date'], row['service_category'], row['settlement_type'], row['created_by'])
+            entry = rows.setdefault(key, {})
+            entry[count_field] = row['count']
+            entry[total_field] = row['total'] or 0
+
+    InvoiceDailyRollup.objects.bulk_create(
+        [
+            InvoiceDailyRollup(
+                day=day,
+                service_category=service_category,
+                settlement_type=settlement_type,
+                created_by_id=created_by_id,
+                **values
+            )
+            for (day, service_category, settlement_type, created_by_id), values in rows.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0004_remove_customerreport_generated_by_and_more'),
+        ('persons', '0008_person_created_by_alter_purchaseinvoice_created_by_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='روز')),
+                ('service_category', models.CharField(max_length=20, verbose_name='دسته\u200cبندی خدمت')),
+                ('settlement_type', models.CharField(max_length=20, verbose_name='نوع تسویه')),
+                ('sales_count', models.PositiveIntegerField(default=0, verbose_name='تعداد فاکتور فروش')),
+                ('sales_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='جمع فروش')),
+                ('purchase_count', models.PositiveIntegerField(default=0, verbose_name='تعداد فاکتور خرید')),
+                ('purchase_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='جمع خرید')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='invoice_rollups', to=settings.AUTH_USER_MODEL, verbose_name='کاربر ثبت\u200cکننده')),
+            ],
+            options={
+                'verbose_name': 'خلاصه روزانه فاکتورها',
+                'verbose_name_plural': 'خلاصه\u200cهای روزانه فاکتورها',
+                'ordering': ['day'],
+                'indexes': [models.Index(fields=['created_by', 'day'], name='reports_inv_created_be27ce_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='invoicedailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'service_category', 'settlement_type', 'created_by'), name='unique_invoice_daily_rollup'),
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0005_invoicedailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True, verbose_name='کلید')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='نسخه')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاریخ به\u200cروز\u200cرسانی')),
+            ],
+            options={
+                'verbose_name': 'نسخه داده',
+                'verbose_name_plural': 'نسخه\u200cهای داده',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reports', '0006_dataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(choices=[('customer', 'گزارش مشتری'), ('financial', 'گزارش مالی'), ('employee', 'گزارش کارمند')], max_length=20, verbose_name='نوع گزارش')),
+                ('report_id', models.PositiveIntegerField(verbose_name='شناسه گزارش')),
+                ('status', models.CharField(choices=[('pending', 'در صف'), ('running', 'در حال اجرا'), ('done', 'انجام شده'), ('failed', 'ناموفق')], default='pending', max_length=20, verbose_name='وضعیت')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='پیشرفت')),
+                ('error', models.TextField(blank=True, verbose_name='خطا')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاریخ ایجاد')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان شروع')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='زمان پایان')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='ایجاد شده توسط')),
+            ],
+            options={
+                'verbose_name': 'کار تولید گزارش',
+                'verbose_name_plural': 'کارهای تولید گزارش',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='reports_rep_status_051565_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+def populate_cash_flow_rollup(apps, schema_editor):
+    CashFlowDailyRollup = apps.get_model('reports', 'CashFlowDailyRollup')
+    Salary = apps.get_model('finance', 'Salary')
+    sources = [
+        (apps.get_model('finance', 'IncomeInvoice').objects.all(), 'income_total'),
+        (apps.get_model('finance', 'ExpenseInvoice').objects.all(), 'expense_total'),
+        (Salary.objects.filter(is_paid=True), 'salary_total'),
+    ]
+
+    rows = {}
+    for queryset, field in sources:
+        for row in queryset.values('date').annotate(total=models.Sum('amount')).order_by():
+            rows.setdefault(row['date'], {})[field] = row['total'] or 0
+
+    CashFlowDailyRollup.objects.bulk_create(
+        [CashFlowDailyRollup(day=day, **values) for day, values in rows.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0008_reportjob_heartbeat'),
+        ('finance', '0007_salary_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CashFlowDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='روز')),
+                ('income_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='جمع درامد')),
+                ('expense_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='جمع هزینه')),
+                ('salary_total', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='جمع حقوق پرداخت\u200cشده')),
+            ],
+            options={
+                'verbose_name': 'خلاصه روزانه گردش نقدی',
+                'verbose_name_plural': 'خلاصه\u200cهای روزانه گردش نقدی',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.RunPython(populate_cash_flow_rollup, migrations.RunPython.noop),
+    ]
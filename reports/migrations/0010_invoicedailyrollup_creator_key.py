@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:50
+
+from django.db import migrations, models
+
+
+def fill_creator_key(apps, schema_editor):
+    InvoiceDailyRollup = apps.get_model('reports', 'InvoiceDailyRollup')
+    InvoiceDailyRollup.objects.filter(created_by__isnull=False).update(creator_key=models.F('created_by_id'))
+
+    # Rows for invoices without a creator could be inserted twice by
+    # concurrent writers, and every later delta was added to both. Their
+    # days are rebuilt from the invoices.
+    days = set(
+        InvoiceDailyRollup.objects.values('day', 'service_category', 'settlement_type', 'creator_key')
+        .annotate(rows=models.Count('id'))
+        .filter(rows__gt=1)
+        .values_list('day', flat=True)
+    )
+    if not days:
+        return
+    InvoiceDailyRollup.objects.filter(day__in=days).delete()
+    sources = [
+        (apps.get_model('persons', 'SalesInvoice'), 'sales_count', 'sales_total', 'sale_price'),
+        (apps.get_model('persons', 'PurchaseInvoice'), 'purchase_count', 'purchase_total', 'purchase_price'),
+    ]
+
+    rows = {}
+    for model, count_field, total_field, price_field in sources:
+        grouped = model.objects.filter(invoice_date__in=days).values(
+            'invoice_date', 'service_category', 'settlement_type', 'created_by'
+        ).annotate(
+            count=models.Count('id'),
+            total=models.Sum(price_field),
+        ).order_by()
+        for row in grouped:
+            key = (row['invoice_date'], row['service_category'], row['settlement_type'], row['created_by'])
+            entry = rows.setdefault(key, {})
+            entry[count_field] = row['count']
+            entry[total_field] = row['total'] or 0
+
+    InvoiceDailyRollup.objects.bulk_create(
+        [
+            InvoiceDailyRollup(
+                day=day,
+                service_category=service_category,
+                settlement_type=settlement_type,
+                created_by_id=created_by_id,
+                creator_key=created_by_id or 0,
+                **values
+            )
+            for (day, service_category, settlement_type, created_by_id), values in rows.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0009_cashflowdailyrollup'),
+        ('persons', '0016_invoice_catalog_service'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='invoicedailyrollup',
+            name='unique_invoice_daily_rollup',
+        ),
+        migrations.AddField(
+            model_name='invoicedailyrollup',
+            name='creator_key',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='کلید کاربر ثبت\u200cکننده'),
+        ),
+        migrations.RunPython(fill_creator_key, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='invoicedailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'service_category', 'settlement_type', 'creator_key'), name='unique_invoice_daily_rollup_key'),
+        ),
+    ]
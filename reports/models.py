@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from accounts.models import CustomUser, OwnedModel
 from persons.models import Person
@@ -163,3 +164,212 @@ class CustomerReport(OwnedModel):
     def __str__(self):
         customer_str = self.customer.get_full_name() if self.customer else 'همه مشتریان'
         return f"گزارش مشتری - {customer_str}"
+
+
+class InvoiceDailyRollup(models.Model):
+    day = models.DateField(
+        verbose_name=_('روز')
+    )
+    service_category = models.CharField(
+        max_length=20,
+        verbose_name=_('دسته‌بندی خدمت')
+    )
+    settlement_type = models.CharField(
+        max_length=20,
+        verbose_name=_('نوع تسویه')
+    )
+    created_by = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='invoice_rollups',
+        verbose_name=_('کاربر ثبت‌کننده')
+    )
+    # created_by_id, or 0 for invoices without a creator. The unique key is
+    # built on this column because NULLs never collide in a unique index.
+    creator_key = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('کلید کاربر ثبت‌کننده')
+    )
+    sales_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('تعداد فاکتور فروش')
+    )
+    sales_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name=_('جمع فروش')
+    )
+    purchase_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('تعداد فاکتور خرید')
+    )
+    purchase_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name=_('جمع خرید')
+    )
+    
+    class Meta:
+        verbose_name = _('خلاصه روزانه فاکتورها')
+        verbose_name_plural = _('خلاصه‌های روزانه فاکتورها')
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'service_category', 'settlement_type', 'creator_key'],
+                name='unique_invoice_daily_rollup_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['created_by', 'day']),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} - {self.service_category} - {self.settlement_type}"
+
+
+class CashFlowDailyRollup(models.Model):
+    day = models.DateField(
+        unique=True,
+        verbose_name=_('روز')
+    )
+    income_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name=_('جمع درامد')
+    )
+    expense_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name=_('جمع هزینه')
+    )
+    salary_total = models.DecimalField(
+        max_digits=18,
+        decimal_places=2,
+        default=0,
+        verbose_name=_('جمع حقوق پرداخت‌شده')
+    )
+    
+    class Meta:
+        verbose_name = _('خلاصه روزانه گردش نقدی')
+        verbose_name_plural = _('خلاصه‌های روزانه گردش نقدی')
+        ordering = ['day']
+    
+    def __str__(self):
+        return str(self.day)
+
+
+class DataVersion(models.Model):
+    key = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name=_('کلید')
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_('نسخه')
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_('تاریخ به‌روز‌رسانی')
+    )
+    
+    class Meta:
+        verbose_name = _('نسخه داده')
+        verbose_name_plural = _('نسخه‌های داده')
+    
+    def __str__(self):
+        return f"{self.key}: {self.version}"
+
+
+class ReportJob(OwnedModel):
+    REPORT_TYPE_CHOICES = [
+        ('customer', _('گزارش مشتری')),
+        ('financial', _('گزارش مالی')),
+        ('employee', _('گزارش کارمند')),
+    ]
+    
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _('در صف')),
+        (STATUS_RUNNING, _('در حال اجرا')),
+        (STATUS_DONE, _('انجام شده')),
+        (STATUS_FAILED, _('ناموفق')),
+    ]
+    
+    report_type = models.CharField(
+        max_length=20,
+        choices=REPORT_TYPE_CHOICES,
+        verbose_name=_('نوع گزارش')
+    )
+    report_id = models.PositiveIntegerField(
+        verbose_name=_('شناسه گزارش')
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name=_('وضعیت')
+    )
+    progress = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_('پیشرفت')
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name=_('خطا')
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('تاریخ ایجاد')
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('زمان شروع')
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('زمان پایان')
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('آخرین اعلام حیات')
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_('تعداد تلاش')
+    )
+    
+    class Meta:
+        verbose_name = _('کار تولید گزارش')
+        verbose_name_plural = _('کارهای تولید گزارش')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_report_type_display()} #{self.report_id} - {self.get_status_display()}"
+    
+    def current_run(self):
+        # Matches only while this claim still owns the job; once it is
+        # reclaimed and claimed again, writes from the old run are dropped.
+        return ReportJob.objects.filter(pk=self.pk, attempts=self.attempts, status=self.STATUS_RUNNING)
+    
+    def set_progress(self, progress):
+        self.progress = progress
+        self.heartbeat_at = timezone.now()
+        self.current_run().update(progress=progress, heartbeat_at=self.heartbeat_at)
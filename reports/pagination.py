@@ -0,0 +1,127 @@
+import base64
+import json
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.db.models import Q
+
+
+REPORT_PAGE_SIZE = 100
+
+
+def encode_cursor(key):
+    row_date, number, kind = key
+    payload = json.dumps([row_date.isoformat(), number, kind])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        row_date, number, kind = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        return date.fromisoformat(row_date), int(number), str(kind)
+    except (ValueError, TypeError):
+        return None
+
+
+def encode_ledger_cursor(key, balance):
+    row_date, number, kind = key
+    payload = json.dumps([row_date.isoformat(), number, kind, str(balance)])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_ledger_cursor(token):
+    # Ledger cursors also carry the running balance at the last row shown,
+    # which becomes the opening balance of the next page.
+    if not token:
+        return None
+    try:
+        row_date, number, kind, balance = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        return (date.fromisoformat(row_date), int(number), str(kind)), Decimal(balance)
+    except (ValueError, TypeError, InvalidOperation):
+        return None
+
+
+def keyset_filter(queryset, cursor, kind, date_field='invoice_date', number_field='invoice_number'):
+    # Rows are ordered by (date, number, kind) descending; only rows strictly
+    # after the cursor survive. kind is constant per queryset, so the last
+    # tie-break becomes a choice between lt and lte on the number.
+    cursor_date, cursor_number, cursor_kind = cursor
+    number_lookup = 'lte' if kind < cursor_kind else 'lt'
+    return queryset.filter(
+        Q(**{f'{date_field}__lt': cursor_date}) |
+        Q(**{date_field: cursor_date, f'{number_field}__{number_lookup}': cursor_number})
+    )
+
+
+def keyset_page(sources, cursor=None, page_size=REPORT_PAGE_SIZE,
+                date_field='invoice_date', number_field='invoice_number'):
+    rows = []
+    for kind, queryset in sources:
+        if cursor:
+            queryset = keyset_filter(queryset, cursor, kind, date_field, number_field)
+        queryset = queryset.order_by(f'-{date_field}', f'-{number_field}')[:page_size + 1]
+        rows.extend(
+            ((getattr(obj, date_field), getattr(obj, number_field), kind), obj)
+            for obj in queryset
+        )
+
+    rows.sort(key=lambda row: row[0], reverse=True)
+    next_cursor = encode_cursor(rows[page_size - 1][0]) if len(rows) > page_size else None
+    return [obj for _, obj in rows[:page_size]], next_cursor
+
+
+def _row_value(row, field):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+def keyset_iterator(queryset, chunk_size, date_field='invoice_date', number_field='invoice_number'):
+    # Walks the rows in (date, number) descending order, one LIMITed query
+    # per chunk. Unlike QuerySet.iterator() this keeps memory flat on
+    # backends that buffer the whole result set client-side (mysqlclient).
+    cursor = None
+    while True:
+        chunk = queryset
+        if cursor:
+            chunk = keyset_filter(chunk, cursor, '', date_field, number_field)
+        chunk = list(chunk.order_by(f'-{date_field}', f'-{number_field}')[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1]
+        cursor = (_row_value(last, date_field), _row_value(last, number_field), '')
+
+
+def keyset_union_page(sources, cursor=None, page_size=REPORT_PAGE_SIZE,
+                      date_field='invoice_date', number_field='invoice_number'):
+    # Same ordering contract as keyset_page, but the merge, sort and limit
+    # happen in one UNION ALL query. Each source must be a values() queryset
+    # projecting the same columns, including a constant "kind" column.
+    querysets = [
+        keyset_filter(queryset, cursor, kind, date_field, number_field) if cursor else queryset
+        for kind, queryset in sources
+    ]
+    union = querysets[0].union(*querysets[1:], all=True)
+    rows = list(union.order_by(f'-{date_field}', f'-{number_field}', '-kind')[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        last = rows[page_size - 1]
+        next_cursor = encode_cursor((last[date_field], last[number_field], last['kind']))
+    return rows[:page_size], next_cursor
+
+
+def page_url(request, param, cursor):
+    query = request.GET.copy()
+    query.pop(param, None)
+    if cursor:
+        query[param] = cursor
+    encoded = query.urlencode()
+    return f'?{encoded}' if encoded else request.path
+
+
+def page_links(request, param, cursor, next_cursor):
+    return {
+        'next_page_url': page_url(request, param, next_cursor) if next_cursor else None,
+        'first_page_url': page_url(request, param, None) if cursor else None,
+    }
+
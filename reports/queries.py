@@ -0,0 +1,321 @@
+from django.db.models import Count, F, Q, Sum, Value
+from django.utils.translation import gettext_lazy as _
+from accounts.jalali import JALALI_MONTH_NAMES
+from accounts.models import CustomUser
+from persons.models import SalesInvoice, PurchaseInvoice
+from .pagination import keyset_page, keyset_union_page
+from .rollup import rollup_totals
+from finance.models import Salary
+
+
+def is_report_admin(user):
+    return user.is_superuser or getattr(user, 'role', None) == 'admin'
+
+
+def customer_report_querysets(report, owner=None):
+    sales_query = SalesInvoice.objects.all()
+    purchase_query = PurchaseInvoice.objects.all()
+
+    if owner is not None:
+        sales_query = sales_query.filter(created_by=owner)
+        purchase_query = purchase_query.filter(created_by=owner)
+
+    if report.customer_id:
+        sales_query = sales_query.filter(buyer=report.customer_id)
+        purchase_query = purchase_query.filter(vendor=report.customer_id)
+
+    if report.service_category:
+        sales_query = sales_query.filter(service_category=report.service_category)
+        purchase_query = purchase_query.filter(service_category=report.service_category)
+
+    if report.service_id:
+        sales_query = sales_query.filter(service_id=report.service_id)
+        purchase_query = purchase_query.filter(service_id=report.service_id)
+
+    if report.settlement_type != 'all':
+        sales_query = sales_query.filter(settlement_type=report.settlement_type)
+        purchase_query = purchase_query.filter(settlement_type=report.settlement_type)
+
+    if report.single_date:
+        sales_query = sales_query.filter(invoice_date=report.single_date)
+        purchase_query = purchase_query.filter(invoice_date=report.single_date)
+    elif report.start_date and report.end_date:
+        sales_query = sales_query.filter(
+            invoice_date__gte=report.start_date,
+            invoice_date__lte=report.end_date
+        )
+        purchase_query = purchase_query.filter(
+            invoice_date__gte=report.start_date,
+            invoice_date__lte=report.end_date
+        )
+
+    if report.filter_user_id:
+        sales_query = sales_query.filter(created_by=report.filter_user_id)
+        purchase_query = purchase_query.filter(created_by=report.filter_user_id)
+
+    if report.invoice_type not in ['sales', 'all']:
+        sales_query = sales_query.none()
+    if report.invoice_type not in ['purchase', 'all']:
+        purchase_query = purchase_query.none()
+
+    return (
+        sales_query.select_related('buyer', 'created_by'),
+        purchase_query.select_related('vendor', 'created_by'),
+    )
+
+
+def financial_report_querysets(report):
+    sales_query = SalesInvoice.objects.filter(
+        invoice_date__gte=report.start_date,
+        invoice_date__lte=report.end_date
+    ).select_related('created_by', 'buyer')
+
+    purchase_query = PurchaseInvoice.objects.filter(
+        invoice_date__gte=report.start_date,
+        invoice_date__lte=report.end_date
+    ).select_related('created_by', 'vendor')
+
+    return sales_query, purchase_query
+
+
+def employee_report_querysets(report):
+    sales_query = SalesInvoice.objects.filter(
+        created_by=report.employee_id,
+        invoice_date__gte=report.start_date,
+        invoice_date__lte=report.end_date
+    ).select_related('buyer', 'created_by', 'catalog_service')
+
+    purchase_query = PurchaseInvoice.objects.filter(
+        created_by=report.employee_id,
+        invoice_date__gte=report.start_date,
+        invoice_date__lte=report.end_date
+    ).select_related('vendor', 'created_by', 'catalog_service')
+
+    salary_query = Salary.objects.filter(
+        employee=report.employee_id,
+        date__gte=report.start_date,
+        date__lte=report.end_date
+    ).select_related('employee')
+
+    return sales_query, purchase_query, salary_query
+
+
+def customer_report_totals(sales_query, purchase_query):
+    sales = sales_query.aggregate(count=Count('id'), total=Sum('sale_price'))
+    purchases = purchase_query.aggregate(count=Count('id'), total=Sum('purchase_price'))
+    return {
+        'total_count': sales['count'] + purchases['count'],
+        'total_price': (sales['total'] or 0) + (purchases['total'] or 0),
+    }
+
+
+CUSTOMER_INVOICE_FIELDS = (
+    'id', 'invoice_number', 'invoice_date', 'service_category', 'service_id',
+    'other_service_title', 'settlement_type', 'attachment',
+)
+
+CUSTOMER_INVOICE_ORDERING = ('-invoice_date', '-invoice_number', '-kind')
+
+
+def _customer_invoice_values(queryset, kind, person_field, price_field):
+    return queryset.order_by().values(
+        *CUSTOMER_INVOICE_FIELDS,
+        kind=Value(kind),
+        customer_first_name=F(f'{person_field}__first_name'),
+        customer_last_name=F(f'{person_field}__last_name'),
+        creator_first_name=F('created_by__first_name'),
+        creator_last_name=F('created_by__last_name'),
+        creator_username=F('created_by__username'),
+        price=F(price_field),
+        service_name=F('catalog_service__name'),
+    )
+
+
+def customer_invoice_sources(sales_query, purchase_query):
+    return [
+        ('sales', _customer_invoice_values(sales_query, 'sales', 'buyer', 'sale_price')),
+        ('purchase', _customer_invoice_values(purchase_query, 'purchase', 'vendor', 'purchase_price')),
+    ]
+
+
+def customer_invoice_union(sales_query, purchase_query):
+    sources = [queryset for _kind, queryset in customer_invoice_sources(sales_query, purchase_query)]
+    return sources[0].union(*sources[1:], all=True).order_by(*CUSTOMER_INVOICE_ORDERING)
+
+
+SERVICE_CATEGORY_LABELS = dict(SalesInvoice.SERVICE_TYPE_CHOICES)
+SETTLEMENT_LABELS = dict(SalesInvoice.SETTLEMENT_CHOICES)
+
+
+def customer_invoice_row(row):
+    is_sale = row['kind'] == 'sales'
+    attachment = row['attachment']
+    if row['creator_username'] is not None:
+        created_by = CustomUser(
+            username=row['creator_username'],
+            first_name=row['creator_first_name'],
+            last_name=row['creator_last_name'],
+        ).get_display_name()
+    else:
+        created_by = '-'
+    return {
+        'type': _('فروش') if is_sale else _('خرید'),
+        'invoice_type_key': row['kind'],
+        'id': row['id'],
+        'invoice_number': row['invoice_number'],
+        'invoice_date': row['invoice_date'],
+        'customer_first_name': row['customer_first_name'],
+        'customer_last_name': row['customer_last_name'],
+        'service_category': SERVICE_CATEGORY_LABELS.get(row['service_category'], row['service_category']),
+        'service_name': row['service_name'] or row['other_service_title'] or _('نامشخص'),
+        'settlement_type': SETTLEMENT_LABELS.get(row['settlement_type'], row['settlement_type']),
+        'created_by': created_by,
+        'price': row['price'],
+        'attachment': attachment or None,
+        'attachment_name': attachment.split('/')[-1] if attachment else None,
+    }
+
+
+def customer_invoice_rows(rows):
+    return [customer_invoice_row(row) for row in rows]
+
+
+def customer_report_page(report, cursor, owner=None, progress=None):
+    sales_query, purchase_query = customer_report_querysets(report, owner=owner)
+    totals = customer_report_totals(sales_query, purchase_query)
+    if progress:
+        progress(50)
+    rows, next_cursor = keyset_union_page(customer_invoice_sources(sales_query, purchase_query), cursor)
+    if progress:
+        progress(90)
+    return {
+        'invoices': customer_invoice_rows(rows),
+        'next_cursor': next_cursor,
+        **totals,
+    }
+
+
+def financial_report_page(report, cursor, progress=None):
+    sales_query, purchase_query = financial_report_querysets(report)
+    totals = rollup_totals(report.start_date, report.end_date)
+    if progress:
+        progress(30)
+    invoices, next_cursor = keyset_page(
+        [('sales', sales_query), ('purchase', purchase_query)], cursor,
+    )
+    if progress:
+        progress(60)
+    monthly_totals = jalali_monthly_totals(sales_query, purchase_query) if cursor is None else []
+    if progress:
+        progress(90)
+    return {
+        'sales_invoices': [invoice for invoice in invoices if isinstance(invoice, SalesInvoice)],
+        'purchase_invoices': [invoice for invoice in invoices if isinstance(invoice, PurchaseInvoice)],
+        'next_cursor': next_cursor,
+        'total_income': totals['sales_total'],
+        'total_expenses': totals['purchase_total'],
+        'net_amount': totals['sales_total'] - totals['purchase_total'],
+        'sales_count': totals['sales_count'],
+        'purchase_count': totals['purchase_count'],
+        'total_invoices': totals['sales_count'] + totals['purchase_count'],
+        'monthly_totals': monthly_totals,
+        'yearly_totals': jalali_yearly_totals(monthly_totals),
+    }
+
+
+def employee_salary_totals(salaries):
+    paid = Q(is_paid=True)
+    unpaid = Q(is_paid=False)
+    totals = salaries.order_by().aggregate(
+        salaries_count=Count('id'),
+        paid_salaries_count=Count('id', filter=paid),
+        unpaid_salaries_count=Count('id', filter=unpaid),
+        total_salary_amount=Sum('amount'),
+        paid_salary_amount=Sum('amount', filter=paid),
+        unpaid_salary_amount=Sum('amount', filter=unpaid),
+    )
+    for key in ('total_salary_amount', 'paid_salary_amount', 'unpaid_salary_amount'):
+        totals[key] = totals[key] or 0
+    return totals
+
+
+def employee_report_page(report, cursor, salary_cursor, progress=None):
+    sales_query, purchase_query, salaries = employee_report_querysets(report)
+    invoice_totals = rollup_totals(report.start_date, report.end_date, created_by=report.employee_id)
+    if progress:
+        progress(25)
+    invoices, next_cursor = keyset_page(
+        [('sales', sales_query), ('purchase', purchase_query)], cursor,
+    )
+    if progress:
+        progress(50)
+    salary_page, next_salary_cursor = keyset_page(
+        [('salary', salaries)], salary_cursor, date_field='date', number_field='pk',
+    )
+    if progress:
+        progress(75)
+    salary_totals = employee_salary_totals(salaries)
+    if progress:
+        progress(90)
+    return {
+        'sales_invoices': [invoice for invoice in invoices if isinstance(invoice, SalesInvoice)],
+        'purchase_invoices': [invoice for invoice in invoices if isinstance(invoice, PurchaseInvoice)],
+        'salaries': salary_page,
+        'next_cursor': next_cursor,
+        'next_salary_cursor': next_salary_cursor,
+        'sales_count': invoice_totals['sales_count'],
+        'purchase_count': invoice_totals['purchase_count'],
+        **salary_totals,
+    }
+
+
+def jalali_period_totals(queryset, amount_field):
+    period = ['jalali_year', 'jalali_month']
+    return (
+        queryset.order_by()
+        .values(*period)
+        .annotate(count=Count('id'), total=Sum(amount_field))
+        .order_by(*period)
+    )
+
+
+def jalali_monthly_totals(sales_query, purchase_query):
+    # One indexed GROUP BY per table on the stored Jalali columns, merged
+    # into a row per Persian month.
+    months = {}
+    for queryset, price_field, prefix in (
+        (sales_query, 'sale_price', 'sales'),
+        (purchase_query, 'purchase_price', 'purchase'),
+    ):
+        for row in jalali_period_totals(queryset, price_field):
+            month = months.setdefault((row['jalali_year'], row['jalali_month']), {
+                'sales_count': 0, 'sales_total': 0, 'purchase_count': 0, 'purchase_total': 0,
+            })
+            month[f'{prefix}_count'] = row['count']
+            month[f'{prefix}_total'] = row['total'] or 0
+
+    return [
+        {
+            'year': year,
+            'month': month,
+            'label': f'{JALALI_MONTH_NAMES[month - 1]} {year}',
+            **totals,
+            'net': totals['sales_total'] - totals['purchase_total'],
+        }
+        for (year, month), totals in sorted(months.items())
+        if year and month
+    ]
+
+
+def jalali_yearly_totals(monthly_totals):
+    # Persian years are summed from the monthly rows instead of another
+    # GROUP BY over the invoices.
+    years = {}
+    for month in monthly_totals:
+        year = years.setdefault(month['year'], {
+            'year': month['year'],
+            'sales_count': 0, 'sales_total': 0, 'purchase_count': 0, 'purchase_total': 0, 'net': 0,
+        })
+        for field in ('sales_count', 'sales_total', 'purchase_count', 'purchase_total', 'net'):
+            year[field] += month[field]
+    return list(years.values())
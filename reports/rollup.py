@@ -0,0 +1,286 @@
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from finance.models import ExpenseInvoice, IncomeInvoice, Salary
+from persons.models import SalesInvoice, PurchaseInvoice
+from .models import CashFlowDailyRollup, InvoiceDailyRollup
+
+
+ROLLUP_SOURCES = {
+    SalesInvoice: ('sales_count', 'sales_total', 'sale_price'),
+    PurchaseInvoice: ('purchase_count', 'purchase_total', 'purchase_price'),
+}
+
+ROLLUP_KEY_FIELDS = ('invoice_date', 'service_category', 'settlement_type', 'created_by_id')
+
+TOTAL_FIELDS = ('sales_count', 'sales_total', 'purchase_count', 'purchase_total')
+
+CASH_FLOW_SOURCES = {
+    IncomeInvoice: 'income_total',
+    ExpenseInvoice: 'expense_total',
+    Salary: 'salary_total',
+}
+
+
+def invoice_rollup_state(invoice):
+    price_field = ROLLUP_SOURCES[type(invoice)][2]
+    key = tuple(getattr(invoice, field) for field in ROLLUP_KEY_FIELDS)
+    return key, Decimal(str(getattr(invoice, price_field) or 0))
+
+
+def _key_lookup(key):
+    day, service_category, settlement_type, created_by_id = key
+    return {
+        'day': day,
+        'service_category': service_category,
+        'settlement_type': settlement_type,
+        'creator_key': created_by_id or 0,
+    }
+
+
+def _new_rollup_row(key, **totals):
+    return InvoiceDailyRollup(**_key_lookup(key), created_by_id=key[3], **totals)
+
+
+def apply_invoice_delta(model, key, count, amount):
+    count_field, total_field, _ = ROLLUP_SOURCES[model]
+    lookup = _key_lookup(key)
+    changes = {
+        count_field: F(count_field) + count,
+        total_field: F(total_field) + amount,
+    }
+
+    with transaction.atomic():
+        updated = InvoiceDailyRollup.objects.filter(**lookup).update(**changes)
+        if not updated and count > 0:
+            try:
+                with transaction.atomic():
+                    _new_rollup_row(key, **{count_field: count, total_field: amount}).save(force_insert=True)
+            except IntegrityError:
+                InvoiceDailyRollup.objects.filter(**lookup).update(**changes)
+        elif count < 0:
+            InvoiceDailyRollup.objects.filter(
+                sales_count=0,
+                purchase_count=0,
+                **lookup
+            ).delete()
+
+
+def apply_bulk_update_deltas(model, invoices, changes):
+    # invoices are the rows before an update() that wrote changes to all of
+    # them; the rollup moves each row from its old key to its new one. Rows
+    # sharing a key are netted first, so a chunk costs one statement per
+    # distinct key rather than per row.
+    price_field = ROLLUP_SOURCES[model][2]
+    values = {}
+    for name, value in changes.items():
+        field = model._meta.get_field(name)
+        values[field.attname] = value.pk if field.is_relation and hasattr(value, 'pk') else value
+    if values.keys().isdisjoint((*ROLLUP_KEY_FIELDS, price_field)):
+        return 0
+
+    deltas = {}
+    for invoice in invoices:
+        previous_key, previous_amount = invoice_rollup_state(invoice)
+        key = tuple(values.get(field, value) for field, value in zip(ROLLUP_KEY_FIELDS, previous_key))
+        amount = Decimal(str(values[price_field] or 0)) if price_field in values else previous_amount
+        if (previous_key, previous_amount) == (key, amount):
+            continue
+        for delta_key, count, delta_amount in ((previous_key, -1, -previous_amount), (key, 1, amount)):
+            delta = deltas.setdefault(delta_key, [0, Decimal('0')])
+            delta[0] += count
+            delta[1] += delta_amount
+
+    # Additions go first so a key that only gains rows is never deleted.
+    for key, (count, amount) in sorted(deltas.items(), key=lambda item: item[1][0] < 0):
+        if count or amount:
+            apply_invoice_delta(model, key, count, amount)
+    return len(deltas)
+
+
+def rebuild_rollup(start_date=None, end_date=None, days=None):
+    rows = {}
+
+    with transaction.atomic():
+        stale = InvoiceDailyRollup.objects.all()
+        if start_date:
+            stale = stale.filter(day__gte=start_date)
+        if end_date:
+            stale = stale.filter(day__lte=end_date)
+        if days is not None:
+            stale = stale.filter(day__in=days)
+        stale.delete()
+
+        for model, (count_field, total_field, price_field) in ROLLUP_SOURCES.items():
+            queryset = model.objects.all()
+            if start_date:
+                queryset = queryset.filter(invoice_date__gte=start_date)
+            if end_date:
+                queryset = queryset.filter(invoice_date__lte=end_date)
+            if days is not None:
+                queryset = queryset.filter(invoice_date__in=days)
+
+            grouped = queryset.values(
+                'invoice_date',
+                'service_category',
+                'settlement_type',
+                'created_by',
+            ).annotate(
+                count=Count('id'),
+                total=Sum(price_field),
+            ).order_by()
+
+            for row in grouped:
+                key = (
+                    row['invoice_date'],
+                    row['service_category'],
+                    row['settlement_type'],
+                    row['created_by'],
+                )
+                entry = rows.setdefault(key, {})
+                entry[count_field] = row['count']
+                entry[total_field] = row['total'] or Decimal('0')
+
+        InvoiceDailyRollup.objects.bulk_create(
+            [
+                _new_rollup_row(key, **values)
+                for key, values in rows.items()
+            ],
+            batch_size=1000,
+        )
+
+    return len(rows)
+
+
+def _empty_totals():
+    return {
+        field: 0 if field.endswith('_count') else Decimal('0')
+        for field in TOTAL_FIELDS
+    }
+
+
+def rollup_totals(start_date, end_date, **filters):
+    totals = InvoiceDailyRollup.objects.filter(
+        day__gte=start_date,
+        day__lte=end_date,
+        **filters
+    ).aggregate(**{field: Sum(field) for field in TOTAL_FIELDS})
+
+    empty = _empty_totals()
+    return {field: totals[field] or empty[field] for field in TOTAL_FIELDS}
+
+
+def rollup_totals_for_ranges(ranges, by_creator=False):
+    # ranges are (start_date, end_date, created_by_id) tuples; the daily rows
+    # covering all of them are fetched once and turned into running sums.
+    ranges = list(ranges)
+    if not ranges:
+        return []
+
+    group_fields = ['day']
+    queryset = InvoiceDailyRollup.objects.filter(
+        day__gte=min(start for start, _, _ in ranges),
+        day__lte=max(end for _, end, _ in ranges),
+    )
+    if by_creator:
+        group_fields = ['created_by', 'day']
+        queryset = queryset.filter(
+            created_by__in={creator for _, _, creator in ranges}
+        )
+
+    series = {}
+    grouped = queryset.values(*group_fields).annotate(
+        **{field: Sum(field) for field in TOTAL_FIELDS}
+    ).order_by(*group_fields)
+    for row in grouped:
+        days, running = series.setdefault(row.get('created_by'), ([], []))
+        previous = running[-1] if running else _empty_totals()
+        days.append(row['day'])
+        running.append({
+            field: previous[field] + (row[field] or 0)
+            for field in TOTAL_FIELDS
+        })
+
+    empty = _empty_totals()
+    results = []
+    for start, end, creator in ranges:
+        days, running = series.get(creator if by_creator else None, ([], []))
+        upper = bisect_right(days, end)
+        lower = bisect_left(days, start)
+        upper_totals = running[upper - 1] if upper else empty
+        lower_totals = running[lower - 1] if lower else empty
+        results.append({
+            field: upper_totals[field] - lower_totals[field]
+            for field in TOTAL_FIELDS
+        })
+    return results
+
+
+def _cash_flow_queryset(model):
+    # Salaries only move cash once they are paid.
+    return model.objects.filter(is_paid=True) if model is Salary else model.objects.all()
+
+
+def cash_flow_state(instance):
+    if isinstance(instance, Salary) and not instance.is_paid:
+        return None
+    return instance.date, Decimal(str(instance.amount or 0))
+
+
+def apply_cash_flow_delta(model, day, amount):
+    field = CASH_FLOW_SOURCES[model]
+    changes = {field: F(field) + amount}
+
+    with transaction.atomic():
+        if CashFlowDailyRollup.objects.filter(day=day).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                CashFlowDailyRollup.objects.create(day=day, **{field: amount})
+        except IntegrityError:
+            CashFlowDailyRollup.objects.filter(day=day).update(**changes)
+
+
+def rebuild_cash_flow_rollup(start_date=None, end_date=None):
+    rows = {}
+
+    with transaction.atomic():
+        stale = CashFlowDailyRollup.objects.all()
+        if start_date:
+            stale = stale.filter(day__gte=start_date)
+        if end_date:
+            stale = stale.filter(day__lte=end_date)
+        stale.delete()
+
+        for model, field in CASH_FLOW_SOURCES.items():
+            queryset = _cash_flow_queryset(model)
+            if start_date:
+                queryset = queryset.filter(date__gte=start_date)
+            if end_date:
+                queryset = queryset.filter(date__lte=end_date)
+            grouped = queryset.values('date').annotate(total=Sum('amount')).order_by()
+            for row in grouped:
+                rows.setdefault(row['date'], {})[field] = row['total'] or Decimal('0')
+
+        CashFlowDailyRollup.objects.bulk_create(
+            [CashFlowDailyRollup(day=day, **values) for day, values in rows.items()],
+            batch_size=1000,
+        )
+
+    return len(rows)
+
+
+def cash_balance_before(day):
+    # Net cash of everything dated before day, read from the two daily
+    # rollups so the cost follows the number of days, not of rows.
+    invoices = InvoiceDailyRollup.objects.filter(day__lt=day).aggregate(
+        sales=Sum('sales_total'), purchases=Sum('purchase_total'),
+    )
+    finance = CashFlowDailyRollup.objects.filter(day__lt=day).aggregate(
+        income=Sum('income_total'), expenses=Sum('expense_total'), salaries=Sum('salary_total'),
+    )
+    return (
+        (invoices['sales'] or 0) - (invoices['purchases'] or 0)
+        + (finance['income'] or 0) - (finance['expenses'] or 0) - (finance['salaries'] or 0)
+    )
@@ -0,0 +1,115 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from finance.models import ExpenseInvoice, IncomeInvoice, Salary
+from persons.models import Person, SalesInvoice, PurchaseInvoice
+from persons.signals import invoices_bulk_changed, invoices_bulk_updated
+from services.catalog import SERVICE_MODELS
+from .rollup import (
+    CASH_FLOW_SOURCES, apply_bulk_update_deltas, apply_cash_flow_delta, apply_invoice_delta, cash_flow_state,
+    invoice_rollup_state, rebuild_rollup,
+)
+from .versioning import PERSON_DATA, REPORT_DATA, bump_data_version
+
+
+@receiver(pre_save, sender=SalesInvoice)
+@receiver(pre_save, sender=PurchaseInvoice)
+def remember_invoice_rollup_state(sender, instance, raw=False, **kwargs):
+    instance._rollup_previous = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+
+    previous = sender.objects.filter(pk=instance.pk).first()
+    if previous:
+        instance._rollup_previous = invoice_rollup_state(previous)
+
+
+@receiver(post_save, sender=SalesInvoice)
+@receiver(post_save, sender=PurchaseInvoice)
+def update_invoice_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, '_rollup_previous', None)
+    current = invoice_rollup_state(instance)
+    if previous == current:
+        return
+
+    if previous:
+        apply_invoice_delta(sender, previous[0], -1, -previous[1])
+    apply_invoice_delta(sender, current[0], 1, current[1])
+
+
+@receiver(post_delete, sender=SalesInvoice)
+@receiver(post_delete, sender=PurchaseInvoice)
+def remove_invoice_from_rollup(sender, instance, **kwargs):
+    key, amount = invoice_rollup_state(instance)
+    apply_invoice_delta(sender, key, -1, -amount)
+
+
+@receiver(invoices_bulk_changed)
+def refresh_rollup_after_bulk_change(sender, days, **kwargs):
+    if days:
+        rebuild_rollup(days=sorted(days))
+    bump_data_version(REPORT_DATA)
+
+
+@receiver(invoices_bulk_updated)
+def update_rollup_after_bulk_update(sender, invoices, changes, **kwargs):
+    apply_bulk_update_deltas(sender, invoices, changes)
+    bump_data_version(REPORT_DATA)
+
+
+def remember_cash_flow_state(sender, instance, raw=False, **kwargs):
+    instance._cash_flow_previous = None
+    if raw or instance._state.adding or not instance.pk:
+        return
+
+    previous = sender.objects.filter(pk=instance.pk).first()
+    if previous:
+        instance._cash_flow_previous = cash_flow_state(previous)
+
+
+def update_cash_flow_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, '_cash_flow_previous', None)
+    current = cash_flow_state(instance)
+    if previous == current:
+        return
+
+    if previous:
+        apply_cash_flow_delta(sender, previous[0], -previous[1])
+    if current:
+        apply_cash_flow_delta(sender, current[0], current[1])
+
+
+def remove_from_cash_flow_rollup(sender, instance, **kwargs):
+    current = cash_flow_state(instance)
+    if current:
+        apply_cash_flow_delta(sender, current[0], -current[1])
+
+
+for model in CASH_FLOW_SOURCES:
+    pre_save.connect(remember_cash_flow_state, sender=model, dispatch_uid=f'cash_flow_pre_save_{model.__name__}')
+    post_save.connect(update_cash_flow_rollup, sender=model, dispatch_uid=f'cash_flow_save_{model.__name__}')
+    post_delete.connect(remove_from_cash_flow_rollup, sender=model, dispatch_uid=f'cash_flow_delete_{model.__name__}')
+
+
+def bump_report_data_version(sender, raw=False, **kwargs):
+    if not raw:
+        bump_data_version(REPORT_DATA)
+
+
+for model in (SalesInvoice, PurchaseInvoice, Salary, IncomeInvoice, ExpenseInvoice, Person, *SERVICE_MODELS.values()):
+    post_save.connect(bump_report_data_version, sender=model, dispatch_uid=f'report_data_save_{model.__name__}')
+    post_delete.connect(bump_report_data_version, sender=model, dispatch_uid=f'report_data_delete_{model.__name__}')
+
+
+def bump_person_data_version(sender, raw=False, **kwargs):
+    if not raw:
+        bump_data_version(PERSON_DATA)
+
+
+post_save.connect(bump_person_data_version, sender=Person, dispatch_uid='person_data_save')
+post_delete.connect(bump_person_data_version, sender=Person, dispatch_uid='person_data_delete')
@@ -1,3 +1,588 @@
-from django.test import TestCase
+import csv
+import io
+import zipfile
+from unittest import mock
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from factories import CustomUserFactory, PersonFactory
+from finance.models import ExpenseInvoice, IncomeInvoice, Salary
+from finance.payroll import create_payroll_run, mark_payroll_runs_paid
+from persons.models import SalesInvoice, PurchaseInvoice
+from .jobs import claim_next_job, run_job, run_pending_jobs
+from .ledger import cash_flow_page, opening_balance
+from .models import CustomerReport, EmployeeReport, FinancialReport, InvoiceDailyRollup, ReportJob
+from .pagination import decode_cursor, decode_ledger_cursor, keyset_page, keyset_union_page
+from .queries import customer_invoice_sources, employee_salary_totals, financial_report_page
+from .rollup import rebuild_cash_flow_rollup, rebuild_rollup, rollup_totals, rollup_totals_for_ranges
+
+
+class InvoiceRollupTests(TestCase):
+    def setUp(self):
+        self.user = CustomUserFactory()
+        self.person = PersonFactory()
+
+    def create_sale(self, **kwargs):
+        data = {
+            'buyer': self.person,
+            'invoice_date': date(2024, 3, 1),
+            'service_category': 'legal',
+            'sale_price': Decimal('1000'),
+            'settlement_type': 'cash',
+            'created_by': self.user,
+        }
+        data.update(kwargs)
+        return SalesInvoice.objects.create(**data)
+
+    def create_purchase(self, **kwargs):
+        data = {
+            'vendor': self.person,
+            'invoice_date': date(2024, 3, 1),
+            'service_category': 'legal',
+            'purchase_price': Decimal('400'),
+            'settlement_type': 'cash',
+            'created_by': self.user,
+        }
+        data.update(kwargs)
+        return PurchaseInvoice.objects.create(**data)
+
+    def test_save_and_delete_keep_rollup_current(self):
+        sale = self.create_sale()
+        self.create_sale(sale_price=Decimal('500'))
+        self.create_purchase()
+
+        totals = rollup_totals(date(2024, 1, 1), date(2024, 12, 31))
+        self.assertEqual(totals['sales_count'], 2)
+        self.assertEqual(totals['sales_total'], Decimal('1500'))
+        self.assertEqual(totals['purchase_count'], 1)
+        self.assertEqual(totals['purchase_total'], Decimal('400'))
+
+        sale.invoice_date = date(2025, 1, 1)
+        sale.save()
+        totals = rollup_totals(date(2024, 1, 1), date(2024, 12, 31))
+        self.assertEqual(totals['sales_count'], 1)
+        self.assertEqual(totals['sales_total'], Decimal('500'))
+
+        sale.delete()
+        self.assertFalse(InvoiceDailyRollup.objects.filter(day=date(2025, 1, 1)).exists())
+
+    def test_invoices_without_creator_share_one_rollup_row(self):
+        self.create_sale(created_by=None)
+        self.create_sale(created_by=None, sale_price=Decimal('500'))
+        row = InvoiceDailyRollup.objects.get()
+        self.assertEqual((row.creator_key, row.sales_count, row.sales_total), (0, 2, Decimal('1500')))
+
+        # A concurrent first insert for the same key loses on the unique
+        # constraint and falls back to updating the winner's row.
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            InvoiceDailyRollup.objects.create(
+                day=row.day, service_category='legal', settlement_type='cash', sales_count=1,
+            )
+
+    def test_financial_report_groups_by_jalali_month(self):
+        self.create_sale(invoice_date=date(2024, 3, 19))
+        self.create_sale(invoice_date=date(2024, 3, 20), sale_price=Decimal('500'))
+        self.create_purchase(invoice_date=date(2024, 4, 1))
+        report = FinancialReport.objects.create(start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+
+        page = financial_report_page(report, None)
+        self.assertEqual(
+            [(month['label'], month['sales_total'], month['purchase_total'], month['net']) for month in page['monthly_totals']],
+            [
+                ('اسفند 1402', Decimal('1000'), 0, Decimal('1000')),
+                ('فروردین 1403', Decimal('500'), Decimal('400'), Decimal('100')),
+            ],
+        )
+        self.assertEqual(
+            [(year['year'], year['sales_count'], year['net']) for year in page['yearly_totals']],
+            [(1402, 1, Decimal('1000')), (1403, 1, Decimal('100'))],
+        )
+
+    def test_rollup_totals_filter_by_creator(self):
+        other = CustomUserFactory()
+        self.create_sale()
+        self.create_sale(created_by=other)
+
+        totals = rollup_totals(date(2024, 1, 1), date(2024, 12, 31), created_by=other)
+        self.assertEqual(totals['sales_count'], 1)
+
+    def test_rebuild_matches_incremental_rollup(self):
+        self.create_sale()
+        self.create_sale(settlement_type='conditional', sale_price=Decimal('250'))
+        self.create_purchase(invoice_date=date(2024, 3, 2))
+        expected = sorted(InvoiceDailyRollup.objects.values_list(
+            'day', 'service_category', 'settlement_type', 'created_by',
+            'sales_count', 'sales_total', 'purchase_count', 'purchase_total',
+        ))
+
+        InvoiceDailyRollup.objects.all().delete()
+        rebuild_rollup()
+
+        rebuilt = sorted(InvoiceDailyRollup.objects.values_list(
+            'day', 'service_category', 'settlement_type', 'created_by',
+            'sales_count', 'sales_total', 'purchase_count', 'purchase_total',
+        ))
+        self.assertEqual(rebuilt, expected)
+
+    def test_totals_for_ranges_match_single_range_totals(self):
+        other = CustomUserFactory()
+        self.create_sale(invoice_date=date(2024, 1, 5))
+        self.create_sale(invoice_date=date(2024, 2, 5), created_by=other)
+        self.create_purchase(invoice_date=date(2024, 3, 5))
+        ranges = [
+            (date(2024, 1, 1), date(2024, 1, 31), self.user.pk),
+            (date(2024, 1, 1), date(2024, 12, 31), self.user.pk),
+            (date(2024, 2, 1), date(2024, 2, 28), other.pk),
+        ]
+
+        batched = rollup_totals_for_ranges(ranges, by_creator=True)
+        expected = [rollup_totals(start, end, created_by=creator) for start, end, creator in ranges]
+        self.assertEqual(batched, expected)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        person = PersonFactory()
+        for day in (1, 1, 2, 3, 3, 3):
+            SalesInvoice.objects.create(
+                buyer=person, invoice_date=date(2024, 5, day), service_category='legal',
+                sale_price=Decimal('100'), settlement_type='cash',
+            )
+            PurchaseInvoice.objects.create(
+                vendor=person, invoice_date=date(2024, 5, day), service_category='legal',
+                purchase_price=Decimal('50'), settlement_type='cash',
+            )
+
+    def sources(self):
+        return [('sales', SalesInvoice.objects.all()), ('purchase', PurchaseInvoice.objects.all())]
+
+    def test_pages_cover_merged_invoices_without_gaps(self):
+        expected = sorted(
+            [(invoice.invoice_date, invoice.invoice_number, 'sales', invoice.pk) for invoice in SalesInvoice.objects.all()] +
+            [(invoice.invoice_date, invoice.invoice_number, 'purchase', invoice.pk) for invoice in PurchaseInvoice.objects.all()],
+            reverse=True,
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            page, token = keyset_page(self.sources(), cursor, page_size=5)
+            self.assertLessEqual(len(page), 5)
+            seen.extend(
+                (invoice.invoice_date, invoice.invoice_number,
+                 'sales' if isinstance(invoice, SalesInvoice) else 'purchase', invoice.pk)
+                for invoice in page
+            )
+            if not token:
+                break
+            cursor = decode_cursor(token)
+
+        self.assertEqual(seen, expected)
+
+    def test_union_pages_match_merged_pages(self):
+        union_sources = customer_invoice_sources(SalesInvoice.objects.all(), PurchaseInvoice.objects.all())
+        cursor = None
+        while True:
+            page, token = keyset_page(self.sources(), cursor, page_size=4)
+            rows, union_token = keyset_union_page(union_sources, cursor, page_size=4)
+            self.assertEqual(
+                [(row['kind'], row['id']) for row in rows],
+                [('sales' if isinstance(invoice, SalesInvoice) else 'purchase', invoice.pk) for invoice in page],
+            )
+            self.assertEqual(union_token, token)
+            if not token:
+                break
+            cursor = decode_cursor(token)
+
+    def test_invalid_cursor_starts_from_first_page(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        page, _ = keyset_page(self.sources(), decode_cursor('not-a-cursor'), page_size=3)
+        self.assertEqual(page[0].invoice_date, date(2024, 5, 3))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ReportChangelistQueryTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUserFactory(role='admin', is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+
+    def count_changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_financial_changelist_query_count_is_constant(self):
+        url = reverse('admin:reports_financialreport_changelist')
+        FinancialReport.objects.create(start_date=date(2024, 1, 1), end_date=date(2024, 6, 30))
+        small_page = self.count_changelist_queries(url)
+
+        for month in range(1, 10):
+            FinancialReport.objects.create(start_date=date(2024, month, 1), end_date=date(2024, 12, 31))
+        self.assertEqual(self.count_changelist_queries(url), small_page)
+
+    def test_employee_changelist_query_count_is_constant(self):
+        url = reverse('admin:reports_employeereport_changelist')
+        EmployeeReport.objects.create(
+            employee=CustomUserFactory(),
+            start_date=date(2024, 1, 1),
+            end_date=date(2024, 6, 30),
+        )
+        small_page = self.count_changelist_queries(url)
+
+        for _ in range(5):
+            EmployeeReport.objects.create(
+                employee=CustomUserFactory(),
+                start_date=date(2024, 1, 1),
+                end_date=date(2024, 12, 31),
+            )
+        self.assertEqual(self.count_changelist_queries(url), small_page)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ReportExportTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUserFactory(role='admin', is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        person = PersonFactory(first_name='علی', last_name='رضایی')
+        for day in range(1, 4):
+            SalesInvoice.objects.create(
+                buyer=person,
+                invoice_date=date(2024, 5, day),
+                service_category='legal',
+                other_service_title='مشاوره',
+                sale_price=Decimal('1000'),
+                settlement_type='cash',
+                created_by=self.admin,
+            )
+        self.report = CustomerReport.objects.create(customer=person, created_by=self.admin)
+
+    def export(self, file_format):
+        url = reverse('admin:reports_customerreport_export_customer_report', args=[self.report.pk, file_format])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv_export_streams_all_rows(self):
+        content = self.export('csv').decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][3], 'علی')
+
+    def test_xlsx_export_is_a_valid_workbook(self):
+        with zipfile.ZipFile(io.BytesIO(self.export('xlsx'))) as archive:
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertEqual(sheet.count('<row '), 4)
+        self.assertIn('رضایی', sheet)
+
+    def test_export_reads_bounded_keyset_chunks(self):
+        PurchaseInvoice.objects.create(
+            vendor=self.report.customer,
+            invoice_date=date(2024, 5, 2),
+            service_category='legal',
+            other_service_title='مشاوره',
+            purchase_price=Decimal('400'),
+            settlement_type='cash',
+            created_by=self.admin,
+        )
+        with mock.patch('reports.exports.EXPORT_CHUNK_SIZE', 2), CaptureQueriesContext(connection) as queries:
+            content = self.export('csv').decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))[1:]
+        self.assertEqual([row[2] for row in rows], ['2024-05-03', '2024-05-02', '2024-05-02', '2024-05-01'])
+        invoice_reads = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "persons_' in query['sql']
+        ]
+        self.assertTrue(invoice_reads)
+        self.assertTrue(all('LIMIT 2' in sql for sql in invoice_reads))
+
+    def test_unknown_format_is_not_found(self):
+        url = reverse('admin:reports_customerreport_export_customer_report', args=[self.report.pk, 'pdf'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ReportResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUserFactory(role='admin', is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        self.person = PersonFactory()
+        self.create_sale()
+        self.report = CustomerReport.objects.create(customer=self.person, created_by=self.admin)
+        self.url = reverse('admin:reports_customerreport_view_customer_report', args=[self.report.pk])
+
+    def create_sale(self):
+        return SalesInvoice.objects.create(
+            buyer=self.person,
+            invoice_date=date(2024, 5, 1),
+            service_category='legal',
+            sale_price=Decimal('1000'),
+            settlement_type='cash',
+            created_by=self.admin,
+        )
+
+    def get_report(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        invoice_tables = (SalesInvoice._meta.db_table, PurchaseInvoice._meta.db_table)
+        invoice_queries = [
+            query for query in queries
+            if any(table in query['sql'] for table in invoice_tables)
+        ]
+        return response, invoice_queries
+
+    def test_repeat_view_is_served_from_cache(self):
+        self.get_report()
+        response, invoice_queries = self.get_report()
+        self.assertEqual(invoice_queries, [])
+        self.assertEqual(response.context['total_count'], 1)
+
+    def test_invoice_change_invalidates_cached_result(self):
+        self.get_report()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_sale()
+        response, invoice_queries = self.get_report()
+        self.assertNotEqual(invoice_queries, [])
+        self.assertEqual(response.context['total_count'], 2)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ReportJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = CustomUserFactory(role='admin', is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+
+    def test_generate_form_queues_job_and_worker_completes_it(self):
+        response = self.client.post(
+            reverse('admin:reports_financialreport_generate_financial_report'),
+            {'start_date': '2024-01-01', 'end_date': '2024-12-31'},
+        )
+        job = ReportJob.objects.get()
+        self.assertRedirects(
+            response, reverse('admin:reports_financialreport_job_progress', args=[job.pk]),
+        )
+        self.assertEqual(job.status, ReportJob.STATUS_PENDING)
+        self.assertContains(self.client.get(response['Location']), 'data-status-url')
+
+        status_url = reverse('admin:reports_financialreport_job_status', args=[job.pk])
+        self.assertEqual(self.client.get(status_url).json()['status'], ReportJob.STATUS_PENDING)
+
+        self.assertEqual(run_pending_jobs(), 1)
+        data = self.client.get(status_url).json()
+        self.assertEqual(data['status'], ReportJob.STATUS_DONE)
+        self.assertEqual(data['progress'], 100)
+        self.assertEqual(
+            data['report_url'],
+            reverse('admin:reports_financialreport_view_financial_report', args=[job.report_id]) + f'?job={job.pk}',
+        )
+
+        # A save elsewhere moves the report data version; the redirect still
+        # renders the page the worker built instead of recomputing it.
+        SalesInvoice.objects.create(
+            buyer=PersonFactory(),
+            invoice_date=date(2024, 6, 1),
+            service_category='legal',
+            sale_price=Decimal('100'),
+            settlement_type='cash',
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(data['report_url'])
+        self.assertEqual(response.context['total_invoices'], 0)
+        self.assertFalse(any('persons_salesinvoice' in query['sql'] for query in queries.captured_queries))
+
+    def test_failed_job_records_error(self):
+        job = ReportJob.objects.create(report_type='customer', report_id=999, created_by=self.admin)
+        run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.STATUS_FAILED)
+        self.assertIn('DoesNotExist', job.error)
+        data = self.client.get(reverse('admin:reports_customerreport_job_status', args=[job.pk])).json()
+        self.assertNotIn('DoesNotExist', data['error'])
+
+    def test_stale_running_jobs_are_reclaimed(self):
+        report = FinancialReport.objects.create(start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+        stale = timezone.now() - timedelta(hours=1)
+        retried = ReportJob.objects.create(
+            report_type='financial', report_id=report.pk, status=ReportJob.STATUS_RUNNING,
+            started_at=stale, heartbeat_at=stale, attempts=1,
+        )
+        exhausted = ReportJob.objects.create(
+            report_type='financial', report_id=report.pk, status=ReportJob.STATUS_RUNNING,
+            started_at=stale, heartbeat_at=stale, attempts=2,
+        )
+        self.assertEqual(run_pending_jobs(), 1)
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts), (ReportJob.STATUS_DONE, 2))
+        self.assertEqual(exhausted.status, ReportJob.STATUS_FAILED)
+
+    def test_reclaimed_run_does_not_overwrite_the_new_one(self):
+        report = FinancialReport.objects.create(start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+        ReportJob.objects.create(report_type='financial', report_id=report.pk)
+        first = claim_next_job()
+        # The job was reclaimed and another worker claimed it again.
+        ReportJob.objects.filter(pk=first.pk).update(attempts=first.attempts + 1, progress=0)
+
+        run_job(first)
+        job = ReportJob.objects.get()
+        self.assertEqual((job.status, job.progress, job.finished_at), (ReportJob.STATUS_RUNNING, 0, None))
+
+    def test_build_steps_send_heartbeats(self):
+        report = FinancialReport.objects.create(start_date=date(2024, 1, 1), end_date=date(2024, 12, 31))
+        steps = []
+        financial_report_page(report, None, progress=steps.append)
+        self.assertEqual(steps, [30, 60, 90])
+
+    def test_job_status_is_private_to_its_owner(self):
+        staff = CustomUserFactory(is_staff=True, is_superuser=True)
+        job = ReportJob.objects.create(report_type='employee', report_id=1, created_by=staff)
+        other = CustomUserFactory(role='employee', is_staff=True)
+        self.client.force_login(other)
+        response = self.client.get(reverse('admin:reports_employeereport_job_status', args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ReportPickerTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUserFactory(role='admin', is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        self.customer = PersonFactory(first_name='Zhubin', last_name='Picker')
+
+    def test_generate_forms_do_not_render_every_choice(self):
+        response = self.client.get(reverse('admin:reports_customerreport_generate_customer_report'))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'Zhubin')
+
+        response = self.client.get(reverse('admin:reports_employeereport_generate_employee_report'))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, self.admin.username)
+
+    def test_customer_and_user_filters_are_posted(self):
+        self.client.post(reverse('admin:reports_customerreport_generate_customer_report'), {
+            'customer': self.customer.pk,
+            'filter_user': self.admin.pk,
+            'invoice_type': 'all',
+            'settlement_type': 'all',
+        })
+        report = CustomerReport.objects.get()
+        self.assertEqual(report.customer, self.customer)
+        self.assertEqual(report.filter_user, self.admin)
+
+    def test_customer_autocomplete_uses_person_search(self):
+        PersonFactory(first_name='Zhubin', last_name='Inactive', is_active=False)
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'reports', 'model_name': 'customerreport', 'field_name': 'customer', 'term': 'zhu pick',
+        })
+        self.assertEqual([row['id'] for row in response.json()['results']], [str(self.customer.pk)])
+
+
+class EmployeeSalaryTotalsTests(TestCase):
+    def test_salary_figures_come_from_one_query(self):
+        employee = CustomUserFactory()
+        for month, is_paid in ((1, True), (2, True), (3, False)):
+            Salary.objects.create(
+                employee=employee, date=date(2024, month, 1), amount=Decimal('100') * month, is_paid=is_paid,
+            )
+
+        with self.assertNumQueries(1):
+            totals = employee_salary_totals(Salary.objects.filter(employee=employee))
+
+        self.assertEqual(totals['salaries_count'], 3)
+        self.assertEqual(totals['paid_salaries_count'], 2)
+        self.assertEqual(totals['unpaid_salaries_count'], 1)
+        self.assertEqual(totals['total_salary_amount'], Decimal('600'))
+        self.assertEqual(totals['paid_salary_amount'], Decimal('300'))
+        self.assertEqual(totals['unpaid_salary_amount'], Decimal('300'))
+
+    def test_no_salaries_gives_zero_amounts(self):
+        totals = employee_salary_totals(Salary.objects.none())
+        self.assertEqual(totals['total_salary_amount'], 0)
+        self.assertEqual(totals['salaries_count'], 0)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class CashFlowLedgerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = CustomUserFactory(first_name='Sara', last_name='Ahmadi')
+        self.person = PersonFactory(first_name='Ali', last_name='Karimi')
+        IncomeInvoice.objects.create(amount=Decimal('500'), babet='سرمایه', date=date(2024, 2, 20))
+        SalesInvoice.objects.create(
+            buyer=self.person, invoice_date=date(2024, 3, 1), service_category='legal',
+            sale_price=Decimal('1000'), settlement_type='cash',
+        )
+        PurchaseInvoice.objects.create(
+            vendor=self.person, invoice_date=date(2024, 3, 1), service_category='legal',
+            purchase_price=Decimal('300'), settlement_type='cash',
+        )
+        ExpenseInvoice.objects.create(amount=Decimal('50'), babet='اجاره', date=date(2024, 3, 2))
+        Salary.objects.create(employee=self.employee, date=date(2024, 3, 3), amount=Decimal('200'), is_paid=True)
+        Salary.objects.create(employee=CustomUserFactory(), date=date(2024, 3, 3), amount=Decimal('999'))
+
+    def test_running_balance_starts_from_opening_balance(self):
+        result = cash_flow_page(date(2024, 3, 1), date(2024, 3, 31))
+
+        self.assertEqual(result['opening_balance'], Decimal('500'))
+        self.assertEqual(
+            [(entry['kind'], entry['title'], entry['balance']) for entry in result['entries']],
+            [
+                ('purchase', 'Ali Karimi', Decimal('200')),
+                ('sales', 'Ali Karimi', Decimal('1200')),
+                ('expense', 'اجاره', Decimal('1150')),
+                ('salary', 'Sara Ahmadi', Decimal('950')),
+            ],
+        )
+        self.assertEqual(result['entries'][0]['outflow'], Decimal('300'))
+        self.assertIsNone(result['next_cursor'])
+
+    def test_pages_carry_the_balance_in_one_query_each(self):
+        first = cash_flow_page(date(2024, 3, 1), date(2024, 3, 31), page_size=3)
+        cursor = decode_ledger_cursor(first['next_cursor'])
+        self.assertEqual(cursor[1], Decimal('1150'))
+
+        with self.assertNumQueries(1):
+            second = cash_flow_page(date(2024, 3, 1), date(2024, 3, 31), cursor=cursor, page_size=3)
+        self.assertEqual([entry['balance'] for entry in second['entries']], [Decimal('950')])
+        self.assertEqual(second['closing_balance'], Decimal('950'))
+
+    def test_opening_balance_reads_the_daily_rollups(self):
+        expense = ExpenseInvoice.objects.create(amount=Decimal('80'), babet='تعمیر', date=date(2024, 2, 10))
+        expense.amount = Decimal('30')
+        expense.save()
+        salary = Salary.objects.create(employee=self.employee, date=date(2024, 2, 5), amount=Decimal('100'))
+        salary.is_paid = True
+        salary.save()
+        run, _created = create_payroll_run(date(2024, 2, 25), {CustomUserFactory().pk: Decimal('70')})
+        mark_payroll_runs_paid([run.pk])
+        SalesInvoice.objects.create(
+            buyer=self.person, invoice_date=date(2024, 2, 28), service_category='legal',
+            sale_price=Decimal('250'), settlement_type='cash',
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(opening_balance(date(2024, 3, 1)), Decimal('550'))
+        self.assertTrue(all('rollup' in query['sql'] for query in queries.captured_queries))
+
+        rebuild_cash_flow_rollup()
+        self.assertEqual(opening_balance(date(2024, 3, 1)), Decimal('550'))
+
+    def test_admin_page_renders_ledger(self):
+        admin = CustomUserFactory(is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        report = FinancialReport.objects.create(start_date=date(2024, 3, 1), end_date=date(2024, 3, 31), created_by=admin)
+
+        response = self.client.get(reverse('admin:reports_financialreport_cash_flow', args=[report.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['closing_balance'], Decimal('950'))
+        self.assertContains(response, 'Sara Ahmadi')
 
-# Create your tests here.
@@ -0,0 +1,44 @@
+from functools import partial
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import DataVersion
+
+
+REPORT_DATA = 'report-data'
+PERSON_DATA = 'persons'
+SERVICE_DATA = 'services'
+
+
+def get_data_version(key):
+    return DataVersion.objects.filter(key=key).values_list('version', flat=True).first() or 0
+
+
+def get_data_stamp(key):
+    # The update time tells apart two stamps with the same number when a
+    # bump was rolled back and then made again by another transaction.
+    return DataVersion.objects.filter(key=key).values_list('version', 'updated_at').first() or (0, None)
+
+
+def get_data_versions(*keys):
+    versions = dict(DataVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    return tuple(versions.get(key, 0) for key in keys)
+
+
+def _bump_data_version(key):
+    # update() skips auto_now, so updated_at is set explicitly for the stamp.
+    changes = {'version': F('version') + 1, 'updated_at': timezone.now()}
+    if DataVersion.objects.filter(key=key).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            DataVersion.objects.create(key=key, version=1)
+    except IntegrityError:
+        DataVersion.objects.filter(key=key).update(**changes)
+
+
+def bump_data_version(key):
+    # Every writer shares one row per key. Bumping after commit updates it
+    # in its own short statement, so the row lock is not held for the rest
+    # of the writer's transaction; a rolled back write bumps nothing.
+    transaction.on_commit(partial(_bump_data_version, key))
@@ -0,0 +1,186 @@
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+SHEET_HEADER_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView rightToLeft="1" workbookViewId="0"/></sheetViews>'
+    '<sheetData>'
+)
+
+SHEET_FOOTER_XML = '</sheetData></worksheet>'
+
+
+class _ChunkBuffer:
+    # Unseekable sink for ZipFile; whatever the archive writes is handed to
+    # the response as soon as it is produced.
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _cell_xml(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    text = escape(ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row_xml(index, row):
+    cells = ''.join(_cell_xml(value) for value in row)
+    return f'<row r="{index}">{cells}</row>'
+
+
+def stream_xlsx(rows, sheet_name='Sheet1'):
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        archive.writestr('_rels/.rels', ROOT_RELS_XML)
+        archive.writestr('xl/workbook.xml', WORKBOOK_XML.format(name=escape(sheet_name)))
+        archive.writestr('xl/_rels/workbook.xml.rels', WORKBOOK_RELS_XML)
+        yield buffer.pop()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(SHEET_HEADER_XML.encode('utf-8'))
+            for index, row in enumerate(rows, start=1):
+                sheet.write(_row_xml(index, row).encode('utf-8'))
+                data = buffer.pop()
+                if data:
+                    yield data
+            sheet.write(SHEET_FOOTER_XML.encode('utf-8'))
+    yield buffer.pop()
+
+
+SPREADSHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELATIONSHIP_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_RELATIONSHIP_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+CELL_REFERENCE = re.compile(r'([A-Z]+)')
+
+
+def _column_index(reference):
+    index = 0
+    for letter in CELL_REFERENCE.match(reference).group(1):
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _text_of(element):
+    return ''.join(node.text or '' for node in element.iter(f'{SPREADSHEET_NS}t'))
+
+
+def _first_sheet_path(archive):
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    sheet = workbook.find(f'{SPREADSHEET_NS}sheets/{SPREADSHEET_NS}sheet')
+    relationship_id = sheet.get(f'{RELATIONSHIP_NS}id')
+    relationships = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for relationship in relationships.iter(f'{PACKAGE_RELATIONSHIP_NS}Relationship'):
+        if relationship.get('Id') == relationship_id:
+            target = relationship.get('Target').lstrip('/')
+            return target if target.startswith('xl/') else f'xl/{target}'
+    return 'xl/worksheets/sheet1.xml'
+
+
+def _shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as source:
+        for _event, element in ElementTree.iterparse(source):
+            if element.tag == f'{SPREADSHEET_NS}si':
+                strings.append(_text_of(element))
+                element.clear()
+    return strings
+
+
+def iter_xlsx_rows(file):
+    # Reads the first worksheet row by row; values come back as strings
+    # (numbers and dates keep their stored text, e.g. Excel date serials).
+    with zipfile.ZipFile(file) as archive:
+        shared_strings = _shared_strings(archive)
+        with archive.open(_first_sheet_path(archive)) as source:
+            for _event, element in ElementTree.iterparse(source):
+                if element.tag != f'{SPREADSHEET_NS}row':
+                    continue
+                values = []
+                for cell in element.iter(f'{SPREADSHEET_NS}c'):
+                    reference = cell.get('r')
+                    if reference:
+                        values.extend([''] * (_column_index(reference) - len(values)))
+                    cell_type = cell.get('t')
+                    raw = cell.find(f'{SPREADSHEET_NS}v')
+                    if cell_type == 'inlineStr':
+                        value = _text_of(cell)
+                    elif raw is None:
+                        value = ''
+                    elif cell_type == 's':
+                        value = shared_strings[int(raw.text)]
+                    else:
+                        value = raw.text or ''
+                    values.append(value)
+                element.clear()
+                yield values
@@ -0,0 +1,129 @@
+import threading
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from reports.versioning import SERVICE_DATA, bump_data_version, get_data_stamp
+from .models import (
+    CommercialService,
+    RegistrationService,
+    LegalService,
+    LeasingService,
+    LoanService,
+    ServiceCatalogEntry,
+)
+
+
+SERVICE_MODELS = {
+    'commercial': CommercialService,
+    'registration': RegistrationService,
+    'legal': LegalService,
+    'leasing': LeasingService,
+    'loan': LoanService,
+}
+
+SERVICE_CATEGORIES = {model: category for category, model in SERVICE_MODELS.items()}
+
+CATALOG_BATCH_SIZE = 1000
+
+
+def catalog_entry_values(service):
+    return {
+        'name': str(service),
+        'is_active': service.is_active,
+        'created_by_id': service.created_by_id,
+    }
+
+
+class ServiceCatalog:
+    def __init__(self, stamp, entries):
+        self.stamp = stamp
+        self._services = defaultdict(list)
+        self._names = {}
+        for category, service_id, name, created_by_id in entries:
+            self._services[category].append((service_id, name, created_by_id))
+            self._names[(category, service_id)] = name
+
+    def services(self, category, owner_id=None):
+        return [
+            {'id': service_id, 'name': name}
+            for service_id, name, created_by_id in self._services.get(category, ())
+            if owner_id is None or created_by_id == owner_id
+        ]
+
+    def choices(self, category):
+        return [(str(service_id), name) for service_id, name, _owner in self._services.get(category, ())]
+
+    def as_payload(self, owner_id=None):
+        return {
+            category: [[service['id'], service['name']] for service in self.services(category, owner_id)]
+            for category in SERVICE_MODELS
+        }
+
+    def name(self, category, service_id):
+        return self._names.get((category, service_id))
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_service_catalog():
+    # Every worker keeps its own copy of the active services. The only query
+    # on the steady-state path is the SERVICE_DATA stamp lookup, so a
+    # change made in another process is picked up on the next call.
+    global _catalog
+    stamp = get_data_stamp(SERVICE_DATA)
+    catalog = _catalog
+    if catalog is not None and catalog.stamp == stamp:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or _catalog.stamp != stamp:
+            entries = (
+                ServiceCatalogEntry.objects.filter(is_active=True)
+                .order_by('category', 'name', 'service_id')
+                .values_list('category', 'service_id', 'name', 'created_by_id')
+            )
+            _catalog = ServiceCatalog(stamp, list(entries))
+        return _catalog
+
+
+def sync_catalog_entry(service):
+    ServiceCatalogEntry.objects.update_or_create(
+        category=SERVICE_CATEGORIES[type(service)],
+        service_id=service.pk,
+        defaults=catalog_entry_values(service),
+    )
+    bump_data_version(SERVICE_DATA)
+
+
+def remove_catalog_entry(service):
+    ServiceCatalogEntry.objects.filter(
+        category=SERVICE_CATEGORIES[type(service)], service_id=service.pk,
+    ).delete()
+    bump_data_version(SERVICE_DATA)
+
+
+def link_invoice_services(*invoice_models):
+    # One UPDATE per invoice table; invoices whose service no longer exists
+    # end up with a NULL link.
+    entry = ServiceCatalogEntry.objects.filter(
+        category=OuterRef('service_category'), service_id=OuterRef('service_id'),
+    ).values('pk')[:1]
+    return sum(model.objects.update(catalog_service=Subquery(entry)) for model in invoice_models)
+
+
+def rebuild_service_catalog():
+    from persons.models import SalesInvoice, PurchaseInvoice
+
+    with transaction.atomic():
+        ServiceCatalogEntry.objects.all().delete()
+        for category, model in SERVICE_MODELS.items():
+            entries = (
+                ServiceCatalogEntry(category=category, service_id=service.pk, **catalog_entry_values(service))
+                for service in model.objects.order_by('pk').iterator(chunk_size=CATALOG_BATCH_SIZE)
+            )
+            ServiceCatalogEntry.objects.bulk_create(entries, batch_size=CATALOG_BATCH_SIZE)
+        link_invoice_services(SalesInvoice, PurchaseInvoice)
+        bump_data_version(SERVICE_DATA)
+    return ServiceCatalogEntry.objects.count()
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from services.catalog import rebuild_service_catalog
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the unified service catalog and relink invoices to it'
+
+    def handle(self, *args, **options):
+        entries = rebuild_service_catalog()
+        self.stdout.write(self.style.SUCCESS(f'{entries} catalog entries rebuilt'))
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+SERVICE_MODELS = {
+    'commercial': 'CommercialService',
+    'registration': 'RegistrationService',
+    'legal': 'LegalService',
+    'leasing': 'LeasingService',
+    'loan': 'LoanService',
+}
+
+
+def populate_catalog(apps, schema_editor):
+    ServiceCatalogEntry = apps.get_model('services', 'ServiceCatalogEntry')
+    for category, model_name in SERVICE_MODELS.items():
+        model = apps.get_model('services', model_name)
+        entries = []
+        for service in model.objects.order_by('pk').iterator(chunk_size=1000):
+            if category == 'loan':
+                name = f'{service.bank_name} - {service.plan_name}'
+            else:
+                name = service.name
+            entries.append(ServiceCatalogEntry(
+                category=category,
+                service_id=service.pk,
+                name=name,
+                is_active=service.is_active,
+                created_by_id=service.created_by_id,
+            ))
+        ServiceCatalogEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('services', '0002_commercialservice_created_by_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceCatalogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('commercial', 'خدمات بازرگانی'), ('registration', 'خدمات ثبت'), ('legal', 'خدمات حقوقی'), ('leasing', 'خدمات لیزینگ'), ('loan', 'خدمات وام')], max_length=20, verbose_name='دسته\u200cبندی خدمت')),
+                ('service_id', models.PositiveIntegerField(verbose_name='شناسه خدمت')),
+                ('name', models.CharField(max_length=403, verbose_name='نام خدمت')),
+                ('is_active', models.BooleanField(default=True, verbose_name='فعال')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='ایجاد شده توسط')),
+            ],
+            options={
+                'verbose_name': 'خدمت در فهرست',
+                'verbose_name_plural': 'فهرست خدمات',
+                'ordering': ['category', 'name'],
+                'indexes': [models.Index(fields=['category', 'is_active', 'name'], name='services_se_categor_bab9e2_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='servicecatalogentry',
+            constraint=models.UniqueConstraint(fields=('category', 'service_id'), name='unique_service_catalog_entry'),
+        ),
+        migrations.RunPython(populate_catalog, migrations.RunPython.noop),
+    ]
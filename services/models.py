@@ -131,3 +131,101 @@ class RegistrationService(AbstractService):
     
     def __str__(self):
         return self.name
+
+
+class ServiceCatalogEntry(models.Model):
+    CATEGORY_CHOICES = [
+        ('commercial', _('خدمات بازرگانی')),
+        ('registration', _('خدمات ثبت')),
+        ('legal', _('خدمات حقوقی')),
+        ('leasing', _('خدمات لیزینگ')),
+        ('loan', _('خدمات وام')),
+    ]
+    
+    category = models.CharField(
+        max_length=20,
+        choices=CATEGORY_CHOICES,
+        verbose_name=_('دسته‌بندی خدمت')
+    )
+    service_id = models.PositiveIntegerField(
+        verbose_name=_('شناسه خدمت')
+    )
+    name = models.CharField(
+        max_length=403,
+        verbose_name=_('نام خدمت')
+    )
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name=_('فعال')
+    )
+    created_by = models.ForeignKey(
+        'accounts.CustomUser',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('ایجاد شده توسط')
+    )
+    
+    class Meta:
+        verbose_name = _('خدمت در فهرست')
+        verbose_name_plural = _('فهرست خدمات')
+        ordering = ['category', 'name']
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'service_id'], name='unique_service_catalog_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['category', 'is_active', 'name']),
+        ]
+    
+    def __str__(self):
+        return self.name
+    
+    @classmethod
+    def entry_ids(cls, pairs):
+        pairs = {(category, service_id) for category, service_id in pairs if service_id}
+        if not pairs:
+            return {}
+        query = models.Q()
+        for category in {category for category, _service_id in pairs}:
+            service_ids = {service_id for pair_category, service_id in pairs if pair_category == category}
+            query |= models.Q(category=category, service_id__in=service_ids)
+        return {
+            (category, service_id): pk
+            for pk, category, service_id in cls.objects.filter(query).values_list('pk', 'category', 'service_id')
+        }
+
+
+class CatalogServiceModel(models.Model):
+    # Denormalized link to the catalog row matching (service_category,
+    # service_id), so invoice lists can join the service name in one query.
+    catalog_service = models.ForeignKey(
+        ServiceCatalogEntry,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name=_('خدمت')
+    )
+    
+    class Meta:
+        abstract = True
+    
+    def fill_catalog_service(self):
+        key = (self.service_category, self.service_id)
+        self.catalog_service_id = ServiceCatalogEntry.entry_ids([key]).get(key)
+    
+    def get_service_name(self):
+        if self.catalog_service_id:
+            return self.catalog_service.name
+        return self.other_service_title or ''
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.fill_catalog_service()
+        elif {'service_category', 'service_id'} & set(update_fields):
+            self.fill_catalog_service()
+            kwargs['update_fields'] = {*update_fields, 'catalog_service'}
+        super().save(*args, **kwargs)
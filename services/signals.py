@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from .catalog import SERVICE_MODELS, remove_catalog_entry, sync_catalog_entry
+
+
+def update_catalog_entry(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_catalog_entry(instance)
+
+
+def delete_catalog_entry(sender, instance, **kwargs):
+    remove_catalog_entry(instance)
+
+
+for model in SERVICE_MODELS.values():
+    post_save.connect(update_catalog_entry, sender=model, dispatch_uid=f'service_catalog_save_{model.__name__}')
+    post_delete.connect(delete_catalog_entry, sender=model, dispatch_uid=f'service_catalog_delete_{model.__name__}')
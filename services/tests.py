@@ -1,3 +1,167 @@
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
 from django.test import TestCase
+from django.urls import reverse
+from factories import CustomUserFactory, LegalServiceFactory, LoanServiceFactory, PersonFactory
+from persons.forms import SalesInvoiceForm
+from persons.models import PurchaseInvoice, SalesInvoice
+from reports.models import DataVersion
+from reports.queries import customer_invoice_rows, customer_invoice_union
+from reports.versioning import SERVICE_DATA, bump_data_version, get_data_stamp
+from .catalog import get_service_catalog, rebuild_service_catalog
+from .models import ServiceCatalogEntry
 
-# Create your tests here.
+
+class ServiceCatalogTests(TestCase):
+    def setUp(self):
+        self.person = PersonFactory()
+        self.user = CustomUserFactory()
+        self.legal_services = LegalServiceFactory.create_batch(3)
+        self.loan_service = LoanServiceFactory()
+
+    def create_sale(self, service_category, service_id):
+        return SalesInvoice.objects.create(
+            buyer=self.person,
+            invoice_date=date(2024, 1, 1),
+            service_category=service_category,
+            service_id=service_id,
+            sale_price=Decimal('100'),
+            settlement_type='cash',
+            created_by=self.user,
+        )
+
+    def test_catalog_follows_service_changes(self):
+        entry = ServiceCatalogEntry.objects.get(category='loan', service_id=self.loan_service.pk)
+        self.assertEqual(entry.name, str(self.loan_service))
+
+        self.loan_service.plan_name = 'طرح جدید'
+        self.loan_service.is_active = False
+        self.loan_service.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.name, str(self.loan_service))
+        self.assertFalse(entry.is_active)
+
+        invoice = self.create_sale('loan', self.loan_service.pk)
+        self.assertEqual(invoice.catalog_service, entry)
+        self.loan_service.delete()
+        invoice.refresh_from_db()
+        self.assertIsNone(invoice.catalog_service_id)
+
+    def test_invoice_link_follows_service_fields(self):
+        invoice = self.create_sale('legal', self.legal_services[0].pk)
+        invoice.service_id = self.legal_services[1].pk
+        invoice.save(update_fields=['service_id'])
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.catalog_service.service_id, self.legal_services[1].pk)
+
+        invoice.service_category = 'loan'
+        invoice.save()
+        self.assertIsNone(invoice.catalog_service_id)
+
+    def test_service_names_are_joined_in_one_query(self):
+        for service in self.legal_services:
+            self.create_sale('legal', service.pk)
+        self.create_sale('loan', self.loan_service.pk)
+        self.create_sale('legal', 999999)
+
+        with self.assertNumQueries(1):
+            invoices = list(SalesInvoice.objects.select_related('catalog_service'))
+            names = {invoice.get_service_name() for invoice in invoices}
+        self.assertIn(str(self.loan_service), names)
+        self.assertIn('', names)
+
+        with self.assertNumQueries(1):
+            rows = customer_invoice_rows(customer_invoice_union(SalesInvoice.objects.all(), PurchaseInvoice.objects.none()))
+        self.assertIn(self.legal_services[0].name, {row['service_name'] for row in rows})
+
+    def test_rebuild_relinks_invoices(self):
+        invoice = self.create_sale('legal', self.legal_services[0].pk)
+        ServiceCatalogEntry.objects.all().delete()
+        invoice.refresh_from_db()
+        self.assertIsNone(invoice.catalog_service_id)
+
+        self.assertEqual(rebuild_service_catalog(), 4)
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.catalog_service.name, self.legal_services[0].name)
+
+
+class ServiceCatalogCacheTests(TestCase):
+    def setUp(self):
+        self.user = CustomUserFactory(role='user')
+        # Data versions are bumped on commit, which TestCase never reaches.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.legal_service = LegalServiceFactory(name='ثبت دعوی', created_by=self.user)
+            self.other_legal_service = LegalServiceFactory(name='مشاوره')
+            self.loan_service = LoanServiceFactory()
+        self.invoice = SalesInvoice.objects.create(
+            buyer=PersonFactory(),
+            invoice_date=date(2024, 1, 1),
+            service_category='loan',
+            service_id=self.loan_service.pk,
+            sale_price=Decimal('100'),
+            settlement_type='cash',
+        )
+
+    def test_forms_read_services_from_memory(self):
+        get_service_catalog()
+        with self.assertNumQueries(1):
+            form = SalesInvoiceForm(instance=self.invoice)
+        self.assertIn((str(self.loan_service.pk), str(self.loan_service)), form.fields['service_id'].widget.choices)
+
+    def test_changes_from_other_processes_invalidate_the_catalog(self):
+        catalog = get_service_catalog()
+        self.assertIs(get_service_catalog(), catalog)
+
+        # Simulate a write made by another worker: the rows and the stamp
+        # change without this process seeing any model signal.
+        ServiceCatalogEntry.objects.filter(service_id=self.other_legal_service.pk, category='legal').update(is_active=False)
+        DataVersion.objects.filter(key='services').update(version=catalog.stamp[0] + 1)
+
+        names = [service['name'] for service in get_service_catalog().services('legal')]
+        self.assertEqual(names, ['ثبت دعوی'])
+
+    def test_stamp_tells_apart_a_repeated_version_number(self):
+        catalog = get_service_catalog()
+        # Another transaction bumps and the number ends up where it was, as
+        # after a rolled back bump that is made again.
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(SERVICE_DATA)
+        DataVersion.objects.filter(key=SERVICE_DATA).update(version=catalog.stamp[0])
+
+        stamp = get_data_stamp(SERVICE_DATA)
+        self.assertEqual(stamp[0], catalog.stamp[0])
+        self.assertNotEqual(stamp, catalog.stamp)
+        self.assertIsNot(get_service_catalog(), catalog)
+
+    def test_version_is_bumped_only_when_the_write_commits(self):
+        stamp = get_data_stamp(SERVICE_DATA)
+        with self.captureOnCommitCallbacks() as callbacks:
+            LegalServiceFactory(name='کارشناسی')
+            self.assertEqual(get_data_stamp(SERVICE_DATA), stamp)
+        self.assertTrue(callbacks)
+
+        try:
+            with transaction.atomic():
+                with self.captureOnCommitCallbacks(execute=True):
+                    bump_data_version(SERVICE_DATA)
+                    raise DatabaseError
+        except DatabaseError:
+            pass
+        self.assertEqual(get_data_stamp(SERVICE_DATA), stamp)
+
+    def test_catalog_endpoint_returns_every_category_for_the_owner(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        url = reverse('persons:api_service_catalog')
+        response = self.client.get(url)
+        services = response.json()['services']
+        self.assertEqual(set(services), {'commercial', 'registration', 'legal', 'leasing', 'loan'})
+        self.assertEqual(services['legal'], [[self.legal_service.pk, 'ثبت دعوی']])
+        self.assertEqual(services['loan'], [])
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            LegalServiceFactory(name='داوری', created_by=self.user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
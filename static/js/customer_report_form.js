@@ -22,10 +22,8 @@ function loadServices() {
     }
     
     const apiUrl = document.querySelector('[data-api-url]').dataset.apiUrl;
-    fetch(apiUrl + '?category=' + category)
-        .then(response => response.json())
-        .then(data => {
-            const services = data.services || [];
+    ServiceCatalog.services(apiUrl, category)
+        .then(services => {
             serviceIdField.innerHTML = '<option value="">تمام خدمات</option>';
             services.forEach(service => {
                 const option = document.createElement('option');
@@ -0,0 +1,45 @@
+function attachRemoteSelect(select) {
+    const search = document.createElement('input');
+    search.type = 'search';
+    search.className = select.className + ' remote-select-search';
+    search.autocomplete = 'off';
+    search.placeholder = select.dataset.placeholder || '';
+    select.parentNode.insertBefore(search, select);
+    
+    const minLength = parseInt(select.dataset.minLength || '2', 10);
+    const emptyOption = select.querySelector('option[value=""]');
+    let timer = null;
+    
+    function showResults(results) {
+        const selected = select.querySelector('option:checked');
+        select.innerHTML = '';
+        if (emptyOption) {
+            select.appendChild(emptyOption);
+        }
+        if (selected && selected.value && !results.some(result => String(result.id) === selected.value)) {
+            select.appendChild(selected);
+        }
+        results.forEach(result => {
+            select.appendChild(new Option(result.text, result.id));
+        });
+    }
+    
+    search.addEventListener('input', function() {
+        clearTimeout(timer);
+        const term = search.value.trim();
+        if (term.length < minLength) {
+            return;
+        }
+        timer = setTimeout(function() {
+            const url = select.dataset.remoteUrl + '?q=' + encodeURIComponent(term);
+            fetch(url, {credentials: 'same-origin'})
+                .then(response => response.json())
+                .then(data => showResults(data.results || []))
+                .catch(() => {});
+        }, 250);
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('select[data-remote-url]').forEach(attachRemoteSelect);
+});
@@ -0,0 +1,28 @@
+function pollReportJob(container) {
+    const statusLabel = container.querySelector('.report-job-status');
+    const bar = container.querySelector('.report-job-bar-fill');
+    const errorBox = container.querySelector('.report-job-error');
+    
+    fetch(container.dataset.statusUrl, {credentials: 'same-origin'})
+        .then(response => response.json())
+        .then(data => {
+            statusLabel.textContent = data.status_display;
+            bar.style.width = data.progress + '%';
+            
+            if (data.status === 'done') {
+                window.location.href = data.report_url;
+            } else if (data.status === 'failed') {
+                errorBox.textContent = data.error || '';
+            } else {
+                setTimeout(() => pollReportJob(container), 1500);
+            }
+        })
+        .catch(() => setTimeout(() => pollReportJob(container), 5000));
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const container = document.querySelector('.report-job[data-status-url]');
+    if (container) {
+        pollReportJob(container);
+    }
+});
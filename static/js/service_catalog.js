@@ -0,0 +1,68 @@
+// Loads the services of all categories in one request and keeps them in
+// sessionStorage together with the response ETag. Each page revalidates the
+// stored copy once; the server answers 304 until a service changes.
+const ServiceCatalog = {
+    STORAGE_PREFIX: 'service-catalog:',
+    requests: {},
+
+    load(url) {
+        if (!this.requests[url]) {
+            this.requests[url] = this.fetchCatalog(url);
+        }
+        return this.requests[url];
+    },
+
+    services(url, category) {
+        return this.load(url).then(catalog =>
+            (catalog[category] || []).map(([id, name]) => ({ id, name }))
+        );
+    },
+
+    fetchCatalog(url) {
+        const key = this.STORAGE_PREFIX + url;
+        const stored = this.readStored(key);
+        const headers = { 'Accept': 'application/json' };
+        if (stored) {
+            headers['If-None-Match'] = stored.etag;
+        }
+
+        return fetch(url, { headers, cache: 'no-cache', credentials: 'same-origin' })
+            .then(response => {
+                if (response.status === 304 && stored) {
+                    return stored.services;
+                }
+                if (!response.ok) throw new Error('Network error');
+                return response.json().then(data => {
+                    this.store(key, response.headers.get('ETag'), data.services);
+                    return data.services;
+                });
+            })
+            .catch(error => {
+                delete this.requests[url];
+                if (stored) {
+                    return stored.services;
+                }
+                throw error;
+            });
+    },
+
+    readStored(key) {
+        try {
+            const stored = JSON.parse(sessionStorage.getItem(key));
+            return stored && stored.etag && stored.services ? stored : null;
+        } catch (error) {
+            return null;
+        }
+    },
+
+    store(key, etag, services) {
+        if (!etag) {
+            return;
+        }
+        try {
+            sessionStorage.setItem(key, JSON.stringify({ etag, services }));
+        } catch (error) {
+            // Storage can be full or disabled; the in-page copy still works.
+        }
+    }
+};
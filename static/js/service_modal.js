@@ -4,6 +4,7 @@ const ServiceModal = {
     selectedServiceId: null,
     selectedServiceName: null,
     currentServiceType: null,
+    catalogUrl: '/persons/api/service-catalog/',
     
     init(categorySelectId, serviceSelectId, displayFieldId) {
         this.categorySelectElement = document.getElementById(categorySelectId);
@@ -17,6 +18,7 @@ const ServiceModal = {
         
         this.setupElements();
         this.attachEventListeners();
+        ServiceCatalog.load(this.catalogUrl);
     },
     
     setupElements() {
@@ -127,20 +129,8 @@ const ServiceModal = {
             </div>
         `;
         
-        const url = `/persons/api/services-by-category/?service_type=${encodeURIComponent(serviceType)}`;
-        
-        fetch(url)
-            .then(response => {
-                if (!response.ok) throw new Error('Network error');
-                return response.json();
-            })
-            .then(data => {
-                if (data.success && data.services && Array.isArray(data.services)) {
-                    this.renderServicesList(data.services);
-                } else {
-                    container.innerHTML = '<div class="service-modal-empty">خدمتی موجود نیست</div>';
-                }
-            })
+        ServiceCatalog.services(this.catalogUrl, serviceType)
+            .then(services => this.renderServicesList(services))
             .catch(error => {
                 console.error('Error loading services:', error);
                 container.innerHTML = '<div class="service-modal-empty"><div class="service-modal-empty-icon">⚠️</div><div class="service-modal-empty-text">خطا در بارگیری خدمات</div></div>';